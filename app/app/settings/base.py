@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.profiling.QueryProfilerMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -90,7 +91,7 @@ AUTH_USER_MODEL = "core.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -113,6 +114,17 @@ REST_FRAMEWORK = {
         "auth": "5/minute",
     },
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+
+# List responses with at least MIN_ITEMS results are streamed in chunks of
+# CHUNK_ITEMS (None disables streaming)
+JSON_STREAMING = {
+    "MIN_ITEMS": 100,
+    "CHUNK_ITEMS": 50,
 }
 
 SPECTACULAR_SETTINGS = {
@@ -134,6 +146,140 @@ SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
 
+# SQL profiling: slow-query log and N+1 detection (opt-in, see core/profiling.py)
+QUERY_PROFILER = {
+    "ENABLED": os.environ.get("QUERY_PROFILER_ENABLED", "false").lower() == "true",
+    "SLOW_QUERY_MS": int(os.environ.get("QUERY_PROFILER_SLOW_MS", 100)),
+    "N_PLUS_ONE_THRESHOLD": 5,
+    "RESPONSE_HEADERS": False,
+}
+
+# Seconds anonymous recipe reads may be cached by browsers and nginx
+RECIPE_CACHE_MAX_AGE = int(os.environ.get("RECIPE_CACHE_MAX_AGE", 60))
+
+# Seconds a rendered recipe detail payload stays in the cache; stale
+# versions are never read again and simply expire
+RECIPE_DETAIL_CACHE_TIMEOUT = int(os.environ.get("RECIPE_DETAIL_CACHE_TIMEOUT", 3600))
+
+# Seconds recipe facet counts stay cached per filter set (see recipe.facets);
+# counts can lag writes by this long
+RECIPE_FACETS_CACHE_TIMEOUT = int(os.environ.get("RECIPE_FACETS_CACHE_TIMEOUT", 300))
+
+# Trending and top-rated rankings (see recipe.rankings): half-life of an
+# engagement's weight in trending, the weight of each kind of engagement, and
+# how many ratings at the site-wide mean the top-rated average starts from
+RECIPE_RANKINGS = {
+    "HALF_LIFE_HOURS": 48,
+    "WEIGHTS": {"rating": 1.0, "favorite": 2.0, "comment": 0.5},
+    "PRIOR_RATINGS": 10,
+}
+
+# Algorithmic feed ranking (see interaction.services.ranking): how many recent
+# candidates are ranked, feature weights, recency half-life, the trending
+# score at which velocity reaches 0.5, how many of the viewer's engagements
+# and for how long their affinity profile is cached, and the fraction of
+# feed responses logged for evaluate_feed_ranking
+FEED_RANKING = {
+    "CANDIDATES": 500,
+    "WEIGHTS": {"recency": 1.0, "affinity": 0.6, "velocity": 0.4, "tags": 0.3},
+    "RECENCY_HALF_LIFE_HOURS": 24,
+    "VELOCITY_SCALE": 5.0,
+    "PROFILE_ENGAGEMENTS": 200,
+    "PROFILE_TIMEOUT": 3600,
+    "LOG_RATE": float(os.environ.get("FEED_LOG_RATE", 0.01)),
+}
+
+# Seconds the category tree stays cached; category writes invalidate it
+CATEGORY_TREE_CACHE_TIMEOUT = int(os.environ.get("CATEGORY_TREE_CACHE_TIMEOUT", 86400))
+
+# Seconds a user's follow, mute and block sets stay cached (see
+# interaction.services.relationships). Writes invalidate them, but only in a
+# cache shared by all processes; with a per-process cache other processes
+# see changes after this long.
+RELATIONSHIP_CACHE_TIMEOUT = int(os.environ.get("RELATIONSHIP_CACHE_TIMEOUT", 300))
+
+# Seconds an authenticated user stays cached for GET requests (see
+# core.authentication). User saves invalidate it, but only in a cache shared
+# by all processes; with a per-process cache other processes see a password
+# change or deactivation after this long.
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 30))
+
+# Email digests (see interaction.services.digest): users handled per chunk,
+# each chunk's checkpoint, and how many new recipes a digest lists
+EMAIL_DIGEST = {
+    "CHUNK_SIZE": 1000,
+    "RECIPES": 5,
+}
+
+# Retention (see core.retention): days read notifications and sampled feed
+# logs are kept, and rows deleted per statement
+RETENTION = {
+    "READ_NOTIFICATION_DAYS": int(os.environ.get("READ_NOTIFICATION_DAYS", 90)),
+    "FEED_LOG_DAYS": int(os.environ.get("FEED_LOG_DAYS", 90)),
+    "BATCH_SIZE": 5000,
+}
+
+# Responsive image sizes generated on upload (see core.images); "full" is
+# also stored as the image field itself
+IMAGE_VARIANTS = {
+    "recipe": {
+        "thumbnail": {"width": 300, "square": True},
+        "card": {"width": 600},
+        "full": {"width": 1200},
+    },
+    "profile": {
+        "thumbnail": {"width": 64, "square": True},
+        "card": {"width": 160, "square": True},
+        "full": {"width": 400},
+    },
+}
+
+# Media storage backend (see core.storage): "filesystem" (MEDIA_ROOT) or
+# "s3" for an S3-compatible bucket such as AWS S3 or MinIO
+MEDIA_STORAGE = os.environ.get("MEDIA_STORAGE", "filesystem")
+DEFAULT_FILE_STORAGE = {
+    "filesystem": "core.storage.FileSystemMediaStorage",
+    "s3": "core.storage.S3MediaStorage",
+}[MEDIA_STORAGE]
+AWS_STORAGE_BUCKET_NAME = os.environ.get("MEDIA_S3_BUCKET", "")
+AWS_S3_ENDPOINT_URL = os.environ.get("MEDIA_S3_ENDPOINT_URL") or None
+AWS_S3_REGION_NAME = os.environ.get("MEDIA_S3_REGION") or None
+AWS_ACCESS_KEY_ID = os.environ.get("MEDIA_S3_ACCESS_KEY_ID") or None
+AWS_SECRET_ACCESS_KEY = os.environ.get("MEDIA_S3_SECRET_ACCESS_KEY") or None
+# "path" for MinIO and most other S3-compatible servers
+AWS_S3_ADDRESSING_STYLE = os.environ.get("MEDIA_S3_ADDRESSING_STYLE") or None
+# Public host (and path) media URLs point at, e.g. a CDN in front of the bucket
+AWS_S3_CUSTOM_DOMAIN = os.environ.get("MEDIA_S3_PUBLIC_DOMAIN") or None
+AWS_S3_SIGNATURE_VERSION = "s3v4"
+AWS_QUERYSTRING_AUTH = False
+AWS_DEFAULT_ACL = None
+
+# Direct-to-storage uploads (see core.direct_uploads): seconds a pre-signed
+# PUT URL is valid, and how long after that the upload can be claimed
+DIRECT_UPLOADS = {
+    "EXPIRES": 600,
+    "CLAIM_MAX_AGE": 3600,
+}
+
+# Image upload limits, checked from the header while the body streams in
+# (see core.uploads)
+IMAGE_UPLOADS = {
+    "MAX_BYTES": 5 * 1024 * 1024,
+    "MAX_PIXELS": 40_000_000,
+    "MAX_HEADER_BYTES": 256 * 1024,
+    "FORMATS": ["jpeg", "png", "webp"],
+}
+
+# Off-request image processing (see core.image_jobs). Per web process:
+# WORKERS pool processes (0 = inline in the request) at NICE priority, and at
+# most MAX_PENDING queued uploads before new ones get a 503.
+IMAGE_PROCESSING = {
+    "WORKERS": int(os.environ.get("IMAGE_WORKERS", 2)),
+    "MAX_PENDING": int(os.environ.get("IMAGE_MAX_PENDING", 16)),
+    "START_METHOD": "spawn",
+    "NICE": 10,
+}
+
 # CORS settings (override in production)
 CORS_ALLOWED_ORIGINS: list[str] = []
 CORS_ALLOW_CREDENTIALS = True
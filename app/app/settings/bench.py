@@ -0,0 +1,38 @@
+import os
+
+from .dev import *  # noqa: F401, F403
+
+# Settings for the server under load test (see docs/benchmarking.md).
+DEBUG = False
+
+ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
+
+# Throttling would cap the load generator, not measure the API.
+REST_FRAMEWORK.update(  # noqa: F405
+    {
+        "DEFAULT_THROTTLE_CLASSES": [],
+        "DEFAULT_THROTTLE_RATES": {
+            "anon": None,
+            "user": None,
+            "recipe_create": None,
+            "auth": None,
+        },
+    }
+)
+
+# Report per-request query counts to the load runner.
+QUERY_PROFILER.update(  # noqa: F405
+    {
+        "ENABLED": True,
+        "RESPONSE_HEADERS": True,
+        "SLOW_QUERY_MS": 250,
+    }
+)
+
+# Process uploads in the pool and sample feed logs, as production does.
+IMAGE_PROCESSING.update(  # noqa: F405
+    {"WORKERS": int(os.environ.get("IMAGE_WORKERS", 2))}
+)
+FEED_RANKING.update(  # noqa: F405
+    {"LOG_RATE": float(os.environ.get("FEED_LOG_RATE", 0.01))}
+)
@@ -34,6 +34,16 @@ REST_FRAMEWORK.update(  # noqa: F405
     }
 )
 
+# Process uploaded images inline, so the dev server and tests need no pool
+IMAGE_PROCESSING.update(  # noqa: F405
+    {"WORKERS": int(os.environ.get("IMAGE_WORKERS", 0))}
+)
+
+# Log no feed responses, so feed requests write nothing unless asked to
+FEED_RANKING.update(  # noqa: F405
+    {"LOG_RATE": float(os.environ.get("FEED_LOG_RATE", 0))}
+)
+
 # Use local memory cache for dev/testing (isolated per process)
 CACHES = {
     "default": {
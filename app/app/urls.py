@@ -1,4 +1,4 @@
-from core.views import HealthCheckView
+from core.views import DirectUploadView, HealthCheckView
 from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import (
@@ -11,7 +11,13 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("recipe.urls")),
     path("api/", include("interaction.urls")),
+    path("api/", include("taxonomy.urls")),
     path("api/auth/", include("core.urls")),
+    path(
+        "api/uploads/<str:token>/",
+        DirectUploadView.as_view(),
+        name="direct-upload",
+    ),
     path("api/health/", HealthCheckView.as_view(), name="health-check"),
     # API Documentation
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
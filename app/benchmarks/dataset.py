@@ -0,0 +1,229 @@
+"""
+Deterministic benchmark dataset.
+
+Builds users, a power-law follow graph, recipes with ingredients and tags,
+ratings, favorites and threaded comments. All benchmark users share the
+``bench-`` email prefix so a dataset can be replaced without touching other
+data.
+"""
+
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from interaction.models import Comment, Favorite, Follow, Rating
+from recipe.models import Ingredient, Recipe
+from taxonomy.models import Category, Tag
+
+EMAIL_PREFIX = "bench-"
+PASSWORD = "benchpass123"
+
+WORDS = [
+    "chicken",
+    "pasta",
+    "lemon",
+    "garlic",
+    "tomato",
+    "basil",
+    "chocolate",
+    "curry",
+    "salmon",
+    "rice",
+    "mushroom",
+    "spinach",
+    "honey",
+    "ginger",
+    "beef",
+    "tofu",
+    "apple",
+    "cinnamon",
+    "potato",
+    "cheese",
+]
+CATEGORIES = {
+    "Main Dishes": ["Pasta", "Curries", "Roasts"],
+    "Desserts": ["Cakes", "Cookies", "Pies"],
+    "Breakfast": ["Eggs", "Pancakes"],
+    "Soups": [],
+    "Salads": [],
+}
+TAGS = ["Vegetarian", "Vegan", "Quick", "Easy", "Spicy", "Gluten Free", "Healthy"]
+UNITS = [unit for unit, _ in Ingredient.UNIT_CHOICES]
+DIFFICULTIES = [difficulty for difficulty, _ in Recipe.DIFFICULTY_CHOICES]
+
+BATCH_SIZE = 1000
+
+
+def zipf_weights(n, alpha=1.1):
+    """Return power-law weights for ranks 1..n."""
+    return [1 / (rank**alpha) for rank in range(1, n + 1)]
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _sample_weighted(rng, population, weights, k):
+    """Sample up to ``k`` distinct items, biased by ``weights``."""
+    chosen = set()
+    attempts = 0
+    while len(chosen) < k and attempts < k * 4:
+        chosen.add(rng.choices(population, weights=weights)[0])
+        attempts += 1
+    return chosen
+
+
+def clear_dataset():
+    """Delete all benchmark users and everything that cascades from them."""
+    get_user_model().objects.filter(email__startswith=EMAIL_PREFIX).delete()
+
+
+@transaction.atomic
+def seed_dataset(
+    users=200,
+    recipes_per_user=5,
+    max_follows=50,
+    ratings_per_recipe=8,
+    comments_per_recipe=4,
+    seed=42,
+):
+    """
+    Create a benchmark dataset and return row counts per model.
+
+    Follow targets, recipe authorship and rating volume follow a Zipf
+    distribution so a few users dominate, as in production social graphs.
+    """
+    rng = random.Random(seed)
+    clear_dataset()
+
+    categories = []
+    for parent_name, children in CATEGORIES.items():
+        parent, _ = Category.objects.get_or_create(
+            slug=f"bench-{parent_name.lower().replace(' ', '-')}",
+            defaults={"name": parent_name},
+        )
+        categories.append(parent)
+        for child_name in children:
+            child, _ = Category.objects.get_or_create(
+                slug=f"bench-{child_name.lower()}",
+                defaults={"name": child_name, "parent": parent},
+            )
+            categories.append(child)
+    tags = [
+        Tag.objects.get_or_create(
+            slug=f"bench-{name.lower().replace(' ', '-')}",
+            defaults={"name": name},
+        )[0]
+        for name in TAGS
+    ]
+
+    password = make_password(PASSWORD)
+    user_objs = get_user_model().objects.bulk_create(
+        [
+            get_user_model()(
+                email=f"{EMAIL_PREFIX}user{i}@example.com",
+                name=f"Bench User {i}",
+                password=password,
+                is_private=rng.random() < 0.05,
+            )
+            for i in range(users)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    user_weights = zipf_weights(len(user_objs))
+
+    follows = []
+    follow_weights = zipf_weights(max_follows)
+    for user in user_objs:
+        count = rng.choices(range(1, max_follows + 1), weights=follow_weights)[0]
+        for target in _sample_weighted(rng, user_objs, user_weights, count):
+            if target.pk != user.pk:
+                follows.append(Follow(follower=user, following=target))
+    Follow.objects.bulk_create(follows, batch_size=BATCH_SIZE)
+
+    recipe_objs = []
+    authors = rng.choices(user_objs, weights=user_weights, k=users * recipes_per_user)
+    for author in authors:
+        recipe = Recipe(
+            author=author,
+            title=_sentence(rng, 3),
+            description=_sentence(rng, 12),
+            instructions=_sentence(rng, 60),
+            prep_time=rng.choice([None, 5, 10, 15, 20, 30]),
+            cook_time=rng.choice([None, 10, 20, 30, 45, 60, 90]),
+            servings=rng.randint(1, 8),
+            difficulty=rng.choice(DIFFICULTIES),
+            category=rng.choice(categories),
+            is_published=rng.random() < 0.9,
+        )
+        # bulk_create skips Recipe.save()
+        recipe.total_time = (recipe.prep_time or 0) + (recipe.cook_time or 0)
+        recipe_objs.append(recipe)
+    recipe_objs = Recipe.objects.bulk_create(recipe_objs, batch_size=BATCH_SIZE)
+
+    ingredients = []
+    recipe_tags = []
+    for recipe in recipe_objs:
+        for order in range(rng.randint(3, 10)):
+            ingredients.append(
+                Ingredient(
+                    recipe=recipe,
+                    name=rng.choice(WORDS),
+                    quantity=rng.randint(1, 500) / 4,
+                    unit=rng.choice(UNITS),
+                    order=order,
+                )
+            )
+        for tag in rng.sample(tags, rng.randint(0, 3)):
+            recipe_tags.append(Recipe.tags.through(recipe=recipe, tag=tag))
+    Ingredient.objects.bulk_create(ingredients, batch_size=BATCH_SIZE)
+    Recipe.tags.through.objects.bulk_create(recipe_tags, batch_size=BATCH_SIZE)
+
+    ratings = []
+    favorites = []
+    comments = []
+    rating_weights = zipf_weights(ratings_per_recipe * 2)
+    for recipe in recipe_objs:
+        count = rng.choices(range(ratings_per_recipe * 2), weights=rating_weights)[0]
+        raters = rng.sample(user_objs, min(count, len(user_objs)))
+        for rater in raters:
+            ratings.append(
+                Rating(user=rater, recipe=recipe, score=rng.choice([3, 4, 4, 5, 5]))
+            )
+            if rng.random() < 0.3:
+                favorites.append(Favorite(user=rater, recipe=recipe))
+        for _ in range(rng.randint(0, comments_per_recipe)):
+            comments.append(
+                Comment(
+                    user=rng.choice(user_objs),
+                    recipe=recipe,
+                    text=_sentence(rng, 10),
+                )
+            )
+    Rating.objects.bulk_create(ratings, batch_size=BATCH_SIZE)
+    Favorite.objects.bulk_create(favorites, batch_size=BATCH_SIZE)
+    comments = Comment.objects.bulk_create(comments, batch_size=BATCH_SIZE)
+
+    replies = [
+        Comment(
+            user=rng.choice(user_objs),
+            recipe_id=parent.recipe_id,
+            parent=parent,
+            text=_sentence(rng, 8),
+        )
+        for parent in comments
+        if rng.random() < 0.4
+    ]
+    Comment.objects.bulk_create(replies, batch_size=BATCH_SIZE)
+
+    return {
+        "users": len(user_objs),
+        "follows": len(follows),
+        "recipes": len(recipe_objs),
+        "ingredients": len(ingredients),
+        "recipe_tags": len(recipe_tags),
+        "ratings": len(ratings),
+        "favorites": len(favorites),
+        "comments": len(comments) + len(replies),
+    }
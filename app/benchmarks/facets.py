@@ -0,0 +1,111 @@
+"""
+Benchmark for recipe facet counts.
+
+Times ``facet_counts`` for a few typical filter sets on the current
+database, against what a client had to do before: one ``count`` per facet
+value (every category, tag, difficulty and time bucket). Use a large
+dataset, e.g. 1M recipes::
+
+    python manage.py seed_data --users 200000 --recipes-per-user 5 \\
+        --ratings-per-recipe 0 --favorites-per-recipe 0 --comments-per-recipe 0
+"""
+
+import time
+
+from benchmarks.runner import percentile
+from django.db.models import Count, Q
+from recipe.facets import (
+    TIME_BUCKETS,
+    cached_facet_counts,
+    facet_cache_key,
+    facet_counts,
+)
+from recipe.filters import RecipeFilter
+from recipe.models import Recipe
+from taxonomy.models import Category, Tag
+
+
+def _most_common(model):
+    return (
+        model.objects.annotate(n=Count("recipes"))
+        .order_by("-n")
+        .values_list("pk", flat=True)
+        .first()
+    )
+
+
+def build_cases():
+    """Return ``{name: filter params}`` for the benchmarked filter sets."""
+    word = (
+        Recipe.objects.filter(is_published=True).values_list("title", flat=True).first()
+        or "recipe"
+    ).split()[0]
+    return {
+        "all": {},
+        "category": {"category": _most_common(Category)},
+        "tag": {"tags": str(_most_common(Tag))},
+        "difficulty_time": {"difficulty": "easy", "max_time": 30},
+        "search": {"search": word},
+    }
+
+
+def _queryset(params):
+    queryset = Recipe.objects.filter(is_published=True)
+    search = params.get("search")
+    if search:
+        queryset = queryset.filter(
+            Q(title__icontains=search) | Q(description__icontains=search)
+        )
+    filters = {key: value for key, value in params.items() if key != "search"}
+    return RecipeFilter(filters, queryset=queryset).qs
+
+
+def _per_value(params):
+    """Count each facet value separately, as N list requests would."""
+    queries = []
+    for category in Category.objects.values_list("pk", flat=True):
+        queries.append({**params, "category": category})
+    for tag in Tag.objects.values_list("pk", flat=True):
+        queries.append({**params, "tags": str(tag)})
+    for difficulty, _ in Recipe.DIFFICULTY_CHOICES:
+        queries.append({**params, "difficulty": difficulty})
+    for bound in TIME_BUCKETS:
+        queries.append({**params, "max_time": bound})
+    for query in queries:
+        _queryset(query).count()
+    return len(queries)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def run(repeat=5):
+    """
+    Return per-case timings in milliseconds.
+
+    Each result is ``{"facets_p50_ms", "facets_p95_ms", "cached_ms",
+    "per_value_ms", "per_value_queries", "speedup"}``; ``cached_ms`` is a
+    hit on the facet cache entry.
+    """
+    results = {}
+    for name, params in build_cases().items():
+        samples = sorted(
+            _timed(lambda: facet_counts(_queryset(params)))[0] for _ in range(repeat)
+        )
+        key = facet_cache_key(params)
+        cached_facet_counts(key, _queryset(params))
+        cached_ms, _ = _timed(lambda: cached_facet_counts(key, _queryset(params)))
+        per_value_ms, queries = _timed(lambda: _per_value(params))
+        p50 = percentile(samples, 50)
+        results[name] = {
+            "facets_p50_ms": round(p50, 2),
+            "facets_p95_ms": round(percentile(samples, 95), 2),
+            "cached_ms": round(cached_ms, 3),
+            "per_value_ms": round(per_value_ms, 2),
+            "per_value_queries": queries,
+            "speedup": round(per_value_ms / p50, 1) if p50 else None,
+        }
+    return results
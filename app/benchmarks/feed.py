@@ -0,0 +1,101 @@
+"""
+Benchmark for the activity feed of a user following many accounts.
+
+Creates a viewer following ``follows`` users with published recipes, with
+``mutes`` of them muted, and times the first chronological page, a page
+``depth`` pages in and the first algorithmic page. The viewer is deleted
+afterwards. Use a large dataset, e.g. 1M recipes::
+
+    python manage.py seed_data --users 200000 --recipes-per-user 5 \\
+        --ratings-per-recipe 0 --favorites-per-recipe 0 --comments-per-recipe 0
+    python manage.py benchmark_feed --follows 5000
+"""
+
+import random
+import time
+
+from benchmarks.dataset import EMAIL_PREFIX
+from benchmarks.runner import percentile
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from interaction.models import Follow, Mute
+from interaction.services.feed import FeedService
+from recipe.models import Recipe
+
+VIEWER_EMAIL = f"{EMAIL_PREFIX}feed-viewer@example.com"
+
+
+def _create_viewer(follows, mutes, seed):
+    User = get_user_model()
+    User.objects.filter(email=VIEWER_EMAIL).delete()
+    viewer = User.objects.create_user(email=VIEWER_EMAIL, password=None)
+    authors = sorted(
+        set(
+            Recipe.objects.filter(is_published=True)
+            .order_by()
+            .values_list("author_id", flat=True)
+        )
+    )
+    followed = random.Random(seed).sample(authors, min(follows, len(authors)))
+    Follow.objects.bulk_create(
+        [Follow(follower=viewer, following_id=pk) for pk in followed],
+        batch_size=1000,
+    )
+    Mute.objects.bulk_create(
+        [Mute(user=viewer, muted_user_id=pk) for pk in followed[:mutes]],
+        batch_size=1000,
+    )
+    # Fresh bulk inserts have no statistics yet; a live follow graph does.
+    with connection.cursor() as cursor:
+        for model in (Follow, Mute):
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+    return viewer, len(followed)
+
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            items, _ = func()
+            samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "queries": len(queries),
+        "items": len(items),
+    }
+
+
+def run(follows=5000, mutes=500, page_size=20, depth=10, repeat=10, seed=0):
+    """
+    Return ``{"follows", "cases": {name: {"p50_ms", "p95_ms", "queries",
+    "items"}}}`` for the ``first_page``, ``deep_page`` and ``algorithmic``
+    cases.
+    """
+    viewer, followed = _create_viewer(follows, mutes, seed)
+    try:
+        cursor = None
+        for _ in range(depth):
+            _, next_cursor = FeedService.get_page(
+                viewer, limit=page_size, cursor=cursor
+            )
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+
+        cases = {
+            "first_page": lambda: FeedService.get_page(viewer, limit=page_size),
+            "deep_page": lambda: FeedService.get_page(
+                viewer, limit=page_size, cursor=cursor
+            ),
+            "algorithmic": lambda: FeedService.get_page(
+                viewer, order="algorithmic", limit=page_size
+            ),
+        }
+        results = {name: _timed(func, repeat) for name, func in cases.items()}
+    finally:
+        viewer.delete()
+    return {"follows": followed, "cases": results}
@@ -0,0 +1,70 @@
+"""
+Microbenchmark for JSON renderers.
+
+Builds recipe list, recipe detail and feed payloads from the current
+database and compares DRF's ``JSONRenderer`` with ``FastJSONRenderer``.
+"""
+
+import time
+
+from benchmarks.serializers import _feed_items, _recipes
+from core.renderers import FastJSONRenderer
+from interaction.serializers import fast_feed_item
+from recipe.models import Recipe
+from recipe.serializers import RecipeDetailSerializer, fast_recipe_list
+from rest_framework.renderers import JSONRenderer
+
+
+def _page(results):
+    return {"count": len(results), "next": None, "previous": None, "results": results}
+
+
+def build_payloads(items=100):
+    """Return ``{name: data}`` for each payload type with rows available."""
+    payloads = {}
+    recipes = _recipes(items)
+    if recipes:
+        payloads["recipe_list"] = _page(fast_recipe_list.many(recipes))
+        detailed = (
+            Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes])
+            .select_related("author")
+            .prefetch_related("ratings", "ingredients", "tags")
+        )
+        payloads["recipe_detail"] = _page(
+            RecipeDetailSerializer(detailed, many=True).data
+        )
+    feed = _feed_items(items)
+    if feed:
+        payloads["feed"] = _page(fast_feed_item.many(feed))
+    return payloads
+
+
+def _best_us(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6
+
+
+def run(items=100, repeat=50):
+    """
+    Return render time per payload for both renderers.
+
+    Each result is ``{"items", "bytes", "drf_us", "fast_us", "speedup"}``.
+    """
+    drf, fast = JSONRenderer(), FastJSONRenderer()
+    results = {}
+    for name, data in build_payloads(items).items():
+        drf_us = _best_us(lambda: drf.render(data), repeat)
+        fast_us = _best_us(lambda: fast.render(data), repeat)
+        results[name] = {
+            "items": len(data["results"]),
+            "bytes": len(fast.render(data)),
+            "drf_us": round(drf_us, 1),
+            "fast_us": round(fast_us, 1),
+            "speedup": round(drf_us / fast_us, 1) if fast_us else None,
+        }
+    return results
@@ -0,0 +1,194 @@
+"""
+Closed-loop HTTP load runner.
+
+Each virtual user is a thread with its own keep-alive connection and JWT
+that repeatedly picks a weighted scenario until the run duration elapses.
+Latency, status and the server's ``X-Query-Count`` header (sent when
+``QUERY_PROFILER["RESPONSE_HEADERS"]`` is on) are recorded per request.
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples, elapsed):
+    """Aggregate ``(latency_ms, status, queries)`` samples."""
+    latencies = sorted(sample[0] for sample in samples)
+    errors = sum(1 for sample in samples if sample[1] >= 400 or sample[1] == 0)
+    queries = [sample[2] for sample in samples if sample[2] is not None]
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else None,
+            "p50": _round(percentile(latencies, 50)),
+            "p95": _round(percentile(latencies, 95)),
+            "p99": _round(percentile(latencies, 99)),
+            "max": _round(latencies[-1] if latencies else None),
+        },
+        "queries": {
+            "avg": round(sum(queries) / len(queries), 2) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+class VirtualUser(threading.Thread):
+    """One simulated client issuing requests back to back."""
+
+    def __init__(self, runner, token, seed):
+        super().__init__(daemon=True)
+        self.runner = runner
+        self.token = token
+        self.rng = random.Random(seed)
+        self.samples = {}
+        self.connection = None
+
+    def _connect(self):
+        parts = self.runner.url_parts
+        connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection_class(parts.hostname, parts.port, timeout=30)
+
+    def _request(self, method, path, body):
+        headers = {"Accept": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self._connect()
+            try:
+                self.connection.request(method, path, payload, headers)
+                response = self.connection.getresponse()
+                response.read()
+                return response
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+    def run(self):
+        scenarios = self.runner.scenarios
+        weights = [scenario.weight for scenario in scenarios]
+        while time.perf_counter() < self.runner.deadline:
+            scenario = self.rng.choices(scenarios, weights=weights)[0]
+            path, body = scenario.build(self.runner.context, self.rng)
+            start = time.perf_counter()
+            try:
+                response = self._request(scenario.method, path, body)
+                status = response.status
+                queries = response.getheader("X-Query-Count")
+            except (http.client.HTTPException, OSError):
+                status, queries = 0, None
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.samples.setdefault(scenario.name, []).append(
+                (latency_ms, status, int(queries) if queries else None)
+            )
+        if self.connection is not None:
+            self.connection.close()
+
+
+class LoadRunner:
+    """Drive scenarios against a running server and summarize the results."""
+
+    def __init__(
+        self,
+        base_url,
+        scenarios,
+        context,
+        tokens,
+        concurrency=10,
+        duration=30,
+        seed=42,
+    ):
+        self.url_parts = urlsplit(base_url)
+        self.scenarios = scenarios
+        self.context = context
+        self.tokens = tokens or [None]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.seed = seed
+        self.deadline = 0.0
+
+    def run(self):
+        """Run the load test and return per-scenario and total summaries."""
+        users = [
+            VirtualUser(self, self.tokens[i % len(self.tokens)], self.seed + i)
+            for i in range(self.concurrency)
+        ]
+        start = time.perf_counter()
+        self.deadline = start + self.duration
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        elapsed = time.perf_counter() - start
+
+        by_scenario = {}
+        for user in users:
+            for name, samples in user.samples.items():
+                by_scenario.setdefault(name, []).extend(samples)
+        all_samples = [s for samples in by_scenario.values() for s in samples]
+
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "scenarios": {
+                name: summarize(samples, elapsed)
+                for name, samples in sorted(by_scenario.items())
+            },
+            "total": summarize(all_samples, elapsed),
+        }
+
+
+def compare_results(baseline, current, tolerance=0.10):
+    """
+    Compare two result documents scenario by scenario.
+
+    Returns rows of ``(scenario, metric, baseline, current, change,
+    regressed)`` where ``regressed`` marks p95 latency or average query
+    count growing beyond ``tolerance``, or throughput dropping beyond it.
+    """
+    rows = []
+    for name, now in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        metrics = [
+            ("p95_ms", before["latency_ms"]["p95"], now["latency_ms"]["p95"], 1),
+            ("queries", before["queries"]["avg"], now["queries"]["avg"], 1),
+            ("rps", before["throughput_rps"], now["throughput_rps"], -1),
+        ]
+        for metric, old, new, direction in metrics:
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            rows.append(
+                (name, metric, old, new, change, change * direction > tolerance)
+            )
+    return rows
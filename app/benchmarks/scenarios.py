@@ -0,0 +1,87 @@
+"""
+Scripted API scenarios for the load runner.
+
+Each scenario turns a shared context (seeded ids and the number of list
+pages) and a random generator into one request. Weights approximate the
+production mix: mostly browsing, with a small share of writes.
+"""
+
+from benchmarks.dataset import WORDS
+
+
+class Scenario:
+    """A weighted request template."""
+
+    def __init__(self, name, weight, build, method="GET"):
+        self.name = name
+        self.weight = weight
+        self.method = method
+        self._build = build
+
+    def build(self, context, rng):
+        """Return ``(path, body)`` for one request."""
+        return self._build(context, rng)
+
+
+def _browse_list(context, rng):
+    pages = list(range(1, min(context["list_pages"], 5) + 1))
+    page = rng.choices(pages, weights=[50, 20, 12, 10, 8][: len(pages)])[0]
+    return f"/api/recipes/?page={page}", None
+
+
+def _search(context, rng):
+    return f"/api/recipes/?search={rng.choice(WORDS)}", None
+
+
+def _detail(context, rng):
+    return f"/api/recipes/{rng.choice(context['recipe_ids'])}/", None
+
+
+def _feed(context, rng):
+    return "/api/feed/", None
+
+
+def _rate(context, rng):
+    recipe_id = rng.choice(context["recipe_ids"])
+    return f"/api/recipes/{recipe_id}/rate/", {"score": rng.randint(1, 5)}
+
+
+def _comment(context, rng):
+    recipe_id = rng.choice(context["recipe_ids"])
+    text = " ".join(rng.choice(WORDS) for _ in range(8))
+    return f"/api/recipes/{recipe_id}/comments/", {"text": text}
+
+
+def _profile(context, rng):
+    return f"/api/users/{rng.choice(context['user_ids'])}/", None
+
+
+SCENARIOS = [
+    Scenario("browse_list", 30, _browse_list),
+    Scenario("search", 15, _search),
+    Scenario("detail", 25, _detail),
+    Scenario("feed", 15, _feed),
+    Scenario("rate", 5, _rate, method="POST"),
+    Scenario("comment", 3, _comment, method="POST"),
+    Scenario("profile", 7, _profile),
+]
+
+
+def build_context(user_ids, recipe_ids, page_size=20):
+    """Return the shared scenario context for a seeded dataset."""
+    return {
+        "user_ids": user_ids,
+        "recipe_ids": recipe_ids,
+        "list_pages": max(1, -(-len(recipe_ids) // page_size)),
+    }
+
+
+def get_scenarios(names=None):
+    """Return all scenarios, or the named subset."""
+    if not names:
+        return list(SCENARIOS)
+    by_name = {scenario.name: scenario for scenario in SCENARIOS}
+    unknown = set(names) - set(by_name)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return [by_name[name] for name in names]
@@ -0,0 +1,92 @@
+"""
+Microbenchmark for compiled read serializers.
+
+Loads one page worth of rows per hot serializer from the current database,
+with relations prefetched so timing measures serializer CPU only, and
+compares the DRF serializer with its compiled counterpart.
+"""
+
+import time
+
+from django.db.models import prefetch_related_objects
+from interaction.models import Follow, Notification
+from interaction.serializers import (
+    FeedItemSerializer,
+    FollowSerializer,
+    NotificationSerializer,
+    fast_feed_item,
+    fast_follow,
+    fast_notification,
+)
+from interaction.services.feed import FeedService
+from recipe.models import Recipe
+from recipe.serializers import RecipeListSerializer, fast_recipe_list
+
+
+def _recipes(items):
+    return list(
+        Recipe.objects.filter(is_published=True)
+        .select_related("author")
+        .prefetch_related("ratings")[:items]
+    )
+
+
+def _feed_items(items):
+    follow = Follow.objects.select_related("follower").first()
+    if follow is None:
+        return []
+    user = follow.follower
+    feed = FeedService.get_feed(user, limit=items)
+    prefetch_related_objects([item["recipe"] for item in feed], "ratings")
+    return feed
+
+
+def _notifications(items):
+    return list(Notification.objects.select_related("actor")[:items])
+
+
+def _follows(items):
+    return list(Follow.objects.select_related("follower", "following")[:items])
+
+
+CASES = [
+    ("recipe_list", _recipes, RecipeListSerializer, fast_recipe_list),
+    ("feed_item", _feed_items, FeedItemSerializer, fast_feed_item),
+    ("notification", _notifications, NotificationSerializer, fast_notification),
+    ("follow", _follows, FollowSerializer, fast_follow),
+]
+
+
+def _best_per_item_us(func, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count * 1e6
+
+
+def run(items=100, repeat=20):
+    """
+    Return per-item CPU microseconds for each serializer pair.
+
+    Each result is ``{"items", "drf_us", "compiled_us", "speedup"}``; cases
+    with no rows in the database are omitted.
+    """
+    results = {}
+    for name, load, serializer_class, compiled in CASES:
+        rows = load(items)
+        if not rows:
+            continue
+        drf_us = _best_per_item_us(
+            lambda: serializer_class(rows, many=True).data, len(rows), repeat
+        )
+        compiled_us = _best_per_item_us(lambda: compiled.many(rows), len(rows), repeat)
+        results[name] = {
+            "items": len(rows),
+            "drf_us": round(drf_us, 2),
+            "compiled_us": round(compiled_us, 2),
+            "speedup": round(drf_us / compiled_us, 2) if compiled_us else None,
+        }
+    return results
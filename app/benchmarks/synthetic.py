@@ -0,0 +1,493 @@
+"""
+Synthetic data generation at scale.
+
+Rows are generated in fixed-size chunks, each from its own random stream
+seeded by ``(seed, kind, chunk)``, so the output depends only on the seed and
+the requested sizes, never on the number of worker processes. Tables that
+other rows point at (users, recipes, comments) get explicit primary keys from
+ranges reserved up front; leaf tables use their sequence. On PostgreSQL each
+chunk is streamed with ``COPY``, elsewhere it is written with
+``bulk_create``.
+"""
+
+import bisect
+import io
+import itertools
+import json
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.dataset import CATEGORIES, DIFFICULTIES, TAGS, UNITS, WORDS
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, connections, models
+from django.utils import timezone
+from interaction.models import (
+    Block,
+    Comment,
+    Favorite,
+    Follow,
+    Mute,
+    Notification,
+    Rating,
+)
+from recipe.models import Ingredient, Recipe
+from taxonomy.models import Category, Tag
+
+EMAIL_DOMAIN = "seed.example.com"
+PASSWORD = "benchpass123"
+TIME_SPAN = timedelta(days=365)
+
+DEFAULTS = {
+    "users": 10000,
+    "recipes_per_user": 5,
+    "follows_per_user": 30,
+    "blocks_per_user": 0.2,
+    "mutes_per_user": 0.3,
+    "ingredients_per_recipe": 6,
+    "tags_per_recipe": 2,
+    "ratings_per_recipe": 10,
+    "favorites_per_recipe": 3,
+    "comments_per_recipe": 3,
+    "notifications_per_user": 20,
+    "extra_tags": 40,
+    "seed": 42,
+    "chunk_size": 5000,
+}
+
+NOTIFICATION_VERBS = ["rated", "commented", "favorited", "posted_recipe"]
+
+
+def _powerlaw_count(rng, mean, cap):
+    """Draw a heavy-tailed count with the given mean (Pareto, alpha=2)."""
+    if mean <= 0:
+        return 0
+    return min(cap, int(mean / 2 * rng.paretovariate(2)))
+
+
+_zipf_cache = {}
+
+
+def _zipf_cum_weights(n, alpha=1.1):
+    if n not in _zipf_cache:
+        weights = (1 / (rank**alpha) for rank in range(1, n + 1))
+        _zipf_cache[n] = list(itertools.accumulate(weights))
+    return _zipf_cache[n]
+
+
+def _zipf_index(rng, n):
+    """Return an index in ``[0, n)`` where low indexes are most popular."""
+    cum = _zipf_cum_weights(n)
+    return min(bisect.bisect(cum, rng.random() * cum[-1]), n - 1)
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _after(rng, start, now):
+    """Return a random time between ``start`` and ``now``."""
+    seconds = max(0, int((now - start).total_seconds()))
+    return start + timedelta(seconds=rng.randint(0, seconds))
+
+
+def _recipe_created_at(plan, index):
+    """Recipe timestamps rise with their id, spread over ``TIME_SPAN``."""
+    fraction = (plan["recipes"] - index) / plan["recipes"]
+    return plan["now"] - TIME_SPAN * fraction
+
+
+# Generators: (rng, start, stop, plan) -> {model: [row dicts keyed by attname]}
+
+
+def _gen_users(rng, start, stop, plan):
+    rows = []
+    for i in range(start, stop):
+        user_id = plan["user_base"] + i
+        rows.append(
+            {
+                "id": user_id,
+                "email": f"bench-{user_id}@{EMAIL_DOMAIN}",
+                "name": f"{rng.choice(WORDS).capitalize()} Cook {user_id}",
+                "bio": _text(rng, rng.randint(0, 20)),
+                "password": plan["password"],
+                "is_private": rng.random() < 0.05,
+                "is_verified": rng.random() < 0.01,
+                "is_email_verified": rng.random() < 0.8,
+                "date_joined": plan["now"] - TIME_SPAN * rng.random(),
+            }
+        )
+    return {get_user_model(): rows}
+
+
+def _gen_social(rng, start, stop, plan):
+    users = plan["users"]
+    follows, blocks, mutes = [], [], []
+    cap = min(users - 1, plan["follows_per_user"] * 20)
+    for i in range(start, stop):
+        user_id = plan["user_base"] + i
+        want = _powerlaw_count(rng, plan["follows_per_user"], cap)
+        targets = set()
+        for _ in range(want * 3):
+            if len(targets) >= want:
+                break
+            target = _zipf_index(rng, users)
+            if target != i:
+                targets.add(target)
+        for target in targets:
+            follows.append(
+                {
+                    "follower_id": user_id,
+                    "following_id": plan["user_base"] + target,
+                    "created_at": plan["now"] - TIME_SPAN * rng.random(),
+                }
+            )
+
+        for rows, rate, field in (
+            (blocks, plan["blocks_per_user"], "blocked_user_id"),
+            (mutes, plan["mutes_per_user"], "muted_user_id"),
+        ):
+            picked = set()
+            while rng.random() < rate / (1 + rate) and len(picked) < 5:
+                target = rng.randrange(users)
+                if target != i and target not in targets:
+                    picked.add(target)
+            for target in picked:
+                rows.append(
+                    {
+                        "user_id": user_id,
+                        field: plan["user_base"] + target,
+                        "created_at": plan["now"] - TIME_SPAN * rng.random(),
+                    }
+                )
+    return {Follow: follows, Block: blocks, Mute: mutes}
+
+
+def _gen_recipes(rng, start, stop, plan):
+    rows = []
+    for i in range(start, stop):
+        created_at = _recipe_created_at(plan, i)
+        row = {
+            "id": plan["recipe_base"] + i,
+            "author_id": plan["user_base"] + _zipf_index(rng, plan["users"]),
+            "title": _text(rng, rng.randint(2, 5)),
+            "description": _text(rng, rng.randint(5, 30)),
+            "instructions": _text(rng, rng.randint(30, 120)),
+            "prep_time": rng.choice([None, 5, 10, 15, 20, 30, 45]),
+            "cook_time": rng.choice([None, 10, 20, 30, 45, 60, 90, 120]),
+            "servings": rng.randint(1, 12),
+            "difficulty": rng.choice(DIFFICULTIES),
+            "is_published": rng.random() < 0.9,
+            "category_id": rng.choice(plan["category_ids"]),
+            "created_at": created_at,
+            "updated_at": _after(rng, created_at, plan["now"]),
+        }
+        # Stored by Recipe.save(), which COPY and bulk_create skip
+        row["total_time"] = (row["prep_time"] or 0) + (row["cook_time"] or 0)
+        rows.append(row)
+    return {Recipe: rows}
+
+
+def _gen_recipe_children(rng, start, stop, plan):
+    users = plan["users"]
+    ingredients, recipe_tags, ratings, favorites, comments = [], [], [], [], []
+    for i in range(start, stop):
+        recipe_id = plan["recipe_base"] + i
+        created_at = _recipe_created_at(plan, i)
+
+        for order in range(
+            max(1, _powerlaw_count(rng, plan["ingredients_per_recipe"], 30))
+        ):
+            ingredients.append(
+                {
+                    "recipe_id": recipe_id,
+                    "name": rng.choice(WORDS),
+                    "quantity": Decimal(rng.randint(1, 2000)) / 4,
+                    "unit": rng.choice(UNITS),
+                    "order": order,
+                }
+            )
+
+        tag_count = min(
+            len(plan["tag_ids"]), rng.randint(0, plan["tags_per_recipe"] * 2)
+        )
+        for tag_id in rng.sample(plan["tag_ids"], tag_count):
+            recipe_tags.append({"recipe_id": recipe_id, "tag_id": tag_id})
+
+        raters = {
+            _zipf_index(rng, users)
+            for _ in range(_powerlaw_count(rng, plan["ratings_per_recipe"], users))
+        }
+        for rater in raters:
+            ratings.append(
+                {
+                    "user_id": plan["user_base"] + rater,
+                    "recipe_id": recipe_id,
+                    "score": rng.choice([1, 2, 3, 3, 4, 4, 4, 5, 5, 5]),
+                    "review": _text(rng, 12) if rng.random() < 0.2 else "",
+                    "created_at": _after(rng, created_at, plan["now"]),
+                }
+            )
+
+        fans = {
+            rng.randrange(users)
+            for _ in range(_powerlaw_count(rng, plan["favorites_per_recipe"], users))
+        }
+        for fan in fans:
+            favorites.append(
+                {
+                    "user_id": plan["user_base"] + fan,
+                    "recipe_id": recipe_id,
+                    "created_at": _after(rng, created_at, plan["now"]),
+                }
+            )
+
+        # Reserved slots per recipe: up to half top-level, half replies.
+        half = plan["comment_slots"] // 2
+        slot_base = plan["comment_base"] + i * plan["comment_slots"]
+        top_level = []
+        for n in range(rng.randint(0, half)):
+            top = {
+                "id": slot_base + n,
+                "user_id": plan["user_base"] + rng.randrange(users),
+                "recipe_id": recipe_id,
+                "text": _text(rng, rng.randint(3, 30)),
+                "parent_id": None,
+                "created_at": _after(rng, created_at, plan["now"]),
+            }
+            top_level.append(top)
+            comments.append(top)
+        for n in range(rng.randint(0, len(top_level))):
+            parent = rng.choice(top_level)
+            comments.append(
+                {
+                    "id": slot_base + half + n,
+                    "user_id": plan["user_base"] + rng.randrange(users),
+                    "recipe_id": recipe_id,
+                    "text": _text(rng, rng.randint(3, 20)),
+                    "parent_id": parent["id"],
+                    "created_at": _after(rng, parent["created_at"], plan["now"]),
+                }
+            )
+
+    return {
+        Ingredient: ingredients,
+        Recipe.tags.through: recipe_tags,
+        Rating: ratings,
+        Favorite: favorites,
+        Comment: comments,
+    }
+
+
+def _gen_notifications(rng, start, stop, plan):
+    rows = []
+    users = plan["users"]
+    for i in range(start, stop):
+        count = _powerlaw_count(rng, plan["notifications_per_user"], 1000)
+        for _ in range(count):
+            actor_id = plan["user_base"] + _zipf_index(rng, users)
+            verb = rng.choice(NOTIFICATION_VERBS + ["followed"])
+            if verb == "followed":
+                target_type, target_id = "user", actor_id
+            else:
+                target_type = "recipe"
+                target_id = plan["recipe_base"] + rng.randrange(plan["recipes"])
+            rows.append(
+                {
+                    "recipient_id": plan["user_base"] + i,
+                    "actor_id": actor_id,
+                    "verb": verb,
+                    "target_type": target_type,
+                    "target_id": target_id,
+                    "is_read": rng.random() < 0.7,
+                    "created_at": plan["now"] - TIME_SPAN * rng.random() ** 2,
+                }
+            )
+    return {Notification: rows}
+
+
+GENERATORS = {
+    "users": _gen_users,
+    "social": _gen_social,
+    "recipes": _gen_recipes,
+    "recipe_children": _gen_recipe_children,
+    "notifications": _gen_notifications,
+}
+
+# Each phase only depends on rows written by earlier phases.
+PHASES = [
+    [("users", "users")],
+    [("social", "users"), ("recipes", "recipes")],
+    [("recipe_children", "recipes"), ("notifications", "users")],
+]
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _field_default(field, now):
+    if isinstance(field, models.DateTimeField) and (
+        field.auto_now or field.auto_now_add
+    ):
+        return now
+    return field.get_default()
+
+
+def write_rows(model, rows, now, using="default"):
+    """Write row dicts keyed by attname, filling model defaults."""
+    if not rows:
+        return 0
+    provided = set(rows[0])
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if field.attname in provided or not field.primary_key
+    ]
+    defaults = {
+        field.attname: _field_default(field, now)
+        for field in fields
+        if field.attname not in provided
+    }
+
+    conn = connections[using]
+    if conn.vendor != "postgresql":
+        model.objects.using(using).bulk_create(
+            [model(**{**defaults, **row}) for row in rows], batch_size=1000
+        )
+        return len(rows)
+
+    buffer = io.StringIO()
+    for row in rows:
+        values = (row.get(f.attname, defaults.get(f.attname)) for f in fields)
+        buffer.write("\t".join(_copy_value(v) for v in values))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    table = conn.ops.quote_name(model._meta.db_table)
+    columns = ", ".join(conn.ops.quote_name(f.column) for f in fields)
+    with conn.cursor() as cursor:
+        cursor.cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", buffer)
+    return len(rows)
+
+
+def run_task(task):
+    """Generate and write one chunk; returns ``{table: rows written}``."""
+    kind, chunk, start, stop, plan = task
+    rng = random.Random(f"{plan['seed']}:{kind}:{chunk}")
+    written = {}
+    for model, rows in GENERATORS[kind](rng, start, stop, plan).items():
+        written[model._meta.db_table] = write_rows(model, rows, plan["now"])
+    return written
+
+
+def _next_id(model):
+    latest = model.objects.aggregate(latest=models.Max("pk"))["latest"]
+    return (latest or 0) + 1
+
+
+def _seed_taxonomy(extra_tags):
+    category_ids = []
+    for parent_name, children in CATEGORIES.items():
+        parent, _ = Category.objects.get_or_create(
+            slug=f"bench-{parent_name.lower().replace(' ', '-')}",
+            defaults={"name": parent_name},
+        )
+        category_ids.append(parent.pk)
+        for child_name in children:
+            child, _ = Category.objects.get_or_create(
+                slug=f"bench-{child_name.lower()}",
+                defaults={"name": child_name, "parent": parent},
+            )
+            category_ids.append(child.pk)
+
+    names = TAGS + [f"{word} {n}" for n, word in enumerate(WORDS * 5)][:extra_tags]
+    tag_ids = [
+        Tag.objects.get_or_create(
+            slug=f"bench-{name.lower().replace(' ', '-')}",
+            defaults={"name": name.title()},
+        )[0].pk
+        for name in names
+    ]
+    return category_ids, tag_ids
+
+
+def build_plan(**options):
+    """Resolve sizes and reserve primary key ranges for a run."""
+    plan = {**DEFAULTS, **{k: v for k, v in options.items() if v is not None}}
+    plan["recipes"] = plan["users"] * plan["recipes_per_user"]
+    plan["comment_slots"] = max(2, plan["comments_per_recipe"] * 4)
+    plan["now"] = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    plan["password"] = make_password(PASSWORD)
+    plan["user_base"] = _next_id(get_user_model())
+    plan["recipe_base"] = _next_id(Recipe)
+    plan["comment_base"] = _next_id(Comment)
+    plan["category_ids"], plan["tag_ids"] = _seed_taxonomy(plan["extra_tags"])
+    return plan
+
+
+def _tasks(plan, kind, entity):
+    total = plan[entity]
+    size = plan["chunk_size"]
+    for chunk, start in enumerate(range(0, total, size)):
+        yield (kind, chunk, start, min(start + size, total), plan)
+
+
+def _reset_sequences():
+    models_with_ids = [get_user_model(), Recipe, Comment]
+    sql = connection.ops.sequence_reset_sql(no_style(), models_with_ids)
+    with connection.cursor() as cursor:
+        for statement in sql:
+            cursor.execute(statement)
+
+
+def generate(plan, workers=1, progress=None):
+    """
+    Run all phases and return ``{table: rows written}``.
+
+    With ``workers > 1`` chunks are written by a forked process pool, each
+    process on its own database connection; otherwise everything runs on the
+    current connection (and inside any open transaction).
+    """
+    totals = {}
+    pool = None
+    if workers > 1:
+        connections.close_all()
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        )
+    try:
+        for phase in PHASES:
+            tasks = [t for kind, entity in phase for t in _tasks(plan, kind, entity)]
+            results = pool.map(run_task, tasks) if pool else map(run_task, tasks)
+            for written in results:
+                for table, count in written.items():
+                    totals[table] = totals.get(table, 0) + count
+            if progress:
+                progress([kind for kind, _ in phase], totals)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    _reset_sequences()
+    return totals
@@ -0,0 +1,157 @@
+"""
+Benchmark for the image upload pipeline.
+
+Runs multipart uploads through Django's request parsing, validation and
+variant building, once as before ``core.uploads`` (buffer the whole body,
+``Image.verify()``, re-open to check the format, re-open and fully decode to
+process) and once through ``ImageUploadHandler``, ``ImageUploadField`` and
+``build_variants`` on the handle they pass along.
+
+Each measurement runs in a forked child so the peak RSS growth it reports
+belongs to that upload alone; Pillow allocates pixel buffers outside the
+Python heap, where ``tracemalloc`` cannot see them.
+"""
+
+import multiprocessing
+import os
+import resource
+import time
+from io import BytesIO
+
+from core.images import _build, build_variants
+from core.uploads import ImageUploadField, ImageUploadHandler
+from django import forms
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory
+from PIL import Image, ImageOps
+
+UPLOAD_URL = "/api/recipes/1/upload-image/"
+
+
+def _photo(width, height):
+    """A JPEG with enough detail to compress like a photo."""
+    noise = Image.effect_noise((width // 4, height // 4), 64).resize((width, height))
+    gradient = Image.linear_gradient("L").resize((width, height))
+    img = Image.merge("RGB", (noise, gradient, noise.transpose(Image.FLIP_LEFT_RIGHT)))
+    output = BytesIO()
+    img.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def _bomb(width, height):
+    """A PNG that is tiny on the wire but huge once decoded."""
+    output = BytesIO()
+    Image.new("L", (width, height)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def _oversized(size):
+    """A JPEG header followed by ``size`` bytes of padding."""
+    return _photo(64, 64) + os.urandom(size)
+
+
+def build_cases(scale=1.0):
+    """Return ``{name: bytes}`` for a photo, a pixel bomb and an oversized file."""
+    conf = settings.IMAGE_UPLOADS
+    bomb_side = int((conf["MAX_PIXELS"] * 2.4) ** 0.5)
+    return {
+        "photo": _photo(int(4000 * scale), int(3000 * scale)),
+        "bomb": _bomb(bomb_side, bomb_side),
+        "oversized": _oversized(conf["MAX_BYTES"] * 2),
+    }
+
+
+def _request(data):
+    upload = SimpleUploadedFile("upload.jpg", data, content_type="image/jpeg")
+    return RequestFactory().post(UPLOAD_URL, {"image": upload})
+
+
+def _legacy(request):
+    """The pre-``core.uploads`` pipeline; returns True when accepted."""
+    upload = request.FILES["image"]
+    try:
+        # DRF's ImageField: Image.open() + verify() on the whole file
+        forms.ImageField().clean(upload)
+        # validate_image: size check after buffering, then re-open
+        if upload.size > settings.IMAGE_UPLOADS["MAX_BYTES"]:
+            return False
+        upload.seek(0)
+        if Image.open(upload).format.lower() not in ("jpeg", "png", "webp"):
+            return False
+    except forms.ValidationError:
+        return False
+    # Full-size decode plus the upright copy exif_transpose always made
+    upload.seek(0)
+    img = ImageOps.exif_transpose(Image.open(upload))
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    _build(img, settings.IMAGE_VARIANTS["recipe"])
+    return True
+
+
+def _streaming(request):
+    """The ``core.uploads`` pipeline; returns True when accepted."""
+    request.upload_handlers.insert(0, ImageUploadHandler(request))
+    upload = request.FILES.get("image")
+    if request.image_upload_errors or upload is None:
+        return False
+    try:
+        upload = ImageUploadField().to_internal_value(upload)
+    except Exception:
+        return False
+    build_variants(upload, "recipe")
+    return True
+
+
+PIPELINES = {"legacy": _legacy, "streaming": _streaming}
+
+
+def _measure(pipeline, data, repeat, conn):
+    # Request bodies are built up front; only parsing onwards is measured.
+    requests = [_request(data) for _ in range(repeat)]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    best, accepted = None, None
+    while requests:
+        # Popped so each upload (and its decoded pixels) is freed after use.
+        request = requests.pop()
+        start = time.perf_counter()
+        accepted = PIPELINES[pipeline](request)
+        del request
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.send((best, (peak - baseline) / 1024, accepted))
+    conn.close()
+
+
+def measure(pipeline, data, repeat=3):
+    """Return ``(best_ms, peak_rss_growth_mb, accepted)`` from a forked child."""
+    ctx = multiprocessing.get_context("fork")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_measure, args=(pipeline, data, repeat, child))
+    process.start()
+    child.close()
+    best, rss_mb, accepted = parent.recv()
+    process.join()
+    return best * 1000, rss_mb, accepted
+
+
+def run(repeat=3, scale=1.0):
+    """
+    Return per-case results for both pipelines.
+
+    Each result is ``{"bytes", "<pipeline>": {"ms", "rss_mb", "accepted"}}``.
+    """
+    results = {}
+    for name, data in build_cases(scale).items():
+        row = {"bytes": len(data)}
+        for pipeline in PIPELINES:
+            ms, rss_mb, accepted = measure(pipeline, data, repeat)
+            row[pipeline] = {
+                "ms": round(ms, 2),
+                "rss_mb": round(rss_mb, 1),
+                "accepted": accepted,
+            }
+        results[name] = row
+    return results
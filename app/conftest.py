@@ -0,0 +1,14 @@
+import pytest
+from core.profiling import query_budget as _query_budget
+
+
+@pytest.fixture
+def query_budget(db):
+    """
+    Assert a query budget for a block of test code.
+
+        def test_list(client, query_budget):
+            with query_budget(5):
+                client.get("/api/recipes/")
+    """
+    return _query_budget
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        from core.authentication import user_changed
+        from core.media import track_media
+        from core.models import User
+        from django.db.models.signals import post_delete, post_save
+
+        track_media(User, "profile_photo")
+        post_save.connect(user_changed, sender=User)
+        post_delete.connect(user_changed, sender=User)
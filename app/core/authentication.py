@@ -0,0 +1,82 @@
+"""
+JWT authentication that reads the user from the cache on safe requests.
+
+simplejwt's ``JWTAuthentication`` loads the user row on every request. Most
+requests are reads (feed, notification polls, recipe lists), so
+``CachedJWTAuthentication`` keeps the user for ``AUTH_USER_CACHE_TIMEOUT``
+seconds and answers GET, HEAD and OPTIONS from it. Requests that may write
+still load the row, so a cached instance is never saved over a newer one.
+
+Each cached user is stored with the user's version, a counter in its own key
+that every ``User`` save or delete bumps (profile edits, password changes,
+deactivation). An entry whose version is not the current one is reloaded.
+The counter is bumped right away and again once the transaction commits, so
+a request that read the old row in between cannot cache it as current. Only
+active users are cached, as simplejwt rejects inactive ones.
+
+Changes reach other processes only through a shared cache; with a
+per-process cache they see them after the timeout.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+USER_KEY = "auth:user:{}"
+VERSION_KEY = "auth:user:{}:version"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` reading the user through the cache when safe."""
+
+    def authenticate(self, request):
+        # DRF creates authenticators per request, so this is per request too.
+        self.use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if not getattr(self, "use_cache", False) or user_id is None:
+            return super().get_user(validated_token)
+
+        user_key, version_key = USER_KEY.format(user_id), VERSION_KEY.format(user_id)
+        found = cache.get_many([user_key, version_key])
+        version = found.get(version_key, 0)
+        entry = found.get(user_key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        user = super().get_user(validated_token)
+        cache.set(user_key, (version, user), settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document ``CachedJWTAuthentication`` like simplejwt's class."""
+
+    target_class = CachedJWTAuthentication
+
+
+def _bump(user_id):
+    key = VERSION_KEY.format(user_id)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted since the add; drop the entry instead
+        cache.delete(USER_KEY.format(user_id))
+
+
+def invalidate_user(user_id):
+    """Make the cached user of ``user_id`` stale, now and after commit."""
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def user_changed(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for users."""
+    invalidate_user(instance.pk)
@@ -0,0 +1,127 @@
+"""
+Direct-to-storage image uploads.
+
+Instead of sending the image through the API, a client asks for an upload
+URL, PUTs the bytes straight to storage (the S3 bucket, or
+``DirectUploadView`` on the filesystem backend) and then submits the
+returned ``upload`` token where it would have sent the file::
+
+    POST /api/recipes/1/upload-url/  {"content_type": "image/jpeg"}
+    -> {"upload": "<token>", "method": "PUT", "url": "...", "headers": {...}}
+    PUT <url>  (image bytes, with the given headers)
+    POST /api/recipes/1/upload-image/  {"upload": "<token>"}
+
+The token is signed and names the instance and field it was issued for, so
+it cannot be replayed against another object. Claiming it checks the stored
+object's size and header (a ranged read of ``MAX_HEADER_BYTES``) against
+``settings.IMAGE_UPLOADS`` before the image is queued for processing; the
+web process never receives the body.
+"""
+
+from io import BytesIO
+
+from core.image_jobs import original_path
+from core.uploads import (
+    InvalidImage,
+    check_format,
+    check_size,
+    open_image,
+    sniff_format,
+)
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+SALT = "core.direct_uploads"
+
+# Content type -> extension of the stored original
+CONTENT_TYPES = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+
+
+def _target(instance, field_name):
+    return [instance._meta.label_lower, str(instance.pk), field_name]
+
+
+def start_upload(request, instance, field_name, content_type):
+    """
+    Reserve a storage name for a new ``instance.<field_name>`` image.
+
+    ``content_type`` must be one of ``CONTENT_TYPES``. Returns the response
+    body for the upload-URL endpoints.
+    """
+    expires = settings.DIRECT_UPLOADS["EXPIRES"]
+    name = original_path(instance, field_name, CONTENT_TYPES[content_type])
+    url = default_storage.presigned_put(name, content_type, expires, request)
+    token = signing.dumps(
+        {"name": name, "target": _target(instance, field_name)}, salt=SALT
+    )
+    return {
+        "upload": token,
+        "method": "PUT",
+        "url": url,
+        "headers": {"Content-Type": content_type},
+        "expires_in": expires,
+    }
+
+
+def claim_upload(token, instance, field_name):
+    """
+    Validate the object uploaded for ``token`` and return its storage name.
+
+    Raises ``InvalidImage``; an object that fails validation is deleted.
+    """
+    try:
+        data = signing.loads(
+            token, salt=SALT, max_age=settings.DIRECT_UPLOADS["CLAIM_MAX_AGE"]
+        )
+    except signing.SignatureExpired:
+        raise InvalidImage("Upload token has expired.")
+    except signing.BadSignature:
+        raise InvalidImage("Invalid upload token.")
+    if data["target"] != _target(instance, field_name):
+        raise InvalidImage("Invalid upload token.")
+
+    name = data["name"]
+    if not default_storage.exists(name):
+        raise InvalidImage("No file has been uploaded for this token.")
+    conf = settings.IMAGE_UPLOADS
+    try:
+        check_size(default_storage.size(name), conf)
+        head = default_storage.read_head(name, conf["MAX_HEADER_BYTES"])
+        check_format(sniff_format(head), conf)
+        open_image(BytesIO(head), conf)
+    except InvalidImage:
+        default_storage.delete(name)
+        raise
+    return name
+
+
+class UploadURLSerializer(serializers.Serializer):
+    """Request body of the upload-URL endpoints."""
+
+    content_type = serializers.ChoiceField(choices=list(CONTENT_TYPES))
+
+
+class DirectUploadField(serializers.CharField):
+    """
+    Write-only upload token for ``<instance>.<image_field>``.
+
+    Validates to the storage name of the uploaded original.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs.setdefault("write_only", True)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        token = super().to_internal_value(data)
+        try:
+            return claim_upload(token, self.parent.instance, self.image_field)
+        except InvalidImage as exc:
+            raise serializers.ValidationError(str(exc))
@@ -0,0 +1,265 @@
+"""
+Off-request image processing.
+
+An upload is written to storage unchanged under ``<upload_to>originals/``
+and the model is marked ``pending`` in ``<field>_status``, with the
+original's path in ``<field>_source``. Decoding, EXIF stripping, resizing
+and encoding (``core.images.render_variants``) then run in a small local
+process pool; when a job finishes, the variants are stored and the status
+becomes ``ready`` (or ``failed``). The original is deleted either way.
+Direct uploads (``core.direct_uploads``) are already in storage and enter
+through ``submit_stored``; the original is read on a loader thread, so with
+the S3 backend the bytes never touch a request.
+
+``settings.IMAGE_PROCESSING`` bounds the work per web process:
+
+- ``WORKERS``: pool size. Workers run at a lower priority (``NICE``), so a
+  burst of uploads cannot starve request handling of CPU. ``0`` processes
+  uploads inline in the request, as tests do.
+- ``MAX_PENDING``: jobs queued or running at once. Further uploads are
+  rejected with 503 and ``Retry-After`` rather than queued without bound.
+  A job takes its slot when its transaction commits, so an upload whose
+  transaction rolls back never holds one.
+
+A job only applies its result while ``<field>_source`` still names its
+original, so a newer upload always wins over a slower, older one.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from core.images import build_variants, render_variants, store_variants
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+STATUS_CHOICES = [
+    (PENDING, "Pending"),
+    (READY, "Ready"),
+    (FAILED, "Failed"),
+]
+
+
+class ImageQueueFull(APIException):
+    """Raised when ``MAX_PENDING`` images are already being processed."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many images are being processed. Try again shortly."
+    default_code = "image_queue_full"
+    # Sent as Retry-After by DRF's exception handler.
+    wait = 5
+
+
+def _init_worker(nice):
+    if nice:
+        os.nice(nice)
+
+
+def original_path(instance, field_name, ext):
+    """Return a fresh storage name for an unprocessed upload."""
+    upload_to = getattr(instance, field_name).field.upload_to
+    return os.path.join(upload_to, "originals", f"{uuid.uuid4().hex}{ext}")
+
+
+class ImageProcessor:
+    """Submit uploads for processing and apply the results."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._loader = None
+        self._in_flight = 0
+
+    def submit(self, instance, field_name, upload, kind):
+        """
+        Process ``upload`` for ``instance.<field_name>``.
+
+        Inline when ``WORKERS`` is 0; otherwise stores the original, marks
+        the instance pending and queues the job once the surrounding
+        transaction commits. Raises ``ImageQueueFull`` when saturated.
+        """
+        conf = settings.IMAGE_PROCESSING
+        if not conf["WORKERS"]:
+            self._process_inline(instance, field_name, upload, kind)
+            return
+
+        self._check_capacity(conf["MAX_PENDING"])
+        ext = os.path.splitext(upload.name)[1].lower()
+        source = default_storage.save(original_path(instance, field_name, ext), upload)
+        self._mark_pending(instance, field_name, source)
+        self._queue(instance, field_name, source, kind)
+
+    def submit_stored(self, instance, field_name, source, kind):
+        """
+        Process an original already in storage at ``source``.
+
+        Used for direct uploads; the web process never reads the bytes
+        unless processing is inline.
+        """
+        conf = settings.IMAGE_PROCESSING
+        if not conf["WORKERS"]:
+            with default_storage.open(source) as original:
+                self._process_inline(instance, field_name, original, kind)
+            default_storage.delete(source)
+            return
+
+        self._check_capacity(conf["MAX_PENDING"])
+        self._mark_pending(instance, field_name, source)
+        self._queue(instance, field_name, source, kind)
+
+    def shutdown(self, wait=True):
+        """Stop the pools; with ``wait``, after all queued jobs are applied."""
+        with self._lock:
+            loader, self._loader = self._loader, None
+        if loader is not None:
+            loader.shutdown(wait=wait)
+        self._reset_pool(wait=wait)
+
+    def _process_inline(self, instance, field_name, upload, kind):
+        status_field, source_field = f"{field_name}_status", f"{field_name}_source"
+        setattr(instance, status_field, READY)
+        setattr(instance, source_field, "")
+        built = build_variants(upload, kind)
+        store_variants(
+            instance, field_name, built, update_fields=[status_field, source_field]
+        )
+
+    def _mark_pending(self, instance, field_name, source):
+        status_field, source_field = f"{field_name}_status", f"{field_name}_source"
+        setattr(instance, status_field, PENDING)
+        setattr(instance, source_field, source)
+        instance.save(update_fields=[status_field, source_field])
+
+    def _queue(self, instance, field_name, source, kind):
+        job = (type(instance), instance.pk, field_name, source)
+        transaction.on_commit(partial(self._dispatch, job, kind))
+
+    def _check_capacity(self, limit):
+        with self._lock:
+            if self._in_flight >= limit:
+                raise ImageQueueFull()
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _reset_pool(self, wait=False):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                conf = settings.IMAGE_PROCESSING
+                self._executor = ProcessPoolExecutor(
+                    max_workers=conf["WORKERS"],
+                    mp_context=multiprocessing.get_context(conf["START_METHOD"]),
+                    initializer=_init_worker,
+                    initargs=(conf["NICE"],),
+                )
+            return self._executor
+
+    def _dispatch(self, job, kind):
+        # Runs on commit, so the slot is only taken by a job that will
+        # finish and release it. Reading the original (possibly from S3)
+        # happens off the request.
+        with self._lock:
+            self._in_flight += 1
+            if self._loader is None:
+                self._loader = ThreadPoolExecutor(
+                    max_workers=settings.IMAGE_PROCESSING["WORKERS"],
+                    thread_name_prefix="image-load",
+                )
+            loader = self._loader
+        try:
+            loader.submit(self._load, job, kind)
+        except Exception:
+            self._release()
+            raise
+
+    def _load(self, job, kind):
+        source = job[3]
+        try:
+            with default_storage.open(source) as original:
+                data = original.read()
+            future = self._get_executor().submit(
+                render_variants, data, settings.IMAGE_VARIANTS[kind]
+            )
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool):
+                self._reset_pool()
+            logger.exception("Failed to queue image %s", source)
+            try:
+                self._finish(job, None)
+            finally:
+                connection.close()
+            return
+        future.add_done_callback(partial(self._complete, job))
+
+    def _complete(self, job, future):
+        try:
+            built = future.result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool.
+            self._reset_pool()
+            logger.exception("Image worker died processing %s", job[3])
+            built = None
+        except Exception:
+            logger.exception("Image processing failed for %s", job[3])
+            built = None
+        try:
+            self._finish(job, built)
+        finally:
+            # Runs on a pool thread; don't leak its connection.
+            connection.close()
+
+    def _finish(self, job, built):
+        model, pk, field_name, source = job
+        status_field, source_field = f"{field_name}_status", f"{field_name}_source"
+        try:
+            with transaction.atomic():
+                instance = (
+                    model.objects.select_for_update()
+                    .filter(pk=pk, **{source_field: source})
+                    .first()
+                )
+                if instance is None:
+                    # Deleted, or superseded by a newer upload.
+                    return
+                setattr(instance, source_field, "")
+                if built is None:
+                    setattr(instance, status_field, FAILED)
+                    instance.save(update_fields=[status_field, source_field])
+                else:
+                    setattr(instance, status_field, READY)
+                    store_variants(
+                        instance,
+                        field_name,
+                        built,
+                        update_fields=[status_field, source_field],
+                    )
+            if hasattr(instance, "touch"):
+                instance.touch()
+        except Exception:
+            logger.exception("Failed to store processed image %s", source)
+        finally:
+            self._release()
+            default_storage.delete(source)
+
+
+image_processor = ImageProcessor()
@@ -0,0 +1,209 @@
+"""
+Responsive image variants.
+
+Uploads are decoded once and re-encoded as a square ``thumbnail`` plus
+width-capped ``card`` and ``full`` sizes, each in WebP and JPEG. The paths
+are stored next to the image field in a ``<field>_variants`` JSON field::
+
+    {"card": {"width": 600, "height": 400,
+              "webp": "cas/3f/a9/3fa9...e1.webp",
+              "jpeg": "cas/50/0c/500c...7d.jpg"}, ...}
+
+Files are content-addressed and reference counted, see ``core.media``.
+The full-size JPEG is the image field's own file, so existing clients that
+only read ``image`` keep working. Serializers expose the variants as URLs
+through ``ImageVariantsField``. Uploads are normally processed off-request
+by ``core.image_jobs``.
+"""
+
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+# format key -> (Pillow format, file extension, save options)
+FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+
+# EXIF Orientation tag; values 5-8 swap width and height.
+_ORIENTATION = 0x0112
+
+
+def _draft(img, specs, orientation):
+    """Let JPEG decode straight to the smallest scale every size still fits."""
+    width, height = img.size
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+    need_w = need_h = 1
+    for spec in specs.values():
+        if spec.get("square"):
+            need_w, need_h = max(need_w, spec["width"]), max(need_h, spec["width"])
+        else:
+            need_w = max(need_w, spec["width"])
+            need_h = max(need_h, -(-spec["width"] * height // width))
+    if orientation in (5, 6, 7, 8):
+        need_w, need_h = need_h, need_w
+    img.draft(img.mode, (need_w, need_h))
+
+
+def _open(upload, specs):
+    """
+    Decode ``upload`` upright and in a mode both formats can store.
+
+    Reuses the unread handle ``ImageUploadField`` left on ``upload.image``.
+    Before decoding, JPEGs are set to decode at a reduced scale when the
+    largest size allows it, and the upright copy is only made when the EXIF
+    orientation asks for one.
+    """
+    # Take the handle, so decoded pixels don't live as long as the request.
+    img, upload.image = getattr(upload, "image", None), None
+    if getattr(img, "fp", None) is None:
+        # No handle from ImageUploadField, or one Image.verify() used up.
+        upload.seek(0)
+        img = Image.open(upload)
+    orientation = img.getexif().get(_ORIENTATION, 1)
+    _draft(img, specs, orientation)
+    if orientation != 1:
+        img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    return img
+
+
+def _resize(img, width, square=False):
+    if square:
+        side = min(img.size)
+        left = (img.width - side) // 2
+        top = (img.height - side) // 2
+        img = img.crop((left, top, left + side, top + side))
+        if side > width:
+            img = img.resize((width, width), Image.Resampling.LANCZOS)
+        return img
+    if img.width > width:
+        height = max(1, round(img.height * width / img.width))
+        img = img.resize((width, height), Image.Resampling.LANCZOS)
+    return img
+
+
+def _encode(img, fmt):
+    pil_format, _, options = FORMATS[fmt]
+    output = BytesIO()
+    # Nothing from the source's info (EXIF, GPS, ICC) is passed on.
+    img.save(output, format=pil_format, **options)
+    return output.getvalue()
+
+
+def _build(source, specs):
+    variants = {}
+    for name, spec in sorted(specs.items(), key=lambda item: -item[1]["width"]):
+        img = _resize(source, spec["width"], spec.get("square", False))
+        if not spec.get("square"):
+            source = img
+        variants[name] = {"width": img.width, "height": img.height}
+        for fmt in FORMATS:
+            variants[name][fmt] = _encode(img, fmt)
+    return variants
+
+
+def build_variants(upload, kind):
+    """
+    Return ``{name: {"width", "height", <fmt>: bytes}}`` for an upload.
+
+    ``kind`` selects the size table in ``settings.IMAGE_VARIANTS``. Each
+    size is resized from the next larger one rather than the original.
+    """
+    specs = settings.IMAGE_VARIANTS[kind]
+    return _build(_open(upload, specs), specs)
+
+
+def render_variants(data, specs):
+    """
+    ``build_variants`` for raw image bytes and an explicit size table.
+
+    Touches neither settings nor storage, so it can run in a worker process.
+    """
+    return _build(_open(BytesIO(data), specs), specs)
+
+
+def variant_paths(variants):
+    """Return every stored path referenced by a variants dict."""
+    return {
+        variant[fmt]
+        for variant in (variants or {}).values()
+        for fmt in FORMATS
+        if variant.get(fmt)
+    }
+
+
+def store_variants(instance, field_name, built, update_fields=()):
+    """
+    Store ``build_variants`` output on ``instance.<field_name>``.
+
+    Files go to content-addressed storage (``core.media``); the full-size
+    JPEG becomes the field's file. Saves the two fields plus
+    ``update_fields``, then releases the files previously referenced.
+    """
+    # core.media needs the app registry; render_variants runs without it.
+    from core import media
+
+    variants = {}
+    stored = set()
+    for name, built_variant in built.items():
+        variant = {"width": built_variant["width"], "height": built_variant["height"]}
+        for fmt, (_, ext, _) in FORMATS.items():
+            data = built_variant[fmt]
+            path = media.content_path(data, ext)
+            if path not in stored:
+                # One reference per instance, even if two sizes come out equal.
+                media.put(data, ext)
+                stored.add(path)
+            variant[fmt] = path
+        variants[name] = variant
+
+    previous = media.field_paths(instance, field_name)
+    setattr(instance, field_name, variants["full"]["jpeg"])
+    setattr(instance, f"{field_name}_variants", variants)
+    instance.save(update_fields=[field_name, f"{field_name}_variants", *update_fields])
+    media.release(previous)
+    return variants
+
+
+def save_with_variants(instance, field_name, upload, kind, update_fields=()):
+    """Build and store ``upload`` with all its variants in the request."""
+    built = build_variants(upload, kind)
+    return store_variants(instance, field_name, built, update_fields)
+
+
+def variant_urls(variants, request=None):
+    """Return the variants dict with storage paths replaced by URLs."""
+    result = {}
+    for name, variant in (variants or {}).items():
+        entry = {"width": variant["width"], "height": variant["height"]}
+        for fmt in FORMATS:
+            path = variant.get(fmt)
+            if path:
+                url = default_storage.url(path)
+                entry[fmt] = request.build_absolute_uri(url) if request else url
+        result[name] = entry
+    return result
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Read-only ``srcset``-style view of a ``<field>_variants`` JSON field.
+
+    Renders ``{name: {"width", "height", "webp", "jpeg"}}`` with absolute
+    URLs when the request is in the serializer context.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get("request"))
@@ -0,0 +1,47 @@
+from core import retention
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Delete expired tokens, old read notifications, feed logs and JWT records."""
+
+    help = (
+        "Delete rows past their retention policy in small batches, each in "
+        "its own transaction. Safe to run from cron while the app is serving."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "policies",
+            nargs="*",
+            help=f"Policies to apply (default all): {', '.join(retention.POLICIES)}.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows per delete (default RETENTION setting).",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        names = options["policies"] or list(retention.POLICIES)
+        unknown = set(names) - set(retention.POLICIES)
+        if unknown:
+            raise CommandError(f"Unknown policies: {', '.join(sorted(unknown))}")
+        if options["dry_run"]:
+            for name in names:
+                self.stdout.write(
+                    f"{name}: would delete {retention.count(name)} row(s)"
+                )
+            return
+
+        self.stdout.write(
+            f"{'policy':<27}{'rows':>10}{'related':>9}{'batches':>9}{'seconds':>9}"
+        )
+        for name in names:
+            report = retention.purge(name, batch_size=options["batch_size"])
+            self.stdout.write(
+                f"{name:<27}{report['rows']:>10}{report['related']:>9}"
+                f"{report['batches']:>9}{report['seconds']:>9.2f}"
+            )
@@ -0,0 +1,161 @@
+import json
+import subprocess
+from datetime import datetime, timezone
+
+from benchmarks import dataset
+from benchmarks.runner import LoadRunner, compare_results
+from benchmarks.scenarios import build_context, get_scenarios
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from recipe.models import Recipe
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Seed a benchmark dataset and load test a running API server."""
+
+    help = (
+        "Run scripted API scenarios against a local server and report "
+        "throughput, latency percentiles and query counts per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument("--duration", type=float, default=30)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--scenarios",
+            default="",
+            help="Comma-separated scenario names (default: all).",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--recipes-per-user", type=int, default=5)
+        parser.add_argument(
+            "--skip-seed",
+            action="store_true",
+            help="Reuse the existing benchmark dataset.",
+        )
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument(
+            "--compare",
+            help="Baseline results JSON; fail if any scenario regressed.",
+        )
+        parser.add_argument("--tolerance", type=float, default=0.10)
+
+    def handle(self, *args, **options):
+        names = [n.strip() for n in options["scenarios"].split(",") if n.strip()]
+        try:
+            scenarios = get_scenarios(names)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        if options["skip_seed"]:
+            counts = None
+        else:
+            self.stdout.write("Seeding benchmark dataset...")
+            counts = dataset.seed_dataset(
+                users=options["users"],
+                recipes_per_user=options["recipes_per_user"],
+                seed=options["seed"],
+            )
+            self.stdout.write(", ".join(f"{k}={v}" for k, v in counts.items()))
+
+        users = list(
+            get_user_model()
+            .objects.filter(email__startswith=dataset.EMAIL_PREFIX)
+            .order_by("pk")
+        )
+        if not users:
+            raise CommandError("No benchmark users found; run without --skip-seed.")
+        recipe_ids = list(
+            Recipe.objects.filter(
+                author__email__startswith=dataset.EMAIL_PREFIX, is_published=True
+            ).values_list("pk", flat=True)
+        )
+        context = build_context([u.pk for u in users], recipe_ids)
+        tokens = [
+            str(RefreshToken.for_user(user).access_token)
+            for user in users[: options["concurrency"]]
+        ]
+
+        self.stdout.write(
+            f"Running {len(scenarios)} scenarios for {options['duration']}s "
+            f"with {options['concurrency']} virtual users..."
+        )
+        runner = LoadRunner(
+            options["base_url"],
+            scenarios,
+            context,
+            tokens,
+            concurrency=options["concurrency"],
+            duration=options["duration"],
+            seed=options["seed"],
+        )
+        results = runner.run()
+        results["meta"] = {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": options["base_url"],
+            "concurrency": options["concurrency"],
+            "duration_s": options["duration"],
+            "seed": options["seed"],
+            "dataset": counts,
+        }
+
+        self._print_table(results)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                baseline = json.load(f)
+            self._check_regressions(baseline, results, options["tolerance"])
+
+    def _print_table(self, results):
+        header = (
+            f"{'scenario':<14}{'reqs':>8}{'err':>6}{'rps':>9}"
+            f"{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}"
+        )
+        self.stdout.write(header)
+        rows = list(results["scenarios"].items()) + [("TOTAL", results["total"])]
+        for name, summary in rows:
+            latency = summary["latency_ms"]
+            queries = summary["queries"]["avg"]
+            self.stdout.write(
+                f"{name:<14}{summary['requests']:>8}{summary['errors']:>6}"
+                f"{summary['throughput_rps']:>9.1f}"
+                f"{latency['p50'] or 0:>9.1f}{latency['p95'] or 0:>9.1f}"
+                f"{latency['p99'] or 0:>9.1f}"
+                f"{'-' if queries is None else f'{queries:.1f}':>9}"
+            )
+
+    def _check_regressions(self, baseline, results, tolerance):
+        rows = compare_results(baseline, results, tolerance)
+        regressions = [row for row in rows if row[5]]
+        for name, metric, old, new, change, regressed in rows:
+            line = f"{name:<14}{metric:<9}{old:>10.2f} -> {new:>10.2f} ({change:+.1%})"
+            if regressed:
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} metric(s) regressed beyond {tolerance:.0%}."
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
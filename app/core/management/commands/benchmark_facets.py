@@ -0,0 +1,43 @@
+import json
+
+from benchmarks import facets
+from django.core.management.base import BaseCommand, CommandError
+from recipe.models import Recipe
+
+
+class Command(BaseCommand):
+    """Time recipe facet counts on existing data."""
+
+    help = (
+        "Measure facet count latency for typical filter sets against one "
+        "count query per facet value. Run seed_data first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.filter(is_published=True).count()
+        if not recipes:
+            raise CommandError("No published recipes; seed a dataset first.")
+
+        results = facets.run(repeat=options["repeat"])
+
+        self.stdout.write(f"{recipes:,} published recipes")
+        self.stdout.write(
+            f"{'case':<17}{'p50 ms':>10}{'p95 ms':>10}{'cached ms':>11}"
+            f"{'per-value ms':>14}{'queries':>9}{'speedup':>9}"
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<17}{row['facets_p50_ms']:>10.1f}{row['facets_p95_ms']:>10.1f}"
+                f"{row['cached_ms']:>11.2f}"
+                f"{row['per_value_ms']:>14.1f}{row['per_value_queries']:>9}"
+                f"{row['speedup']:>8.1f}x"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump({"recipes": recipes, "results": results}, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
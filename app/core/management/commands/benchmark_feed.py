@@ -0,0 +1,53 @@
+import json
+
+from benchmarks import feed
+from django.core.management.base import BaseCommand, CommandError
+from recipe.models import Recipe
+
+
+class Command(BaseCommand):
+    """Time the activity feed for a user following many accounts."""
+
+    help = (
+        "Measure feed page latency and query counts for a throwaway viewer "
+        "following many users. Run seed_data first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--follows", type=int, default=5000)
+        parser.add_argument("--mutes", type=int, default=500)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument(
+            "--depth", type=int, default=10, help="Pages in for the deep page."
+        )
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        if not Recipe.objects.filter(is_published=True).exists():
+            raise CommandError("No published recipes; seed a dataset first.")
+
+        report = feed.run(
+            follows=options["follows"],
+            mutes=options["mutes"],
+            page_size=options["page_size"],
+            depth=options["depth"],
+            repeat=options["repeat"],
+        )
+
+        self.stdout.write(
+            f"Following {report['follows']:,} users, {options['mutes']:,} muted"
+        )
+        self.stdout.write(
+            f"{'case':<14}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'items':>7}"
+        )
+        for name, row in report["cases"].items():
+            self.stdout.write(
+                f"{name:<14}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+                f"{row['queries']:>9}{row['items']:>7}"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
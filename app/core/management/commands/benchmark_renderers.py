@@ -0,0 +1,39 @@
+import json
+
+from benchmarks import renderers
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Compare DRF's JSONRenderer with FastJSONRenderer on existing data."""
+
+    help = (
+        "Measure render time of recipe list, recipe detail and feed payloads "
+        "with the stdlib and orjson renderers. Seed a dataset first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        results = renderers.run(items=options["items"], repeat=options["repeat"])
+        if not results:
+            raise CommandError("No data to render; seed a dataset first.")
+
+        self.stdout.write(
+            f"{'payload':<15}{'items':>7}{'bytes':>10}{'drf us':>10}"
+            f"{'fast us':>10}{'speedup':>9}"
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<15}{row['items']:>7}{row['bytes']:>10,}"
+                f"{row['drf_us']:>10.1f}{row['fast_us']:>10.1f}"
+                f"{row['speedup']:>8.1f}x"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
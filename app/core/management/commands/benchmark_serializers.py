@@ -0,0 +1,38 @@
+import json
+
+from benchmarks import serializers
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Compare DRF and compiled serializers on existing data."""
+
+    help = (
+        "Measure per-item CPU time of the hot list serializers against their "
+        "compiled versions. Run seed_data or benchmark_api first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        results = serializers.run(items=options["items"], repeat=options["repeat"])
+        if not results:
+            raise CommandError("No data to serialize; seed a dataset first.")
+
+        self.stdout.write(
+            f"{'serializer':<14}{'items':>7}{'drf us':>10}"
+            f"{'compiled us':>13}{'speedup':>9}"
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<14}{row['items']:>7}{row['drf_us']:>10.1f}"
+                f"{row['compiled_us']:>13.1f}{row['speedup']:>8.1f}x"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
@@ -0,0 +1,41 @@
+import json
+
+from benchmarks import uploads
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Compare the legacy and streaming image upload pipelines."""
+
+    help = (
+        "Measure time and peak memory per upload for a photo, a pixel bomb "
+        "and an oversized file, with and without header validation."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument(
+            "--scale", type=float, default=1.0, help="Photo size relative to 4000x3000."
+        )
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        results = uploads.run(repeat=options["repeat"], scale=options["scale"])
+
+        self.stdout.write(
+            f"{'case':<11}{'bytes':>12}{'pipeline':>11}{'ms':>10}"
+            f"{'rss MB':>9}{'accepted':>10}"
+        )
+        for name, row in results.items():
+            for pipeline in uploads.PIPELINES:
+                stats = row[pipeline]
+                self.stdout.write(
+                    f"{name:<11}{row['bytes']:>12,}{pipeline:>11}"
+                    f"{stats['ms']:>10.1f}{stats['rss_mb']:>9.1f}"
+                    f"{str(stats['accepted']):>10}"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
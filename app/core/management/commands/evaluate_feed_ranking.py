@@ -0,0 +1,76 @@
+import json
+from datetime import timedelta
+
+from benchmarks import feed_ranking
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """Replay logged feeds to compare ranking weights offline."""
+
+    help = (
+        "Score logged feeds (FeedLog) against what viewers engaged with "
+        "afterwards: as served, newest first, and ranked with the given "
+        "weights. Also times the ranking stage on synthetic candidates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, default=10, help="Cutoff for metrics.")
+        parser.add_argument(
+            "--days", type=int, default=30, help="Replay logs from this many days."
+        )
+        parser.add_argument(
+            "--window-hours",
+            type=float,
+            default=72,
+            help="Engagement after serving that counts as relevant.",
+        )
+        parser.add_argument(
+            "--weights",
+            help="JSON feature weights to test, e.g. '{\"recency\": 1.0}'. "
+            "Defaults to FEED_RANKING['WEIGHTS'].",
+        )
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+
+    def handle(self, *args, **options):
+        weights = settings.FEED_RANKING["WEIGHTS"]
+        if options["weights"]:
+            try:
+                weights = json.loads(options["weights"])
+            except ValueError as e:
+                raise CommandError(f"--weights is not valid JSON: {e}")
+
+        report = feed_ranking.evaluate(
+            weights=weights,
+            k=options["k"],
+            since=timezone.now() - timedelta(days=options["days"]),
+            window=timedelta(hours=options["window_hours"]),
+        )
+        timing = feed_ranking.time_scoring(settings.FEED_RANKING["CANDIDATES"])
+
+        self.stdout.write(f"weights {json.dumps(weights)}")
+        self.stdout.write(
+            f"{report['feeds']} logged feed(s), {report['evaluated']} with "
+            f"engagement in the window"
+        )
+        k = options["k"]
+        self.stdout.write(f"{'order':<15}{f'NDCG@{k}':>10}{f'hit@{k}':>10}")
+        for order in feed_ranking.ORDERS:
+            row = report[order]
+            if row["ndcg"] is None:
+                self.stdout.write(f"{order:<15}{'-':>10}{'-':>10}")
+            else:
+                self.stdout.write(
+                    f"{order:<15}{row['ndcg']:>10.4f}{row['hit_rate']:>10.4f}"
+                )
+        self.stdout.write(
+            f"Scoring {timing['candidates']} candidates: p50 "
+            f"{timing['p50_ms']:.2f} ms, p95 {timing['p95_ms']:.2f} ms"
+        )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump({"weights": weights, **report, "timing": timing}, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
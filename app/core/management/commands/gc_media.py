@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from core import media
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Delete content-addressed media files nothing references any more."""
+
+    help = (
+        "Delete media blobs that have had no references for the grace period. "
+        "Safe to run from cron while the app is serving uploads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep unreferenced blobs this long before deleting them.",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recompute reference counts from the models first.",
+        )
+        parser.add_argument(
+            "--scan",
+            action="store_true",
+            help="Also delete stored files that have no blob row.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            changed = media.recount()
+            self.stdout.write(f"Recounted references; {changed} blob(s) corrected.")
+
+        report = media.collect_garbage(
+            grace=timedelta(hours=options["grace_hours"]),
+            dry_run=options["dry_run"],
+            scan=options["scan"],
+        )
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            f"{verb} {report['blobs']} blob(s) and {report['files']} untracked "
+            f"file(s), {report['bytes'] / 1024 / 1024:.1f} MB."
+        )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from recipe.rankings import rebuild_scores, refresh_scores
+
+
+class Command(BaseCommand):
+    """Decay trending scores and recompute top-rated averages."""
+
+    help = (
+        "Bring every recipe's trending score to the current time and "
+        "recompute top-rated averages with the current site-wide mean. Run "
+        "from cron, e.g. every 10 minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute all scores from ratings, favorites and comments.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Recipe ids per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            written = rebuild_scores(options["batch_size"])
+            self.stdout.write(f"Rebuilt scores for {written} recipe(s).")
+            return
+
+        report = refresh_scores(options["batch_size"])
+        self.stdout.write(
+            f"Refreshed {report['rows']} score(s), removed {report['removed']}; "
+            f"mean rating {report['mean']:.2f}."
+        )
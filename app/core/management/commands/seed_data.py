@@ -0,0 +1,79 @@
+import os
+import time
+
+from benchmarks import synthetic
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Generate a large synthetic dataset for benchmarking."""
+
+    help = (
+        "Generate users, follow/block/mute graphs, recipes with ingredients, "
+        "tags and categories, ratings, favorites, comment trees and "
+        "notifications. Rows are appended to existing data."
+    )
+
+    def add_arguments(self, parser):
+        defaults = synthetic.DEFAULTS
+        parser.add_argument("--users", type=int, default=defaults["users"])
+        for option in [
+            "recipes_per_user",
+            "follows_per_user",
+            "ingredients_per_recipe",
+            "tags_per_recipe",
+            "ratings_per_recipe",
+            "favorites_per_recipe",
+            "comments_per_recipe",
+            "notifications_per_user",
+        ]:
+            parser.add_argument(
+                f"--{option.replace('_', '-')}", type=int, default=defaults[option]
+            )
+        parser.add_argument(
+            "--blocks-per-user", type=float, default=defaults["blocks_per_user"]
+        )
+        parser.add_argument(
+            "--mutes-per-user", type=float, default=defaults["mutes_per_user"]
+        )
+        parser.add_argument("--seed", type=int, default=defaults["seed"])
+        parser.add_argument("--chunk-size", type=int, default=defaults["chunk_size"])
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (1 runs in-process).",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 2:
+            raise CommandError("--users must be at least 2.")
+        workers = max(1, options.pop("workers"))
+        plan = synthetic.build_plan(
+            **{key: options[key] for key in synthetic.DEFAULTS if key in options}
+        )
+
+        self.stdout.write(
+            f"Seeding {plan['users']} users and {plan['recipes']} recipes "
+            f"with {workers} worker(s), seed {plan['seed']}..."
+        )
+        start = time.perf_counter()
+
+        def progress(kinds, totals):
+            elapsed = time.perf_counter() - start
+            rows = sum(totals.values())
+            self.stdout.write(
+                f"  {'+'.join(kinds)} done: {rows} rows in {elapsed:.1f}s "
+                f"({rows / elapsed:,.0f} rows/s)"
+            )
+
+        totals = synthetic.generate(plan, workers=workers, progress=progress)
+
+        elapsed = time.perf_counter() - start
+        for table, count in sorted(totals.items()):
+            self.stdout.write(f"  {table:<28}{count:>12,}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {sum(totals.values()):,} rows in {elapsed:.1f}s."
+            )
+        )
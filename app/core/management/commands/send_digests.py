@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from interaction.services.digest import PERIODS, send_digests
+
+
+class Command(BaseCommand):
+    """Email the daily or weekly digests."""
+
+    help = (
+        "Email users their digest of unread notifications and new recipes "
+        "for the last full day or week. Run from cron after midnight; an "
+        "interrupted run resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("frequency", choices=list(PERIODS))
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Users per chunk and checkpoint (default EMAIL_DIGEST setting).",
+        )
+
+    def handle(self, *args, **options):
+        run = send_digests(options["frequency"], chunk_size=options["chunk_size"])
+        self.stdout.write(
+            f"Sent {run.sent} {run.frequency} digest(s) for the period ending "
+            f"{run.period_end:%Y-%m-%d}."
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from recipe.facets import warm_facets
+
+
+class Command(BaseCommand):
+    """Precompute the shared recipe facet counts."""
+
+    help = (
+        "Refresh cached facet counts for the unfiltered recipe list and each "
+        "category and difficulty. Run from cron more often than "
+        "RECIPE_FACETS_CACHE_TIMEOUT."
+    )
+
+    def handle(self, *args, **options):
+        computed = warm_facets()
+        self.stdout.write(f"Refreshed facet counts for {computed} filter set(s).")
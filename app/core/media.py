@@ -0,0 +1,202 @@
+"""
+Content-addressed media storage.
+
+Generated image files are named after the SHA-256 of their bytes::
+
+    cas/3f/a9/3fa9...e1.webp
+
+so identical files (a re-upload, the same image imported twice, small images
+whose sizes all come out the same) are written once, and a URL never changes
+content. nginx serves ``/media/cas/`` as immutable.
+
+Each file has a ``MediaBlob`` row counting the model fields that reference
+it: ``put`` adds a reference, ``release`` drops one. Models registered with
+``track_media`` release their files when deleted. Files are never deleted
+inline; ``gc_media`` removes blobs that have had no references for a grace
+period, so a concurrent upload of the same bytes can still revive them.
+"""
+
+import hashlib
+import os
+from collections import Counter
+from datetime import timedelta
+
+from core.models import MediaBlob
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+PREFIX = "cas"
+
+# (model, field_name) pairs whose files are reference counted
+_tracked = []
+
+
+def content_path(data, ext):
+    """Return the storage path for ``data``."""
+    digest = hashlib.sha256(data).hexdigest()
+    return os.path.join(PREFIX, digest[:2], digest[2:4], f"{digest}.{ext}")
+
+
+def is_content_path(path):
+    return bool(path) and path.startswith(PREFIX + "/")
+
+
+def put(data, ext):
+    """
+    Store ``data`` under its content path and add a reference to it.
+
+    The file is only written when no copy exists yet. Returns the path.
+    """
+    path = content_path(data, ext)
+    with transaction.atomic():
+        # The row lock orders this against gc_media deleting the same blob.
+        blob, created = MediaBlob.objects.select_for_update().get_or_create(
+            path=path, defaults={"size": len(data), "refs": 1}
+        )
+        if not created:
+            MediaBlob.objects.filter(pk=blob.pk).update(
+                refs=F("refs") + 1, updated_at=timezone.now()
+            )
+        if not default_storage.exists(path):
+            saved = default_storage.save(path, ContentFile(data))
+            if saved != path:
+                # Lost a race with an identical write.
+                default_storage.delete(saved)
+    return path
+
+
+def release(paths):
+    """Drop one reference from each content-addressed path in ``paths``."""
+    paths = {path for path in paths if is_content_path(path)}
+    if paths:
+        MediaBlob.objects.filter(path__in=paths).update(
+            refs=F("refs") - 1, updated_at=timezone.now()
+        )
+
+
+def field_paths(instance, field_name):
+    """Return the paths ``instance.<field_name>`` and its variants reference."""
+    from core.images import variant_paths
+
+    paths = variant_paths(getattr(instance, f"{field_name}_variants", None))
+    name = getattr(instance, field_name).name
+    if name:
+        paths.add(name)
+    return paths
+
+
+def _release_on_delete(sender, instance, **kwargs):
+    for model, field_name in _tracked:
+        if isinstance(instance, model):
+            release(field_paths(instance, field_name))
+
+
+def track_media(model, field_name):
+    """Count references from ``model.<field_name>`` (and its variants)."""
+    _tracked.append((model, field_name))
+    post_delete.connect(
+        _release_on_delete, sender=model, dispatch_uid=f"media-{model._meta.label}"
+    )
+
+
+def recount():
+    """
+    Recompute every blob's references from the tracked model fields.
+
+    Repairs drift, e.g. after rows were removed with raw SQL. Run it while
+    uploads are quiet. Returns the number of blobs whose count changed.
+    """
+    counts = Counter()
+    for model, field_name in _tracked:
+        rows = (
+            model.objects.exclude(**{f"{field_name}__isnull": True})
+            .exclude(**{field_name: ""})
+            .iterator()
+        )
+        for instance in rows:
+            counts.update(
+                p for p in field_paths(instance, field_name) if is_content_path(p)
+            )
+
+    changed = 0
+    for blob in MediaBlob.objects.iterator():
+        refs = counts.pop(blob.path, 0)
+        if blob.refs != refs:
+            MediaBlob.objects.filter(pk=blob.pk).update(
+                refs=refs, updated_at=timezone.now()
+            )
+            changed += 1
+    for path, refs in counts.items():
+        if default_storage.exists(path):
+            MediaBlob.objects.create(
+                path=path, size=default_storage.size(path), refs=refs
+            )
+            changed += 1
+    return changed
+
+
+def _walk(directory):
+    dirs, files = default_storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for name in dirs:
+        yield from _walk(os.path.join(directory, name))
+
+
+def collect_garbage(grace=timedelta(hours=24), dry_run=False, scan=False):
+    """
+    Delete blobs without references whose count last changed before ``grace``.
+
+    With ``scan``, also delete files under ``PREFIX`` that have no row at
+    all (left by a write whose transaction rolled back), and unprocessed
+    originals no ``<field>_source`` names (direct uploads never claimed).
+    Returns ``{"blobs", "files", "bytes"}``.
+    """
+    cutoff = timezone.now() - grace
+    report = {"blobs": 0, "files": 0, "bytes": 0}
+    orphans = MediaBlob.objects.filter(refs__lte=0, updated_at__lt=cutoff)
+    for pk in orphans.values_list("pk", flat=True).iterator():
+        with transaction.atomic():
+            blob = orphans.select_for_update(skip_locked=True).filter(pk=pk).first()
+            if blob is None:
+                continue
+            report["blobs"] += 1
+            report["bytes"] += blob.size
+            if not dry_run:
+                default_storage.delete(blob.path)
+                blob.delete()
+
+    if scan:
+        known = set(MediaBlob.objects.values_list("path", flat=True))
+        _sweep(PREFIX, known, cutoff, dry_run, report)
+        for model, field_name in _tracked:
+            upload_to = model._meta.get_field(field_name).upload_to
+            sources = set(
+                model.objects.exclude(**{f"{field_name}_source": ""}).values_list(
+                    f"{field_name}_source", flat=True
+                )
+            )
+            _sweep(
+                os.path.join(upload_to, "originals"), sources, cutoff, dry_run, report
+            )
+    return report
+
+
+def _sweep(directory, keep, cutoff, dry_run, report):
+    """Delete files under ``directory`` not in ``keep`` and older than ``cutoff``."""
+    # Not exists(): on S3 a "directory" is only a key prefix.
+    try:
+        paths = list(_walk(directory))
+    except FileNotFoundError:
+        return
+    for path in paths:
+        if path in keep or default_storage.get_modified_time(path) >= cutoff:
+            continue
+        report["files"] += 1
+        report["bytes"] += default_storage.size(path)
+        if not dry_run:
+            default_storage.delete(path)
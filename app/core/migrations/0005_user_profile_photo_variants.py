@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_photo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
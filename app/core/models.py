@@ -1,6 +1,7 @@
 import secrets
 from datetime import timedelta
 
+from core.image_jobs import STATUS_CHOICES as IMAGE_STATUS_CHOICES
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -40,6 +41,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255, blank=True)
     bio = models.TextField(max_length=500, blank=True)
     profile_photo = models.ImageField(upload_to="profiles/", null=True, blank=True)
+    # Resized WebP/JPEG copies of profile_photo, see core.images
+    profile_photo_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Background processing state of profile_photo, see core.image_jobs
+    profile_photo_status = models.CharField(
+        max_length=10, choices=IMAGE_STATUS_CHOICES, blank=True, editable=False
+    )
+    profile_photo_source = models.CharField(max_length=255, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     is_private = models.BooleanField(default=False)
@@ -107,3 +115,30 @@ class PasswordResetToken(models.Model):
 
     def __str__(self):
         return f"Password reset token for {self.user.email}"
+
+
+class MediaBlob(models.Model):
+    """
+    A content-addressed media file and how many model fields reference it.
+
+    See core.media; rows with no references are removed by ``gc_media``.
+    """
+
+    path = models.CharField(max_length=255, unique=True)
+    size = models.PositiveIntegerField()
+    refs = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last change to refs; orphans are kept for a grace period after it.
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["updated_at"],
+                name="mediablob_orphan_idx",
+                condition=models.Q(refs__lte=0),
+            )
+        ]
+
+    def __str__(self):
+        return self.path
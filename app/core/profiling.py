@@ -0,0 +1,334 @@
+"""
+Opt-in SQL profiling: slow-query logging and N+1 detection.
+
+Queries are captured with ``connection.execute_wrapper`` and grouped by SQL
+template, so the same statement issued once per row of a list shows up as a
+single group with a high count and the line of application code that issued
+it.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "SLOW_QUERY_MS": 100,
+    "N_PLUS_ONE_THRESHOLD": 5,
+    "RESPONSE_HEADERS": False,
+}
+
+_IN_LIST_RE = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def get_profiler_settings():
+    """Return QUERY_PROFILER settings merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, "QUERY_PROFILER", {})}
+
+
+def normalize_sql(sql):
+    """
+    Reduce a SQL statement to its template.
+
+    Literals become ``?`` and ``IN (%s, %s, ...)`` lists collapse to
+    ``IN (...)`` so that statements differing only by parameters group
+    together.
+    """
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+def _query_origin():
+    """Return 'path:line in func' for the innermost application frame."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        filename = frame.filename
+        if (
+            filename.startswith(base_dir)
+            and filename != __file__
+            and "site-packages" not in filename
+        ):
+            relative = os.path.relpath(filename, base_dir)
+            return f"{relative}:{frame.lineno} in {frame.name}"
+    return "<unknown>"
+
+
+class QueryCollector:
+    """Execute wrapper that records every query run on a connection."""
+
+    def __init__(self, slow_query_ms=None, n_plus_one_threshold=None):
+        config = get_profiler_settings()
+        self.slow_query_ms = (
+            config["SLOW_QUERY_MS"] if slow_query_ms is None else slow_query_ms
+        )
+        self.n_plus_one_threshold = (
+            config["N_PLUS_ONE_THRESHOLD"]
+            if n_plus_one_threshold is None
+            else n_plus_one_threshold
+        )
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            query = {
+                "sql": sql,
+                "template": normalize_sql(sql),
+                "duration_ms": duration_ms,
+                "origin": _query_origin(),
+            }
+            self.queries.append(query)
+            if duration_ms >= self.slow_query_ms:
+                logger.warning(
+                    "Slow query (%.1f ms) at %s: %s",
+                    duration_ms,
+                    query["origin"],
+                    sql,
+                )
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def total_ms(self):
+        return sum(q["duration_ms"] for q in self.queries)
+
+    def groups(self):
+        """Return queries grouped by template, most frequent first."""
+        grouped = {}
+        for query in self.queries:
+            group = grouped.setdefault(
+                query["template"],
+                {
+                    "template": query["template"],
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "origins": {},
+                },
+            )
+            group["count"] += 1
+            group["total_ms"] += query["duration_ms"]
+            origins = group["origins"]
+            origins[query["origin"]] = origins.get(query["origin"], 0) + 1
+        return sorted(grouped.values(), key=lambda g: g["count"], reverse=True)
+
+    def n_plus_one(self):
+        """Return template groups repeated at least the N+1 threshold."""
+        return [g for g in self.groups() if g["count"] >= self.n_plus_one_threshold]
+
+    def slow_queries(self):
+        """Return queries that took at least the slow-query threshold."""
+        return [q for q in self.queries if q["duration_ms"] >= self.slow_query_ms]
+
+    def report(self):
+        """Return a JSON-serializable summary of the captured queries."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 2),
+            "n_plus_one": [
+                {
+                    "template": g["template"],
+                    "count": g["count"],
+                    "origins": g["origins"],
+                }
+                for g in self.n_plus_one()
+            ],
+            "slow": [
+                {
+                    "sql": q["sql"],
+                    "duration_ms": round(q["duration_ms"], 2),
+                    "origin": q["origin"],
+                }
+                for q in self.slow_queries()
+            ],
+        }
+
+
+@contextmanager
+def profile_queries(using=None, **kwargs):
+    """
+    Capture queries run inside the block.
+
+    ``using`` is a database alias or list of aliases; all connections are
+    wrapped when it is omitted.
+    """
+    if using is None:
+        aliases = list(connections)
+    elif isinstance(using, str):
+        aliases = [using]
+    else:
+        aliases = list(using)
+
+    collector = QueryCollector(**kwargs)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(collector))
+        yield collector
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a block runs more queries than its budget allows."""
+
+
+def _format_groups(groups):
+    lines = []
+    for group in groups:
+        origins = ", ".join(group["origins"])
+        lines.append(f"  {group['count']}x {group['template']}\n    from {origins}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def query_budget(max_queries, allow_n_plus_one=False, using=None, **kwargs):
+    """
+    Fail if the block exceeds ``max_queries`` or contains an N+1 pattern.
+
+    Usable directly in tests, or through the ``query_budget`` pytest fixture.
+    """
+    with profile_queries(using=using, **kwargs) as collector:
+        yield collector
+
+    if collector.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{collector.count} queries executed, budget is {max_queries}:\n"
+            + _format_groups(collector.groups())
+        )
+    repeated = collector.n_plus_one()
+    if repeated and not allow_n_plus_one:
+        raise QueryBudgetExceeded(
+            "N+1 query pattern detected:\n" + _format_groups(repeated)
+        )
+
+
+class QueryBudgetMixin:
+    """TestCase mixin exposing ``assertQueryBudget``."""
+
+    def assertQueryBudget(self, max_queries, allow_n_plus_one=False, using=None):
+        return query_budget(max_queries, allow_n_plus_one=allow_n_plus_one, using=using)
+
+
+class EndpointStats:
+    """Thread-safe per-endpoint aggregates of profiled requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, endpoint, report):
+        with self._lock:
+            stats = self._stats.setdefault(
+                endpoint,
+                {
+                    "requests": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "total_ms": 0.0,
+                    "slow_queries": 0,
+                    "n_plus_one": {},
+                },
+            )
+            stats["requests"] += 1
+            stats["queries"] += report["count"]
+            stats["max_queries"] = max(stats["max_queries"], report["count"])
+            stats["total_ms"] += report["total_ms"]
+            stats["slow_queries"] += len(report["slow"])
+            for group in report["n_plus_one"]:
+                seen = stats["n_plus_one"].setdefault(
+                    group["template"], {"requests": 0, "origins": set()}
+                )
+                seen["requests"] += 1
+                seen["origins"].update(group["origins"])
+
+    def snapshot(self):
+        """Return a copy of the aggregates with averages filled in."""
+        with self._lock:
+            result = {}
+            for endpoint, stats in self._stats.items():
+                result[endpoint] = {
+                    "requests": stats["requests"],
+                    "avg_queries": stats["queries"] / stats["requests"],
+                    "max_queries": stats["max_queries"],
+                    "avg_ms": round(stats["total_ms"] / stats["requests"], 2),
+                    "slow_queries": stats["slow_queries"],
+                    "n_plus_one": {
+                        template: {
+                            "requests": seen["requests"],
+                            "origins": sorted(seen["origins"]),
+                        }
+                        for template, seen in stats["n_plus_one"].items()
+                    },
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+endpoint_stats = EndpointStats()
+
+
+def _endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    name = match.view_name if match else request.path
+    return f"{request.method} {name}"
+
+
+class QueryProfilerMiddleware:
+    """
+    Profile the queries of every request.
+
+    Enabled with ``QUERY_PROFILER["ENABLED"]``; otherwise Django drops the
+    middleware at startup. Each request with slow queries or N+1 patterns is
+    logged, all requests feed ``endpoint_stats``, and with
+    ``RESPONSE_HEADERS`` the query count and time are returned as
+    ``X-Query-Count`` / ``X-Query-Time-Ms``.
+    """
+
+    def __init__(self, get_response):
+        config = get_profiler_settings()
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.response_headers = config["RESPONSE_HEADERS"]
+
+    def __call__(self, request):
+        with profile_queries() as collector:
+            response = self.get_response(request)
+
+        endpoint = _endpoint_name(request)
+        report = collector.report()
+        endpoint_stats.record(endpoint, report)
+
+        for group in report["n_plus_one"]:
+            logger.warning(
+                "N+1 on %s: %dx %s from %s",
+                endpoint,
+                group["count"],
+                group["template"],
+                ", ".join(group["origins"]),
+            )
+
+        if self.response_headers:
+            response["X-Query-Count"] = str(report["count"])
+            response["X-Query-Time-Ms"] = f"{report['total_ms']:.2f}"
+        return response
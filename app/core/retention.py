@@ -0,0 +1,126 @@
+"""
+Retention: batched deletes of rows that are never read again.
+
+Each policy in ``POLICIES`` names a table and which of its rows are stale:
+expired email verification and password reset tokens, read notifications
+older than ``RETENTION["READ_NOTIFICATION_DAYS"]``, feed logs older than
+``RETENTION["FEED_LOG_DAYS"]``, and simplejwt's expired outstanding refresh
+tokens along with their blacklist entries. An expired
+refresh token is rejected on its expiry alone, so its blacklist entry is no
+longer needed.
+
+``purge`` deletes at most ``RETENTION["BATCH_SIZE"]`` rows per statement,
+each in its own transaction, so no lock is held for long. Batches walk the
+primary key, each starting after the last id the previous one deleted, so
+every row is read once however many batches a run takes, and no index beyond
+the primary key is needed.
+"""
+
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from core.models import EmailVerificationToken, PasswordResetToken
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from interaction.models import FeedLog, Notification
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+# A table, the SQL condition on its stale rows, and the (model, foreign key
+# column) of rows deleted with them
+Policy = namedtuple("Policy", "model condition related", defaults=(None,))
+
+POLICIES = {
+    "email_verification_tokens": Policy(EmailVerificationToken, "expires_at < %(now)s"),
+    "password_reset_tokens": Policy(PasswordResetToken, "expires_at < %(now)s"),
+    "read_notifications": Policy(
+        Notification, "is_read AND created_at < %(read_before)s"
+    ),
+    "feed_logs": Policy(FeedLog, "created_at < %(feed_logs_before)s"),
+    "jwt_tokens": Policy(
+        OutstandingToken, "expires_at < %(now)s", (BlacklistedToken, "token_id")
+    ),
+}
+
+_quote = connection.ops.quote_name
+
+
+def _table(model):
+    return _quote(model._meta.db_table)
+
+
+def delete_sql(policy):
+    """Return the statement deleting one batch of ``policy``'s stale rows."""
+    table = _table(policy.model)
+    related = "0"
+    cascade = ""
+    if policy.related:
+        model, column = policy.related
+        cascade = f"""related AS (
+    DELETE FROM {_table(model)} WHERE {column} IN (SELECT id FROM batch)
+    RETURNING 1
+), """
+        related = "(SELECT COUNT(*) FROM related)"
+    return f"""
+WITH batch AS (
+    SELECT id FROM {table}
+    WHERE id > %(after)s AND {policy.condition}
+    ORDER BY id
+    LIMIT %(limit)s
+), {cascade}deleted AS (
+    DELETE FROM {table} WHERE id IN (SELECT id FROM batch) RETURNING id
+)
+SELECT COUNT(*), MAX(id), {related} FROM deleted
+"""
+
+
+def _params(now):
+    conf = settings.RETENTION
+    return {
+        "now": now,
+        "read_before": now - timedelta(days=conf["READ_NOTIFICATION_DAYS"]),
+        "feed_logs_before": now - timedelta(days=conf["FEED_LOG_DAYS"]),
+    }
+
+
+def count(name, now=None):
+    """Return how many rows policy ``name`` would delete."""
+    policy = POLICIES[name]
+    sql = f"SELECT COUNT(*) FROM {_table(policy.model)} WHERE {policy.condition}"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, _params(now or timezone.now()))
+        return cursor.fetchone()[0]
+
+
+def purge(name, now=None, batch_size=None):
+    """
+    Delete policy ``name``'s stale rows in batches.
+
+    Returns ``{"rows", "related", "batches", "seconds"}``; ``related`` counts
+    rows deleted along with them, such as blacklist entries.
+    """
+    policy = POLICIES[name]
+    sql = delete_sql(policy)
+    params = {
+        **_params(now or timezone.now()),
+        "after": 0,
+        "limit": batch_size or settings.RETENTION["BATCH_SIZE"],
+    }
+    report = {"rows": 0, "related": 0, "batches": 0}
+    start = time.perf_counter()
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows, last_id, related = cursor.fetchone()
+        report["rows"] += rows
+        report["related"] += related
+        report["batches"] += 1
+        if rows < params["limit"]:
+            break
+        params["after"] = last_id
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
@@ -1,8 +1,14 @@
+from core import media
+from core.direct_uploads import DirectUploadField
+from core.image_jobs import image_processor
+from core.images import ImageVariantsField
 from core.models import EmailVerificationToken
+from core.uploads import ImageUploadField
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import send_mail
 from rest_framework import serializers
+from rest_framework.fields import empty
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -74,11 +80,55 @@ The Recipe App Team
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile."""
 
+    profile_photo = ImageUploadField(required=False, allow_null=True)
+    # Token from me/photo-upload-url/, instead of the file itself
+    profile_photo_upload = DirectUploadField("profile_photo", required=False)
+    profile_photo_srcset = ImageVariantsField(source="profile_photo_variants")
+
     class Meta:
         model = get_user_model()
-        fields = ["id", "email", "name", "bio", "profile_photo", "date_joined"]
+        fields = [
+            "id",
+            "email",
+            "name",
+            "bio",
+            "profile_photo",
+            "profile_photo_upload",
+            "profile_photo_srcset",
+            "profile_photo_status",
+            "date_joined",
+        ]
         read_only_fields = ["id", "email", "date_joined"]
 
+    def validate(self, attrs):
+        if "profile_photo" in attrs and "profile_photo_upload" in attrs:
+            raise serializers.ValidationError(
+                "Provide either a profile photo file or an upload token."
+            )
+        return attrs
+
+    def update(self, instance, validated_data):
+        photo = validated_data.pop("profile_photo", empty)
+        upload = validated_data.pop("profile_photo_upload", None)
+        instance = super().update(instance, validated_data)
+        if photo is None:
+            media.release(media.field_paths(instance, "profile_photo"))
+            instance.profile_photo = None
+            instance.profile_photo_variants = {}
+            instance.profile_photo_status = ""
+            instance.save(
+                update_fields=[
+                    "profile_photo",
+                    "profile_photo_variants",
+                    "profile_photo_status",
+                ]
+            )
+        elif photo is not empty:
+            image_processor.submit(instance, "profile_photo", photo, "profile")
+        elif upload:
+            image_processor.submit_stored(instance, "profile_photo", upload, "profile")
+        return instance
+
 
 class UserPublicSerializer(serializers.ModelSerializer):
     """Serializer for public user info (for recipe author display)."""
@@ -0,0 +1,300 @@
+"""
+Compiled read-only serializers for hot list endpoints.
+
+``compile_serializer`` introspects a DRF serializer once and turns each
+readable field into a precomputed ``(name, getter, converter)`` triple, so
+rendering an item is a flat loop of attribute lookups and type conversions
+instead of ``Serializer.to_representation`` with per-field dispatch,
+``SkipField`` handling and ``OrderedDict`` building.
+
+Output matches the DRF serializer exactly (golden tests in
+``core/tests/test_serializers_fast.py`` and the app test suites). Field types
+without a specialised converter fall back to the DRF field itself, so adding
+a field to a source serializer never breaks the compiled version.
+
+Both model instances and ``.values()`` rows are accepted; for rows, a
+dotted source such as ``author.name`` is read from the ``author__name`` key.
+"""
+
+import threading
+from collections.abc import Mapping
+
+from core.images import ImageVariantsField, variant_urls
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db import models
+from django.utils import timezone
+from rest_framework import fields, relations, serializers
+from rest_framework.fields import SkipField, empty, is_simple_callable
+from rest_framework.settings import api_settings
+
+_SKIP = object()
+
+
+def _traverse(instance, attrs):
+    """``rest_framework.fields.get_attribute`` minus the per-call checks."""
+    for attr in attrs:
+        try:
+            if isinstance(instance, Mapping):
+                instance = instance[attr]
+            else:
+                instance = getattr(instance, attr)
+        except ObjectDoesNotExist:
+            return None
+        if callable(instance) and is_simple_callable(instance):
+            instance = instance()
+    return instance
+
+
+def _generic_getters(field):
+    """Delegate to ``field.get_attribute`` for fields that override it."""
+
+    def getter(instance):
+        try:
+            value = field.get_attribute(instance)
+        except SkipField:
+            return _SKIP
+        if isinstance(value, relations.PKOnlyObject) and value.pk is None:
+            return None
+        return value
+
+    return getter, getter
+
+
+def _missing_handler(field):
+    """Mirror ``Field.get_attribute``'s fallbacks for a missing attribute."""
+    if field.default is not empty:
+        return lambda instance: field.get_default()
+    if field.allow_null:
+        return lambda instance: None
+    if not field.required:
+        return lambda instance: _SKIP
+    # Let DRF raise its descriptive error.
+    return field.get_attribute
+
+
+def _make_getters(field, model):
+    """
+    Return ``(object_getter, row_getter)`` mirroring ``field.get_attribute``.
+
+    The object getter is used for model instances and other objects, the
+    row getter for mappings (``.values()`` rows and service-built dicts).
+    """
+    attrs = tuple(field.source_attrs)
+    is_pk = isinstance(field, relations.PrimaryKeyRelatedField)
+    if not is_pk and type(field).get_attribute is not fields.Field.get_attribute:
+        return _generic_getters(field)
+    missing = _missing_handler(field)
+    row_key = "__".join(attrs)
+
+    def as_pk(value):
+        return getattr(value, "pk", value) if is_pk and value is not None else value
+
+    def row_getter(instance):
+        try:
+            if row_key in instance:
+                return as_pk(instance[row_key])
+            return as_pk(_traverse(instance, attrs))
+        except (KeyError, AttributeError):
+            return missing(instance)
+
+    attname = None
+    if is_pk and model is not None and len(attrs) == 1:
+        try:
+            attname = model._meta.get_field(attrs[0]).attname
+        except FieldDoesNotExist:
+            pass
+
+    if attname is not None:
+        # Read the foreign key column; the related row is never loaded.
+        def object_getter(instance):
+            try:
+                return getattr(instance, attname)
+            except AttributeError:
+                return as_pk(_traverse(instance, attrs))
+
+    elif len(attrs) == 1:
+        (attr,) = attrs
+
+        def object_getter(instance):
+            try:
+                value = getattr(instance, attr)
+            except ObjectDoesNotExist:
+                return None
+            except (KeyError, AttributeError):
+                return missing(instance)
+            if callable(value) and is_simple_callable(value):
+                value = value()
+            return as_pk(value)
+
+    else:
+
+        def object_getter(instance):
+            try:
+                return as_pk(_traverse(instance, attrs))
+            except (KeyError, AttributeError):
+                return missing(instance)
+
+    return object_getter, row_getter
+
+
+class _RenderContext:
+    """Per-call state shared by nested converters."""
+
+    __slots__ = ("request", "_tz")
+
+    def __init__(self, request):
+        self.request = request
+        self._tz = None
+
+    @property
+    def tz(self):
+        if self._tz is None:
+            self._tz = timezone.get_current_timezone()
+        return self._tz
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if (
+        not settings.USE_TZ
+        or output_format is None
+        or output_format.lower() != fields.ISO_8601
+    ):
+        return lambda value, ctx: field.to_representation(value)
+    fixed_tz = getattr(field, "timezone", None)
+
+    def convert(value, ctx):
+        if isinstance(value, str) or not value or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(fixed_tz or ctx.tz).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _file_converter(field):
+    if not getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL):
+        return lambda value, ctx: field.to_representation(value)
+
+    def convert(value, ctx):
+        if not value:
+            return None
+        try:
+            url = value.url
+        except AttributeError:
+            return None
+        if ctx.request is not None:
+            return ctx.request.build_absolute_uri(url)
+        return url
+
+    return convert
+
+
+def _boolean_converter(field):
+    def convert(value, ctx):
+        if value is True or value is False:
+            return value
+        return field.to_representation(value)
+
+    return convert
+
+
+_CASTS = {
+    fields.CharField.to_representation: str,
+    fields.IntegerField.to_representation: int,
+    fields.FloatField.to_representation: float,
+}
+
+
+def _make_converter(field):
+    """Return ``converter(value, ctx)`` for a non-None attribute."""
+    if isinstance(field, serializers.ListSerializer):
+        return CompiledSerializer(field.child)._render_many
+    if isinstance(field, serializers.BaseSerializer):
+        return CompiledSerializer(field)._render
+    if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+        return lambda value, ctx: value
+    if isinstance(field, ImageVariantsField):
+        return lambda value, ctx: variant_urls(value, ctx.request)
+
+    method = type(field).to_representation
+    if method in _CASTS:
+        cast = _CASTS[method]
+        return lambda value, ctx: cast(value)
+    if method is fields.ReadOnlyField.to_representation:
+        return lambda value, ctx: value
+    if method is fields.DateTimeField.to_representation:
+        return _datetime_converter(field)
+    if method is fields.FileField.to_representation:
+        return _file_converter(field)
+    if method is fields.BooleanField.to_representation:
+        return _boolean_converter(field)
+    # Anything else (choices, decimals, method fields...) goes through DRF.
+    # Fields that read ``self.context`` only see an empty context here.
+    return lambda value, ctx: field.to_representation(value)
+
+
+class CompiledSerializer:
+    """
+    A read-only, precompiled equivalent of a DRF serializer.
+
+    Wrap a serializer class (or a bound serializer instance when nesting);
+    fields are compiled lazily on first use so module import does not need
+    the app registry. Pass the request wherever the DRF serializer would
+    have had it in its context; it is only used for absolute file URLs.
+    """
+
+    def __init__(self, serializer):
+        self._serializer = serializer
+        self._fields = None
+        self._lock = threading.Lock()
+
+    def _compile(self):
+        with self._lock:
+            if self._fields is None:
+                serializer = self._serializer
+                if isinstance(serializer, type):
+                    serializer = serializer()
+                model = getattr(getattr(serializer, "Meta", None), "model", None)
+                self._fields = [
+                    (
+                        field.field_name,
+                        *_make_getters(field, model),
+                        _make_converter(field),
+                    )
+                    for field in serializer._readable_fields
+                ]
+        return self._fields
+
+    def _render(self, instance, ctx):
+        compiled = self._fields if self._fields is not None else self._compile()
+        is_row = isinstance(instance, dict) or isinstance(instance, Mapping)
+        ret = {}
+        for name, object_getter, row_getter, convert in compiled:
+            value = row_getter(instance) if is_row else object_getter(instance)
+            if value is _SKIP:
+                continue
+            ret[name] = None if value is None else convert(value, ctx)
+        return ret
+
+    def _render_many(self, instances, ctx):
+        if isinstance(instances, models.Manager):
+            instances = instances.all()
+        render = self._render
+        return [render(instance, ctx) for instance in instances]
+
+    def to_representation(self, instance, request=None):
+        """Return the representation of one instance or ``.values()`` row."""
+        return self._render(instance, _RenderContext(request))
+
+    def many(self, instances, request=None):
+        """Return representations for an iterable of instances."""
+        return self._render_many(instances, _RenderContext(request))
+
+
+def compile_serializer(serializer_class):
+    """Return a ``CompiledSerializer`` for ``serializer_class``."""
+    return CompiledSerializer(serializer_class)
@@ -0,0 +1,90 @@
+"""
+Media storage backends.
+
+``MEDIA_STORAGE`` selects ``DEFAULT_FILE_STORAGE``:
+
+- ``filesystem``: files under ``MEDIA_ROOT``, served by nginx from a volume
+  shared with the app container.
+- ``s3``: an S3-compatible bucket (AWS S3, MinIO, ...), configured through
+  the ``MEDIA_S3_*`` environment variables. App containers then share
+  nothing on disk and can run on any node.
+
+Everything else talks to ``default_storage``. Both backends add the two
+operations direct uploads (``core.direct_uploads``) need:
+
+- ``presigned_put(name, content_type, expires, request)`` returns a URL the
+  client can PUT the file to;
+- ``read_head(name, size)`` returns the first ``size`` bytes of a file
+  without fetching the rest.
+"""
+
+import time
+
+from django.core import signing
+from django.core.files.storage import FileSystemStorage
+from django.urls import reverse
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+PUT_SALT = "core.storage.put"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+class FileSystemMediaStorage(FileSystemStorage):
+    """``MEDIA_ROOT`` storage; direct uploads go to ``DirectUploadView``."""
+
+    def presigned_put(self, name, content_type, expires, request):
+        token = signing.dumps(
+            {
+                "name": name,
+                "content_type": content_type,
+                "expires_at": int(time.time()) + expires,
+            },
+            salt=PUT_SALT,
+        )
+        return request.build_absolute_uri(reverse("direct-upload", args=[token]))
+
+    def unsign_put(self, token):
+        """Return ``(name, content_type)`` for a live upload token, else None."""
+        try:
+            data = signing.loads(token, salt=PUT_SALT)
+        except signing.BadSignature:
+            return None
+        if data["expires_at"] < time.time():
+            return None
+        return data["name"], data["content_type"]
+
+    def read_head(self, name, size):
+        with self.open(name) as f:
+            return f.read(size)
+
+
+class S3MediaStorage(S3Boto3Storage):
+    """S3-compatible bucket storage with direct uploads to the bucket."""
+
+    def get_object_parameters(self, name):
+        from core.media import is_content_path
+
+        params = super().get_object_parameters(name)
+        if is_content_path(name):
+            params.setdefault("CacheControl", IMMUTABLE)
+        return params
+
+    def _key(self, name):
+        return self._normalize_name(clean_name(name))
+
+    def presigned_put(self, name, content_type, expires, request=None):
+        return self.bucket.meta.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": self._key(name),
+                "ContentType": content_type,
+            },
+            ExpiresIn=expires,
+        )
+
+    def read_head(self, name, size):
+        obj = self.bucket.Object(self._key(name))
+        return obj.get(Range=f"bytes=0-{size - 1}")["Body"].read()
@@ -0,0 +1,88 @@
+from core.authentication import invalidate_user
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+ME_URL = reverse("auth:me")
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Tests for the cached JWT user lookup."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123", name="Ada"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_reads_use_cache(self):
+        """Test the user is loaded once for repeated GET requests."""
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["name"], "Ada")
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_writes_load_user(self):
+        """Test unsafe requests load the user row and refresh the cache."""
+        self.client.get(ME_URL)
+
+        # The user, its update, and the touch of a renamed author's recipes
+        with self.assertNumQueries(3):
+            res = self.client.patch(ME_URL, {"name": "Grace"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.data["name"], "Grace")
+
+    def test_deactivation(self):
+        """Test a deactivated user is rejected on the next request."""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.data["code"], "user_inactive")
+
+    def test_password_change(self):
+        """Test a password change makes the cached user stale."""
+        self.client.get(ME_URL)
+
+        self.user.set_password("newpass123")
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            self.client.get(ME_URL)
+
+    def test_invalidate_user(self):
+        """Test invalidating without a save, e.g. after a queryset update."""
+        self.client.get(ME_URL)
+        get_user_model().objects.filter(pk=self.user.pk).update(name="Grace")
+
+        invalidate_user(self.user.pk)
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data["name"], "Grace")
+
+    def test_deleted_user(self):
+        """Test a deleted user is rejected even after being cached."""
+        self.client.get(ME_URL)
+
+        self.user.delete()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,266 @@
+from datetime import timedelta
+from io import StringIO
+
+from benchmarks import (
+    dataset,
+    facets,
+    feed,
+    feed_ranking,
+    renderers,
+    serializers,
+    uploads,
+)
+from benchmarks.runner import LoadRunner, compare_results, percentile, summarize
+from benchmarks.scenarios import build_context, get_scenarios
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.utils import timezone
+from interaction.models import Favorite, FeedLog, Follow
+from recipe.models import Recipe
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class DatasetTests(TestCase):
+    """Tests for the benchmark dataset generator."""
+
+    def test_seed_dataset(self):
+        """Test seeding creates related rows and is repeatable."""
+        counts = dataset.seed_dataset(users=20, recipes_per_user=2, max_follows=5)
+
+        self.assertEqual(counts["users"], 20)
+        self.assertEqual(counts["recipes"], 40)
+        self.assertEqual(Follow.objects.count(), counts["follows"])
+
+        titles = list(Recipe.objects.order_by("pk").values_list("title", flat=True))
+        dataset.seed_dataset(users=20, recipes_per_user=2, max_follows=5)
+        reseeded = list(Recipe.objects.order_by("pk").values_list("title", flat=True))
+        self.assertEqual(titles, reseeded)
+        self.assertEqual(
+            get_user_model().objects.filter(email__startswith="bench-").count(), 20
+        )
+
+
+class SerializerBenchmarkTests(TestCase):
+    """Tests for the serializer microbenchmark."""
+
+    def test_run(self):
+        """Test serializer pairs with seeded rows are timed."""
+        dataset.seed_dataset(users=10, recipes_per_user=2, max_follows=5)
+
+        results = serializers.run(items=10, repeat=1)
+
+        self.assertLessEqual({"recipe_list", "feed_item", "follow"}, set(results))
+        for row in results.values():
+            self.assertGreater(row["items"], 0)
+            self.assertGreater(row["drf_us"], 0)
+
+
+class RendererBenchmarkTests(TestCase):
+    """Tests for the renderer microbenchmark."""
+
+    def test_run(self):
+        """Test recipe and feed payloads are rendered by both renderers."""
+        dataset.seed_dataset(users=10, recipes_per_user=2, max_follows=5)
+
+        results = renderers.run(items=10, repeat=1)
+
+        self.assertEqual(set(results), {"recipe_list", "recipe_detail", "feed"})
+        for row in results.values():
+            self.assertGreater(row["bytes"], 0)
+
+
+class FacetBenchmarkTests(TestCase):
+    """Tests for the facet count benchmark."""
+
+    def test_run(self):
+        """Test each filter set is timed both ways."""
+        dataset.seed_dataset(users=10, recipes_per_user=2, max_follows=5)
+
+        results = facets.run(repeat=1)
+
+        self.assertEqual(
+            set(results), {"all", "category", "tag", "difficulty_time", "search"}
+        )
+        for row in results.values():
+            self.assertGreater(row["facets_p50_ms"], 0)
+            self.assertGreater(row["per_value_queries"], 1)
+
+
+class FeedBenchmarkTests(TestCase):
+    """Tests for the feed benchmark."""
+
+    def test_run(self):
+        """Test each case is timed and the viewer is removed afterwards."""
+        dataset.seed_dataset(users=10, recipes_per_user=3, max_follows=5)
+
+        report = feed.run(follows=6, mutes=1, page_size=2, depth=2, repeat=1)
+
+        self.assertEqual(report["follows"], 6)
+        self.assertEqual(
+            set(report["cases"]), {"first_page", "deep_page", "algorithmic"}
+        )
+        self.assertEqual(report["cases"]["first_page"]["queries"], 3)
+        self.assertEqual(report["cases"]["deep_page"]["items"], 2)
+        self.assertFalse(
+            get_user_model().objects.filter(email=feed.VIEWER_EMAIL).exists()
+        )
+
+
+class FeedRankingEvaluationTests(TestCase):
+    """Tests for the offline feed ranking evaluation."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="viewer@example.com", password="testpass123"
+        )
+        author = get_user_model().objects.create_user(
+            email="author@example.com", password="testpass123"
+        )
+        self.recipes = [
+            Recipe.objects.create(
+                author=author, title=f"R{n}", instructions="Cook", is_published=True
+            )
+            for n in range(3)
+        ]
+
+    def log(self, features, days_ago=5):
+        """Log a feed of the recipes in order, with the given feature vectors."""
+        log = FeedLog.objects.create(
+            user=self.user,
+            order="chronological",
+            served=3,
+            items=[
+                [recipe.pk, "recipe", vector]
+                for recipe, vector in zip(self.recipes, features)
+            ],
+        )
+        served_at = timezone.now() - timedelta(days=days_ago)
+        FeedLog.objects.filter(pk=log.pk).update(created_at=served_at)
+        return served_at
+
+    def test_evaluate(self):
+        """Test candidates are labelled by later engagement and reordered."""
+        served_at = self.log(
+            [[1.0, 0.0, 0.0, 0.0], [0.9, 0.0, 0.0, 0.0], [0.5, 1.0, 0.0, 0.0]]
+        )
+        self.log([[1.0, 0.0, 0.0, 0.0]] * 3, days_ago=4)
+        favorite = Favorite.objects.create(user=self.user, recipe=self.recipes[2])
+        Favorite.objects.filter(pk=favorite.pk).update(
+            created_at=served_at + timedelta(hours=1)
+        )
+
+        report = feed_ranking.evaluate(weights={"recency": 1.0, "affinity": 1.0}, k=1)
+
+        self.assertEqual((report["feeds"], report["evaluated"]), (2, 1))
+        self.assertEqual(report["served"], {"ndcg": 0.0, "hit_rate": 0.0})
+        self.assertEqual(report["chronological"], {"ndcg": 0.0, "hit_rate": 0.0})
+        self.assertEqual(report["ranked"], {"ndcg": 1.0, "hit_rate": 1.0})
+
+    def test_time_scoring(self):
+        """Test the ranking stage is timed on synthetic candidates."""
+        timing = feed_ranking.time_scoring(candidates=500, repeat=3)
+
+        self.assertEqual(timing["candidates"], 500)
+        self.assertGreater(timing["p50_ms"], 0)
+
+    def test_command(self):
+        """Test evaluate_feed_ranking prints each order."""
+        out = StringIO()
+
+        call_command("evaluate_feed_ranking", "--weights", '{"recency": 1}', stdout=out)
+
+        self.assertIn("chronological", out.getvalue())
+        self.assertIn("Scoring 500 candidates", out.getvalue())
+
+
+@override_settings(
+    IMAGE_UPLOADS={
+        "MAX_BYTES": 1024 * 1024,
+        "MAX_PIXELS": 500_000,
+        "MAX_HEADER_BYTES": 256 * 1024,
+        "FORMATS": ["jpeg", "png", "webp"],
+    }
+)
+class UploadBenchmarkTests(TestCase):
+    """Tests for the upload pipeline benchmark."""
+
+    def test_run(self):
+        """Test each case runs through both pipelines."""
+        results = uploads.run(repeat=1, scale=0.1)
+
+        self.assertEqual(set(results), {"photo", "bomb", "oversized"})
+        self.assertTrue(results["photo"]["streaming"]["accepted"])
+        self.assertFalse(results["bomb"]["streaming"]["accepted"])
+        self.assertTrue(results["bomb"]["legacy"]["accepted"])
+        self.assertFalse(results["oversized"]["streaming"]["accepted"])
+        self.assertGreater(results["photo"]["legacy"]["ms"], 0)
+
+
+class RunnerStatsTests(TestCase):
+    """Tests for result aggregation and comparison."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarize_counts_errors(self):
+        """Test errors and query counts are aggregated."""
+        summary = summarize([(10.0, 200, 3), (20.0, 500, 5), (30.0, 0, None)], 1.0)
+
+        self.assertEqual(summary["requests"], 3)
+        self.assertEqual(summary["errors"], 2)
+        self.assertEqual(summary["queries"]["max"], 5)
+
+    def test_compare_flags_regressions(self):
+        """Test slower p95 beyond tolerance is flagged."""
+
+        def result(p95, queries, rps):
+            return {
+                "scenarios": {
+                    "detail": {
+                        "latency_ms": {"p95": p95},
+                        "queries": {"avg": queries},
+                        "throughput_rps": rps,
+                    }
+                }
+            }
+
+        rows = compare_results(result(10, 5, 100), result(15, 5, 100))
+        regressed = {row[1] for row in rows if row[5]}
+        self.assertEqual(regressed, {"p95_ms"})
+
+
+class LoadRunnerTests(LiveServerTestCase):
+    """Run the load runner briefly against a live server."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_run_scenarios(self):
+        """Test every scenario is exercised and summarized."""
+        dataset.seed_dataset(users=10, recipes_per_user=2, max_follows=5)
+        users = list(get_user_model().objects.filter(email__startswith="bench-"))
+        context = build_context(
+            [u.pk for u in users],
+            list(Recipe.objects.filter(is_published=True).values_list("pk", flat=True)),
+        )
+        token = str(RefreshToken.for_user(users[0]).access_token)
+
+        runner = LoadRunner(
+            self.live_server_url,
+            get_scenarios(["browse_list", "detail", "feed"]),
+            context,
+            [token],
+            concurrency=1,
+            duration=1,
+        )
+        results = runner.run()
+
+        self.assertGreater(results["total"]["requests"], 0)
+        self.assertEqual(results["total"]["errors"], 0)
+        self.assertIsNotNone(results["total"]["latency_ms"]["p95"])
@@ -1,8 +1,14 @@
+import random
+from io import StringIO
 from unittest.mock import patch
 
+from benchmarks import synthetic
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
 from django.db.utils import OperationalError
 from django.test import TestCase
+from interaction.models import Comment, Follow, Notification, Rating
+from recipe.models import Ingredient, Recipe
 
 
 class CommandTests(TestCase):
@@ -21,3 +27,39 @@ class CommandTests(TestCase):
             gi.side_effect = [OperationalError] * 5 + [True]
             call_command("wait_for_db")
             self.assertEqual(gi.call_count, 6)
+
+
+class SeedDataCommandTests(TestCase):
+    """Tests for the seed_data command."""
+
+    def test_seed_data(self):
+        """Test seeding populates every table and leaves sequences usable."""
+        out = StringIO()
+        call_command("seed_data", users=30, chunk_size=10, workers=1, stdout=out)
+
+        self.assertEqual(
+            get_user_model().objects.filter(email__startswith="bench-").count(), 30
+        )
+        self.assertEqual(Recipe.objects.count(), 150)
+        for model in [Ingredient, Follow, Rating, Comment, Notification]:
+            self.assertTrue(model.objects.exists(), model.__name__)
+        self.assertTrue(Comment.objects.filter(parent__isnull=False).exists())
+        self.assertIn("Seeded", out.getvalue())
+        for prep, cook, total in Recipe.objects.values_list(
+            "prep_time", "cook_time", "total_time"
+        ):
+            self.assertEqual(total, (prep or 0) + (cook or 0))
+        self.assertTrue(Recipe.objects.filter(total_time__gt=0).exists())
+
+        user = get_user_model().objects.create_user(email="new@example.com")
+        Recipe.objects.create(author=user, title="After seed", instructions="Test")
+
+    def test_chunks_are_deterministic(self):
+        """Test a chunk generates identical rows for the same seed."""
+        plan = synthetic.build_plan(users=20, chunk_size=10)
+
+        def rows():
+            rng = random.Random(f"{plan['seed']}:recipe_children:0")
+            return synthetic.GENERATORS["recipe_children"](rng, 0, 10, plan)
+
+        self.assertEqual(rows(), rows())
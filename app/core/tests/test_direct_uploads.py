@@ -0,0 +1,294 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from core import media
+from core.image_jobs import PENDING, READY, image_processor
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from recipe.models import Recipe
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .test_images import image_upload_url, make_upload
+
+ME_URL = reverse("auth:me")
+ME_UPLOAD_URL = reverse("auth:me-photo-upload-url")
+
+
+def upload_url_url(recipe_id):
+    """Return URL for issuing a recipe image upload URL."""
+    return reverse("recipe:recipe-upload-url", args=[recipe_id])
+
+
+class DirectUploadTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            author=self.user, title="Soup", instructions="Boil", is_published=True
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def start(self, url=None, content_type="image/jpeg"):
+        res = self.client.post(
+            url or upload_url_url(self.recipe.id), {"content_type": content_type}
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return res.data
+
+    def put(self, ticket, data, content_type="image/jpeg"):
+        # The token in the URL is the only credential.
+        return APIClient().put(ticket["url"], data, content_type=content_type)
+
+
+class RecipeDirectUploadTests(DirectUploadTestCase):
+    """Tests for uploading recipe images straight to storage."""
+
+    def test_upload_and_claim(self):
+        """Test a PUT upload claimed by token becomes the recipe image."""
+        ticket = self.start()
+
+        self.assertEqual(ticket["method"], "PUT")
+        self.assertEqual(ticket["headers"], {"Content-Type": "image/jpeg"})
+        res = self.put(ticket, make_upload().read())
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        res = self.client.post(
+            image_upload_url(self.recipe.id), {"upload": ticket["upload"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["image_status"], READY)
+        self.assertNotIn("upload", res.data)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_variants["card"]["width"], 600)
+        self.assertEqual(
+            os.listdir(os.path.join(self.media_root, "recipes", "originals")), []
+        )
+
+    def test_unknown_content_type_rejected(self):
+        """Test only image content types get an upload URL."""
+        res = self.client.post(
+            upload_url_url(self.recipe.id), {"content_type": "image/gif"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("content_type", res.data)
+
+    def test_other_users_recipe_forbidden(self):
+        """Test only the author can get an upload URL for a recipe."""
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=other)
+
+        res = self.client.post(
+            upload_url_url(self.recipe.id), {"content_type": "image/jpeg"}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_put_checks_content_type(self):
+        """Test the PUT must use the content type the URL was issued for."""
+        res = self.put(self.start(), make_upload().read(), content_type="image/png")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_put_url_rejected(self):
+        """Test a PUT after the URL expired is refused."""
+        with override_settings(DIRECT_UPLOADS={"EXPIRES": -1, "CLAIM_MAX_AGE": 60}):
+            ticket = self.start()
+
+        res = self.put(ticket, make_upload().read())
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_tampered_put_url_rejected(self):
+        """Test a PUT URL with a modified token is refused."""
+        ticket = self.start()
+        ticket["url"] = ticket["url"].replace("/uploads/", "/uploads/x")
+
+        res = self.put(ticket, make_upload().read())
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_oversized_put_rejected(self):
+        """Test a PUT body over MAX_BYTES is refused and not stored."""
+        ticket = self.start()
+        limits = {
+            "MAX_BYTES": 1024,
+            "MAX_PIXELS": 40_000_000,
+            "MAX_HEADER_BYTES": 256 * 1024,
+            "FORMATS": ["jpeg", "png", "webp"],
+        }
+        with override_settings(IMAGE_UPLOADS=limits):
+            res = self.put(ticket, make_upload().read())
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.media_root, "recipes", "originals"))
+        )
+
+    def test_claim_before_upload(self):
+        """Test claiming a token with nothing uploaded fails validation."""
+        ticket = self.start()
+
+        res = self.client.post(
+            image_upload_url(self.recipe.id), {"upload": ticket["upload"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data["upload"], ["No file has been uploaded for this token."]
+        )
+
+    def test_claim_for_other_recipe_rejected(self):
+        """Test a token cannot be used on a different recipe."""
+        ticket = self.start()
+        self.put(ticket, make_upload().read())
+        other = Recipe.objects.create(
+            author=self.user, title="Stew", instructions="Simmer", is_published=True
+        )
+
+        res = self.client.post(image_upload_url(other.id), {"upload": ticket["upload"]})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["upload"], ["Invalid upload token."])
+
+    def test_claim_invalid_image_deletes_it(self):
+        """Test a stored object that is not an image is rejected and removed."""
+        ticket = self.start()
+        self.put(ticket, b"not an image at all")
+
+        res = self.client.post(
+            image_upload_url(self.recipe.id), {"upload": ticket["upload"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Image format must be one of", res.data["upload"][0])
+        self.assertEqual(
+            os.listdir(os.path.join(self.media_root, "recipes", "originals")), []
+        )
+
+    def test_file_or_token_required(self):
+        """Test exactly one of image and upload must be sent."""
+        ticket = self.start()
+        self.put(ticket, make_upload().read())
+
+        both = self.client.post(
+            image_upload_url(self.recipe.id),
+            {"image": make_upload(), "upload": ticket["upload"]},
+            format="multipart",
+        )
+        neither = self.client.post(image_upload_url(self.recipe.id), {})
+
+        self.assertEqual(both.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(neither.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_gc_removes_unclaimed_uploads(self):
+        """Test gc_media --scan deletes originals that were never claimed."""
+        ticket = self.start()
+        self.put(ticket, make_upload().read())
+        directory = os.path.join(self.media_root, "recipes", "originals")
+
+        self.assertEqual(media.collect_garbage(scan=True)["files"], 0)
+        report = media.collect_garbage(grace=timedelta(0), scan=True)
+
+        self.assertEqual(report["files"], 1)
+        self.assertEqual(os.listdir(directory), [])
+
+
+class ProfileDirectUploadTests(DirectUploadTestCase):
+    """Tests for uploading profile photos straight to storage."""
+
+    def tearDown(self):
+        self.user.refresh_from_db()
+        media.release(media.field_paths(self.user, "profile_photo"))
+        super().tearDown()
+
+    def test_upload_and_claim(self):
+        """Test a profile photo can be set from an upload token."""
+        ticket = self.start(ME_UPLOAD_URL)
+        self.put(ticket, make_upload(500, 500).read())
+
+        res = self.client.patch(ME_URL, {"profile_photo_upload": ticket["upload"]})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["profile_photo_status"], READY)
+        self.assertIn("thumbnail", res.data["profile_photo_srcset"])
+
+    def test_recipe_token_rejected(self):
+        """Test a recipe upload token cannot set the profile photo."""
+        ticket = self.start()
+        self.put(ticket, make_upload().read())
+
+        res = self.client.patch(ME_URL, {"profile_photo_upload": ticket["upload"]})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["profile_photo_upload"], ["Invalid upload token."])
+
+
+class BackgroundDirectUploadTests(TransactionTestCase):
+    """Tests for processing claimed uploads in the worker pool."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_PROCESSING={
+                "WORKERS": 1,
+                "MAX_PENDING": 4,
+                "START_METHOD": "spawn",
+                "NICE": 0,
+            },
+        )
+        self.settings_override.enable()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            author=self.user, title="Soup", instructions="Boil", is_published=True
+        )
+
+    def tearDown(self):
+        image_processor.shutdown()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_claimed_upload_is_processed_off_request(self):
+        """Test a claimed upload returns pending and is processed in the pool."""
+        ticket = self.client.post(
+            upload_url_url(self.recipe.id), {"content_type": "image/jpeg"}
+        ).data
+        APIClient().put(ticket["url"], make_upload().read(), content_type="image/jpeg")
+
+        res = self.client.post(
+            image_upload_url(self.recipe.id), {"upload": ticket["upload"]}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["image_status"], PENDING)
+        self.recipe.refresh_from_db()
+        original = self.recipe.image_source
+
+        image_processor.shutdown()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, READY)
+        self.assertEqual(self.recipe.image_variants["card"]["width"], 600)
+        self.assertFalse(default_storage.exists(original))
@@ -0,0 +1,274 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+
+from core import media
+from core.image_jobs import FAILED, PENDING, READY, image_processor
+from core.images import build_variants, variant_paths
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from recipe.models import Recipe
+from rest_framework import status
+from rest_framework.test import APIClient
+
+ME_URL = reverse("auth:me")
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+def image_upload_url(recipe_id):
+    """Return URL for recipe image upload."""
+    return reverse("recipe:recipe-upload-image", args=[recipe_id])
+
+
+def make_upload(
+    width=1600, height=1000, format="JPEG", name="photo.jpg", exif=None, color="green"
+):
+    """Return an in-memory uploaded image."""
+    output = BytesIO()
+    img = Image.new("RGB", (width, height), color=color)
+    img.save(output, format=format, **({"exif": exif} if exif else {}))
+    return SimpleUploadedFile(name, output.getvalue(), content_type="image/jpeg")
+
+
+class BuildVariantsTests(TestCase):
+    """Tests for decoding an upload into responsive variants."""
+
+    def test_sizes_and_formats(self):
+        """Test each recipe size is produced as WebP and JPEG."""
+        variants = build_variants(make_upload(), "recipe")
+
+        self.assertEqual(
+            {name: (v["width"], v["height"]) for name, v in variants.items()},
+            {"full": (1200, 750), "card": (600, 375), "thumbnail": (300, 300)},
+        )
+        for variant in variants.values():
+            self.assertEqual(Image.open(BytesIO(variant["webp"])).format, "WEBP")
+            self.assertEqual(Image.open(BytesIO(variant["jpeg"])).format, "JPEG")
+
+    def test_small_images_are_not_upscaled(self):
+        """Test images smaller than a size keep their dimensions."""
+        variants = build_variants(make_upload(200, 100), "recipe")
+
+        self.assertEqual(variants["full"]["width"], 200)
+        self.assertEqual(variants["thumbnail"]["width"], 100)
+
+    def test_exif_is_stripped(self):
+        """Test metadata from the upload is not re-encoded."""
+        exif = Image.Exif()
+        exif[0x010F] = "Camera Maker"
+        variants = build_variants(make_upload(exif=exif.tobytes()), "recipe")
+
+        jpeg = Image.open(BytesIO(variants["full"]["jpeg"]))
+        self.assertFalse(jpeg.getexif())
+
+
+class ImageVariantsApiTests(TestCase):
+    """Tests for variants on recipe images and profile photos."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            author=self.user, title="Soup", instructions="Boil", is_published=True
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_upload_stores_variants(self):
+        """Test recipe uploads store every variant and expose a srcset."""
+        res = self.client.post(
+            image_upload_url(self.recipe.id),
+            {"image": make_upload()},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        variants = self.recipe.image_variants
+        self.assertEqual(variants["full"]["jpeg"], self.recipe.image.name)
+        for path in variant_paths(variants):
+            self.assertTrue(default_storage.exists(path), path)
+        srcset = res.data["image_srcset"]
+        self.assertEqual(set(srcset), {"thumbnail", "card", "full"})
+        self.assertTrue(srcset["card"]["webp"].startswith("http://testserver/"))
+
+    def test_list_exposes_srcset(self):
+        """Test list cards can pick a small variant."""
+        self.client.post(
+            image_upload_url(self.recipe.id),
+            {"image": make_upload()},
+            format="multipart",
+        )
+
+        res = self.client.get(RECIPES_URL)
+
+        card = res.data["results"][0]["image_srcset"]["card"]
+        self.assertEqual(card["width"], 600)
+        self.assertTrue(card["webp"].endswith(".webp"))
+
+    def test_reupload_releases_old_variants(self):
+        """Test replacing an image leaves the previous files to garbage collection."""
+        url = image_upload_url(self.recipe.id)
+        self.client.post(url, {"image": make_upload()}, format="multipart")
+        self.recipe.refresh_from_db()
+        old = variant_paths(self.recipe.image_variants)
+
+        self.client.post(url, {"image": make_upload(color="red")}, format="multipart")
+        media.collect_garbage(grace=timedelta(0))
+
+        for path in old:
+            self.assertFalse(default_storage.exists(path), path)
+
+    def test_profile_photo_variants(self):
+        """Test profile photo uploads get profile-sized variants."""
+        res = self.client.patch(
+            ME_URL, {"profile_photo": make_upload()}, format="multipart"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_photo_variants["thumbnail"]["width"], 64)
+        self.assertEqual(os.path.splitext(self.user.profile_photo.name)[1], ".jpg")
+        self.assertIn("thumbnail", res.data["profile_photo_srcset"])
+
+    def test_no_image_has_empty_srcset(self):
+        """Test recipes without an image expose an empty srcset."""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data["results"][0]["image_srcset"], {})
+
+
+class BackgroundProcessingTests(TransactionTestCase):
+    """Tests for processing uploads in the worker pool."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_PROCESSING={
+                "WORKERS": 1,
+                "MAX_PENDING": 4,
+                "START_METHOD": "spawn",
+                "NICE": 0,
+            },
+        )
+        self.settings_override.enable()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            author=self.user, title="Soup", instructions="Boil", is_published=True
+        )
+
+    def tearDown(self):
+        image_processor.shutdown()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_upload_is_processed_off_request(self):
+        """Test the upload returns pending and the pool fills in variants."""
+        res = self.client.post(
+            image_upload_url(self.recipe.id),
+            {"image": make_upload()},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data["image_status"], PENDING)
+        self.assertEqual(res.data["image_srcset"], {})
+        self.recipe.refresh_from_db()
+        original = self.recipe.image_source
+        self.assertTrue(default_storage.exists(original))
+
+        image_processor.shutdown()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, READY)
+        self.assertEqual(self.recipe.image_source, "")
+        self.assertEqual(self.recipe.image_variants["card"]["width"], 600)
+        self.assertFalse(default_storage.exists(original))
+        res = self.client.get(reverse("recipe:recipe-detail", args=[self.recipe.id]))
+        self.assertEqual(res.data["image_status"], READY)
+        self.assertIn("card", res.data["image_srcset"])
+
+    def test_worker_error_marks_failed(self):
+        """Test a job that raises in the worker is marked failed."""
+        broken = {**settings.IMAGE_VARIANTS, "profile": {"full": {"width": 0}}}
+        with override_settings(IMAGE_VARIANTS=broken):
+            res = self.client.patch(
+                ME_URL, {"profile_photo": make_upload()}, format="multipart"
+            )
+            self.assertEqual(res.data["profile_photo_status"], PENDING)
+            image_processor.shutdown()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.profile_photo_status, FAILED)
+        self.assertEqual(self.user.profile_photo_variants, {})
+        self.assertEqual(self.user.profile_photo_source, "")
+
+    def test_newer_upload_wins(self):
+        """Test a job superseded by a newer upload is discarded."""
+        url = image_upload_url(self.recipe.id)
+        self.client.post(url, {"image": make_upload(color="red")}, format="multipart")
+        self.client.post(url, {"image": make_upload(400, 300)}, format="multipart")
+
+        image_processor.shutdown()
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, READY)
+        self.assertEqual(self.recipe.image_variants["full"]["width"], 400)
+        self.assertEqual(
+            os.listdir(os.path.join(self.media_root, "recipes", "originals")), []
+        )
+
+    def test_queue_limit_rejects_uploads(self):
+        """Test uploads beyond MAX_PENDING are refused with Retry-After."""
+        limits = {**settings.IMAGE_PROCESSING, "MAX_PENDING": 0}
+        with override_settings(IMAGE_PROCESSING=limits):
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {"image": make_upload()},
+                format="multipart",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn("Retry-After", res)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, "")
+
+    def test_rolled_back_uploads_hold_no_slot(self):
+        """Test an upload whose transaction rolls back frees its queue slot."""
+        limits = {**settings.IMAGE_PROCESSING, "MAX_PENDING": 1}
+        with override_settings(IMAGE_PROCESSING=limits):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError), transaction.atomic():
+                    image_processor.submit(
+                        self.recipe, "image", make_upload(), "recipe"
+                    )
+                    raise RuntimeError
+
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {"image": make_upload()},
+                format="multipart",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
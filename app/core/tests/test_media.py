@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from core import media
+from core.models import MediaBlob
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe.models import Recipe
+from rest_framework.test import APIClient
+
+from .test_images import image_upload_url, make_upload
+
+
+class MediaTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+
+class ContentAddressedStorageTests(MediaTestCase):
+    """Tests for writing and collecting content-addressed files."""
+
+    def test_put_dedupes(self):
+        """Test identical bytes are stored once with a reference each."""
+        first = media.put(b"same bytes", "jpg")
+        second = media.put(b"same bytes", "jpg")
+
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("cas/"))
+        self.assertEqual(MediaBlob.objects.get(path=first).refs, 2)
+        self.assertEqual(
+            len(os.listdir(os.path.dirname(default_storage.path(first)))), 1
+        )
+
+    def test_gc_waits_for_grace_period(self):
+        """Test unreferenced blobs survive until the grace period passes."""
+        path = media.put(b"bytes", "webp")
+        media.release([path])
+
+        self.assertEqual(media.collect_garbage()["blobs"], 0)
+        self.assertTrue(default_storage.exists(path))
+
+        report = media.collect_garbage(grace=timedelta(0))
+
+        self.assertEqual(report, {"blobs": 1, "files": 0, "bytes": 5})
+        self.assertFalse(default_storage.exists(path))
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_referenced_blobs_kept(self):
+        """Test blobs with references are never collected."""
+        path = media.put(b"bytes", "webp")
+
+        media.collect_garbage(grace=timedelta(0))
+
+        self.assertTrue(default_storage.exists(path))
+
+    def test_release_ignores_other_paths(self):
+        """Test files outside content storage are left alone."""
+        media.release(["recipes/legacy.jpg"])
+
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_scan_removes_untracked_files(self):
+        """Test files without a blob row are removed by a scan."""
+        stray = default_storage.save("cas/ab/cd/stray.jpg", ContentFile(b"x"))
+        kept = media.put(b"kept", "jpg")
+
+        report = media.collect_garbage(grace=timedelta(0), scan=True)
+
+        self.assertEqual(report["files"], 1)
+        self.assertFalse(default_storage.exists(stray))
+        self.assertTrue(default_storage.exists(kept))
+
+
+class ImageReferenceTests(MediaTestCase):
+    """Tests for reference counts kept by image uploads."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipes = [
+            Recipe.objects.create(author=self.user, title=title, instructions="Boil")
+            for title in ("Soup", "Stew")
+        ]
+
+    def upload(self, recipe, **kwargs):
+        self.client.post(
+            image_upload_url(recipe.id),
+            {"image": make_upload(**kwargs)},
+            format="multipart",
+        )
+        recipe.refresh_from_db()
+        return media.field_paths(recipe, "image")
+
+    def test_identical_uploads_share_files(self):
+        """Test the same image on two recipes is stored once."""
+        first = self.upload(self.recipes[0])
+        second = self.upload(self.recipes[1])
+
+        self.assertEqual(first, second)
+        refs = set(
+            MediaBlob.objects.filter(path__in=first).values_list("refs", flat=True)
+        )
+        self.assertEqual(refs, {2})
+
+    def test_small_image_sizes_counted_once(self):
+        """Test sizes that encode to the same bytes hold one reference."""
+        paths = self.upload(self.recipes[0], width=200, height=200)
+
+        self.assertEqual(len(paths), 2)  # each size is the 200px original
+        self.assertEqual(set(MediaBlob.objects.values_list("refs", flat=True)), {1})
+
+    def test_delete_releases_files(self):
+        """Test deleting a recipe lets its files be collected."""
+        paths = self.upload(self.recipes[0])
+
+        self.recipes[0].delete()
+        media.collect_garbage(grace=timedelta(0))
+
+        for path in paths:
+            self.assertFalse(default_storage.exists(path), path)
+
+    def test_clearing_profile_photo_releases_files(self):
+        """Test removing a profile photo releases its references."""
+        self.client.patch(
+            reverse("auth:me"), {"profile_photo": make_upload()}, format="multipart"
+        )
+        self.user.refresh_from_db()
+        paths = media.field_paths(self.user, "profile_photo")
+
+        self.client.patch(reverse("auth:me"), {"profile_photo": ""}, format="multipart")
+
+        self.assertEqual(
+            set(
+                MediaBlob.objects.filter(path__in=paths).values_list("refs", flat=True)
+            ),
+            {0},
+        )
+
+    def test_recount_repairs_drift(self):
+        """Test recount restores counts from the models."""
+        paths = self.upload(self.recipes[0])
+        MediaBlob.objects.update(refs=0)
+        orphan = media.put(b"orphan", "jpg")
+
+        changed = media.recount()
+
+        self.assertEqual(changed, len(paths) + 1)
+        self.assertEqual(MediaBlob.objects.get(path=orphan).refs, 0)
+        self.assertEqual(
+            set(
+                MediaBlob.objects.filter(path__in=paths).values_list("refs", flat=True)
+            ),
+            {1},
+        )
+
+    def test_gc_media_command(self):
+        """Test the management command reports and deletes orphans."""
+        paths = self.upload(self.recipes[0])
+        self.upload(self.recipes[0], color="red")
+        out = StringIO()
+
+        call_command("gc_media", "--grace-hours", "0", "--dry-run", stdout=out)
+        self.assertIn(f"Would delete {len(paths)} blob(s)", out.getvalue())
+        self.assertTrue(all(default_storage.exists(path) for path in paths))
+
+        call_command("gc_media", "--grace-hours", "0", stdout=StringIO())
+        self.assertFalse(any(default_storage.exists(path) for path in paths))
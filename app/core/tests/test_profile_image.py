@@ -1,5 +1,7 @@
 import tempfile
+from datetime import timedelta
 
+from core import media
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
@@ -23,8 +25,9 @@ class ProfilePhotoUploadTests(TestCase):
 
     def tearDown(self):
         """Clean up test images."""
-        if self.user.profile_photo:
-            self.user.profile_photo.delete()
+        self.user.refresh_from_db()
+        media.release(media.field_paths(self.user, "profile_photo"))
+        media.collect_garbage(grace=timedelta(0))
 
     def test_upload_profile_photo(self):
         """Test uploading a profile photo."""
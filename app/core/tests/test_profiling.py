@@ -0,0 +1,125 @@
+from unittest.mock import patch
+
+from core.profiling import (
+    EndpointStats,
+    QueryBudgetExceeded,
+    QueryProfilerMiddleware,
+    normalize_sql,
+    profile_queries,
+    query_budget,
+)
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+
+class NormalizeSQLTests(TestCase):
+    """Tests for SQL template normalization."""
+
+    def test_in_lists_collapse(self):
+        """Test IN lists of any length share a template."""
+        short = normalize_sql('SELECT * FROM "t" WHERE "id" IN (%s, %s)')
+        long = normalize_sql('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s, %s)')
+        self.assertEqual(short, long)
+
+    def test_literals_replaced(self):
+        """Test inline literals are replaced by placeholders."""
+        self.assertEqual(
+            normalize_sql("SELECT 1 FROM t WHERE name = 'it''s'  AND id = 42"),
+            "SELECT ? FROM t WHERE name = ? AND id = ?",
+        )
+
+
+class QueryCollectorTests(TestCase):
+    """Tests for query capture and N+1 detection."""
+
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f"user{i}@example.com",
+                password="testpass123",
+            )
+            for i in range(5)
+        ]
+
+    def test_repeated_template_flagged_with_origin(self):
+        """Test one query per row is reported as N+1 with its origin."""
+        with profile_queries(n_plus_one_threshold=5) as collector:
+            for user in self.users:
+                get_user_model().objects.get(pk=user.pk)
+
+        self.assertEqual(collector.count, 5)
+        repeated = collector.n_plus_one()
+        self.assertEqual(len(repeated), 1)
+        self.assertEqual(repeated[0]["count"], 5)
+        origin = next(iter(repeated[0]["origins"]))
+        self.assertTrue(origin.startswith("core/tests/test_profiling.py:"))
+
+    def test_distinct_queries_not_flagged(self):
+        """Test a bounded number of queries is not an N+1 pattern."""
+        with profile_queries(n_plus_one_threshold=5) as collector:
+            list(get_user_model().objects.all())
+            get_user_model().objects.count()
+
+        self.assertEqual(collector.count, 2)
+        self.assertEqual(collector.n_plus_one(), [])
+
+    def test_slow_queries_logged(self):
+        """Test queries above the threshold are logged and reported."""
+        with self.assertLogs("core.profiling", level="WARNING") as logs:
+            with profile_queries(slow_query_ms=0) as collector:
+                get_user_model().objects.count()
+
+        self.assertEqual(len(collector.report()["slow"]), 1)
+        self.assertIn("Slow query", logs.output[0])
+
+    def test_query_budget_exceeded(self):
+        """Test exceeding the budget raises with a per-template breakdown."""
+        with self.assertRaises(QueryBudgetExceeded) as ctx:
+            with query_budget(1):
+                get_user_model().objects.count()
+                get_user_model().objects.exists()
+
+        self.assertIn("2 queries executed, budget is 1", str(ctx.exception))
+
+    def test_query_budget_rejects_n_plus_one(self):
+        """Test N+1 patterns fail the budget unless explicitly allowed."""
+        with self.assertRaises(QueryBudgetExceeded):
+            with query_budget(10):
+                for user in self.users:
+                    get_user_model().objects.get(pk=user.pk)
+
+        with query_budget(10, allow_n_plus_one=True):
+            for user in self.users:
+                get_user_model().objects.get(pk=user.pk)
+
+
+class QueryProfilerMiddlewareTests(TestCase):
+    """Tests for the request profiling middleware."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_disabled_by_default(self):
+        """Test the middleware is dropped unless enabled."""
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryProfilerMiddleware(lambda request: HttpResponse())
+
+    @override_settings(QUERY_PROFILER={"ENABLED": True, "RESPONSE_HEADERS": True})
+    def test_headers_and_endpoint_stats(self):
+        """Test query count headers and per-endpoint aggregation."""
+
+        def view(request):
+            get_user_model().objects.count()
+            return HttpResponse()
+
+        stats = EndpointStats()
+        with patch("core.profiling.endpoint_stats", stats):
+            middleware = QueryProfilerMiddleware(view)
+            response = middleware(self.factory.get("/api/recipes/"))
+
+        self.assertEqual(response["X-Query-Count"], "1")
+        report = stats.snapshot()["GET /api/recipes/"]
+        self.assertEqual(report["requests"], 1)
+        self.assertEqual(report["max_queries"], 1)
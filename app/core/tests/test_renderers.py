@@ -0,0 +1,146 @@
+import datetime
+import decimal
+import json
+import uuid
+from zoneinfo import ZoneInfo
+
+from core.renderers import FastJSONRenderer, dumps, iter_json
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from recipe.models import Recipe
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+class FastJSONRendererTests(TestCase):
+    """FastJSONRenderer output matches DRF's JSONRenderer."""
+
+    def assertSameOutput(self, data, media_type=None, context=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, media_type, context),
+            JSONRenderer().render(data, media_type, context),
+        )
+
+    def test_native_types(self):
+        """Test datetimes, decimals and other encoder types match."""
+        now = timezone.now()
+        self.assertSameOutput(
+            {
+                "utc": now,
+                "local": now.astimezone(ZoneInfo("Europe/Berlin")),
+                "naive": datetime.datetime(2024, 1, 2, 3, 4, 5),
+                "date": datetime.date(2024, 1, 2),
+                "quantity": decimal.Decimal("1.25"),
+                "uuid": uuid.UUID(int=1),
+                "lazy": gettext_lazy("Not found."),
+                "unicode": "crème brûlée \u2028 \u2029 – ok",
+                1: [None, True, 1.5],
+            }
+        )
+
+    def test_big_integers_fall_back(self):
+        """Test values orjson cannot encode use the stdlib encoder."""
+        self.assertSameOutput({"big": 2**70})
+
+    def test_indent_uses_stdlib_path(self):
+        """Test pretty-printed output is unchanged."""
+        self.assertSameOutput({"a": [1, 2]}, "application/json; indent=4")
+        self.assertSameOutput({"a": [1, 2]}, context={"indent": 2})
+
+    def test_iter_json_matches_dumps(self):
+        """Test streamed chunks join to the same document."""
+        page = {
+            "count": 5,
+            "next": None,
+            "previous": None,
+            "results": [{"id": i} for i in range(5)],
+        }
+
+        for data in (page, {"results": []}, {"detail": "x"}, [1, 2]):
+            self.assertEqual(b"".join(iter_json(data, chunk_items=2)), dumps(data))
+
+
+@override_settings(JSON_STREAMING={"MIN_ITEMS": 2, "CHUNK_ITEMS": 1})
+class StreamingListTests(TestCase):
+    """Tests for streaming large list responses."""
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        for i in range(3):
+            Recipe.objects.create(
+                author=user, title=f"Recipe {i}", instructions="Test", is_published=True
+            )
+
+    def test_large_page_is_streamed(self):
+        """Test lists at the threshold stream identical JSON."""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/json")
+        self.assertIn("ETag", res)
+        streamed = b"".join(res.streaming_content)
+
+        with override_settings(JSON_STREAMING={"MIN_ITEMS": None}):
+            rendered = self.client.get(RECIPES_URL).content
+        self.assertEqual(streamed, rendered)
+
+    @override_settings(JSON_STREAMING={"MIN_ITEMS": None, "CHUNK_ITEMS": 1})
+    def test_streaming_disabled(self):
+        """Test streaming can be switched off."""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertFalse(res.streaming)
+        self.assertEqual(len(res.data["results"]), 3)
+
+    def test_pretty_printed_response_not_streamed(self):
+        """Test indented responses render normally."""
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT="application/json; indent=2")
+
+        self.assertFalse(res.streaming)
+
+
+class RecipeListStreamingTests(TestCase):
+    """Tests for streaming recipe list pages at the default threshold."""
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=user, title=f"Recipe {i}", instructions="Test", is_published=True
+            )
+            for i in range(settings.JSON_STREAMING["MIN_ITEMS"] + 1)
+        )
+
+    def test_full_page_is_streamed(self):
+        """Test a page_size page at MIN_ITEMS is streamed, default pages not."""
+        page_size = settings.JSON_STREAMING["MIN_ITEMS"]
+
+        res = self.client.get(RECIPES_URL, {"page_size": page_size})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        data = json.loads(b"".join(res.streaming_content))
+        self.assertEqual(len(data["results"]), page_size)
+        self.assertEqual(data["count"], page_size + 1)
+        self.assertFalse(self.client.get(RECIPES_URL).streaming)
+
+    def test_page_size_is_capped(self):
+        """Test page_size cannot exceed the maximum."""
+        res = self.client.get(RECIPES_URL, {"page_size": 1000})
+
+        data = json.loads(b"".join(res.streaming_content))
+        self.assertEqual(len(data["results"]), 100)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+
+from core import retention
+from core.models import EmailVerificationToken, PasswordResetToken
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from interaction.models import FeedLog, Notification
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+@override_settings(
+    RETENTION={"READ_NOTIFICATION_DAYS": 30, "FEED_LOG_DAYS": 60, "BATCH_SIZE": 2}
+)
+class RetentionTests(TestCase):
+    """Tests for the retention policies."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.now = timezone.now()
+
+    def _notifications(self, is_read, age_days, count=1):
+        for _ in range(count):
+            notification = Notification.objects.create(
+                recipient=self.user, verb="followed", is_read=is_read
+            )
+            Notification.objects.filter(pk=notification.pk).update(
+                created_at=self.now - timedelta(days=age_days)
+            )
+
+    def test_expired_tokens(self):
+        """Test only expired verification and reset tokens are deleted."""
+        past = self.now - timedelta(minutes=1)
+        for model in (EmailVerificationToken, PasswordResetToken):
+            for _ in range(3):
+                model.objects.create(user=self.user, expires_at=past)
+            model.objects.create(user=self.user)
+
+        for name, model in (
+            ("email_verification_tokens", EmailVerificationToken),
+            ("password_reset_tokens", PasswordResetToken),
+        ):
+            report = retention.purge(name, now=self.now)
+            self.assertEqual(report["rows"], 3)
+            # A full batch, then a partial one that ends the walk
+            self.assertEqual(report["batches"], 2)
+            self.assertFalse(model.objects.filter(expires_at__lt=self.now).exists())
+            self.assertEqual(model.objects.count(), 1)
+
+    def test_read_notifications(self):
+        """Test read notifications older than the retention period go."""
+        self._notifications(is_read=True, age_days=31, count=5)
+        self._notifications(is_read=True, age_days=29)
+        self._notifications(is_read=False, age_days=60)
+
+        self.assertEqual(retention.count("read_notifications", now=self.now), 5)
+        report = retention.purge("read_notifications", now=self.now)
+
+        self.assertEqual(report["rows"], 5)
+        self.assertEqual(report["batches"], 3)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertTrue(Notification.objects.filter(is_read=False).exists())
+
+    def test_feed_logs(self):
+        """Test feed logs older than their retention period go."""
+        for age_days in (61, 90, 59):
+            log = FeedLog.objects.create(user=self.user, order="algorithmic", served=0)
+            FeedLog.objects.filter(pk=log.pk).update(
+                created_at=self.now - timedelta(days=age_days)
+            )
+
+        report = retention.purge("feed_logs", now=self.now)
+
+        self.assertEqual(report["rows"], 2)
+        self.assertEqual(FeedLog.objects.get().pk, log.pk)
+
+    def test_jwt_tokens(self):
+        """Test expired refresh tokens are deleted with their blacklist entries."""
+        tokens = [RefreshToken.for_user(self.user) for _ in range(3)]
+        for token in tokens[:2]:
+            token.blacklist()
+        expired = [token["jti"] for token in tokens[1:]]
+        OutstandingToken.objects.filter(jti__in=expired).update(
+            expires_at=self.now - timedelta(seconds=1)
+        )
+
+        report = retention.purge("jwt_tokens", now=self.now)
+
+        self.assertEqual(report["rows"], 2)
+        self.assertEqual(report["related"], 1)
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list("jti", flat=True)),
+            [tokens[0]["jti"]],
+        )
+        self.assertEqual(BlacklistedToken.objects.get().token.jti, tokens[0]["jti"])
+
+    def test_command(self):
+        """Test the apply_retention command reports each policy."""
+        self._notifications(is_read=True, age_days=31, count=3)
+        out = StringIO()
+
+        call_command("apply_retention", "read_notifications", "--dry-run", stdout=out)
+        self.assertIn("read_notifications: would delete 3 row(s)", out.getvalue())
+        self.assertEqual(Notification.objects.count(), 3)
+
+        call_command("apply_retention", stdout=out)
+        self.assertFalse(Notification.objects.exists())
+        for name in retention.POLICIES:
+            self.assertIn(name, out.getvalue())
@@ -0,0 +1,165 @@
+from core.serializers_fast import compile_serializer
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from interaction.models import Favorite, Follow, Notification, Rating
+from interaction.serializers import (
+    FeedItemSerializer,
+    FollowSerializer,
+    NotificationSerializer,
+    fast_feed_item,
+    fast_follow,
+    fast_notification,
+)
+from interaction.services.feed import FeedService
+from recipe.models import Recipe
+from recipe.serializers import RecipeListSerializer, fast_recipe_list
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+class CompiledSerializerGoldenTests(TestCase):
+    """Compiled serializers render byte-identical JSON to DRF."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="reader@example.com", password="testpass123", name="Reader"
+        )
+        self.chef = User.objects.create_user(
+            email="chef@example.com",
+            password="testpass123",
+            name="Chef",
+            is_verified=True,
+        )
+        self.chef.profile_photo = "profiles/chef.jpg"
+        self.chef.save()
+        self.silent = User.objects.create_user(
+            email="silent@example.com", password="testpass123"
+        )
+
+        self.with_image = Recipe.objects.create(
+            author=self.chef,
+            title="Soup",
+            description="Hot",
+            instructions="Boil",
+            prep_time=5,
+            cook_time=20,
+            difficulty="easy",
+            image="recipes/soup.jpg",
+            image_variants={
+                "card": {
+                    "width": 600,
+                    "height": 400,
+                    "webp": "recipes/variants/a_card.webp",
+                    "jpeg": "recipes/variants/a_card.jpg",
+                },
+            },
+            is_published=True,
+        )
+        self.plain = Recipe.objects.create(
+            author=self.silent,
+            title="Toast",
+            instructions="Toast it",
+            is_published=True,
+        )
+        Rating.objects.create(user=self.user, recipe=self.with_image, score=4)
+        Rating.objects.create(user=self.silent, recipe=self.with_image, score=5)
+        Favorite.objects.create(user=self.chef, recipe=self.plain)
+
+        Follow.objects.create(follower=self.user, following=self.chef)
+        Follow.objects.create(follower=self.user, following=self.silent)
+        Notification.objects.create(
+            recipient=self.user,
+            actor=self.chef,
+            verb="posted_recipe",
+            target_type="recipe",
+            target_id=self.with_image.id,
+        )
+        Notification.objects.create(
+            recipient=self.user, actor=None, verb="badge_awarded", is_read=True
+        )
+
+    def assertSameJSON(self, expected, actual):
+        render = JSONRenderer().render
+        self.assertEqual(render(actual), render(expected))
+
+    def test_recipe_list_matches(self):
+        """Test recipe list output, including absolute image URLs."""
+        request = Request(APIRequestFactory().get("/api/recipes/"))
+        recipes = list(Recipe.objects.select_related("author").order_by("pk"))
+
+        expected = RecipeListSerializer(
+            recipes, many=True, context={"request": request}
+        ).data
+
+        self.assertSameJSON(expected, fast_recipe_list.many(recipes, request))
+        self.assertSameJSON(
+            RecipeListSerializer(recipes, many=True).data,
+            fast_recipe_list.many(recipes),
+        )
+
+    def test_feed_items_match(self):
+        """Test feed items, with and without a score, match."""
+        items = FeedService.get_feed(self.user)
+        self.assertTrue(any("score" not in item for item in items))
+
+        expected = FeedItemSerializer(items, many=True).data
+
+        self.assertSameJSON(expected, fast_feed_item.many(items))
+
+    def test_notifications_match(self):
+        """Test notifications with and without an actor match."""
+        notifications = list(
+            Notification.objects.filter(recipient=self.user).select_related("actor")
+        )
+
+        expected = NotificationSerializer(notifications, many=True).data
+
+        self.assertSameJSON(expected, fast_notification.many(notifications))
+
+    def test_follows_match(self):
+        """Test follows with nested user summaries match."""
+        follows = list(
+            Follow.objects.filter(follower=self.user).select_related(
+                "follower", "following"
+            )
+        )
+
+        expected = FollowSerializer(follows, many=True).data
+
+        self.assertSameJSON(expected, fast_follow.many(follows))
+
+
+class CompiledSerializerTests(TestCase):
+    """Edge cases of compiled field access."""
+
+    def test_values_rows(self):
+        """Test dotted sources read ``__`` keys from ``.values()`` rows."""
+
+        class RowSerializer(serializers.Serializer):
+            id = serializers.IntegerField()
+            author_name = serializers.CharField(source="author.name")
+
+        row = {"id": 3, "author__name": "Chef"}
+
+        self.assertEqual(
+            compile_serializer(RowSerializer).to_representation(row),
+            {"id": 3, "author_name": "Chef"},
+        )
+
+    def test_missing_attributes(self):
+        """Test missing keys follow DRF default / null / skip rules."""
+
+        class ItemSerializer(serializers.Serializer):
+            kind = serializers.CharField(default="recipe")
+            score = serializers.IntegerField(required=False, allow_null=True)
+            note = serializers.CharField(read_only=True)
+
+        data = {}
+
+        self.assertEqual(
+            compile_serializer(ItemSerializer).to_representation(data),
+            dict(ItemSerializer(data).data),
+        )
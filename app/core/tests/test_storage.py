@@ -0,0 +1,163 @@
+import os
+from datetime import timedelta
+from unittest import mock
+
+import boto3
+import requests
+from core import media
+from core.storage import IMMUTABLE, S3MediaStorage
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from moto.server import ThreadedMotoServer
+from recipe.models import Recipe
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .test_images import image_upload_url, make_upload
+
+BUCKET = "media"
+
+CREDENTIALS = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+}
+
+
+class S3StorageTestCase(TestCase):
+    """Runs against a local S3-compatible server, as MinIO would be."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+        cls.server.start()
+        host, port = cls.server.get_host_and_port()
+        cls.endpoint = f"http://{host}:{port}"
+        cls.s3 = boto3.client(
+            "s3",
+            endpoint_url=cls.endpoint,
+            region_name="us-east-1",
+            aws_access_key_id="testing",
+            aws_secret_access_key="testing",
+        )
+        cls.s3.create_bucket(Bucket=BUCKET)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.settings_override = override_settings(
+            DEFAULT_FILE_STORAGE="core.storage.S3MediaStorage",
+            AWS_STORAGE_BUCKET_NAME=BUCKET,
+            AWS_S3_ENDPOINT_URL=self.endpoint,
+            AWS_S3_REGION_NAME="us-east-1",
+            AWS_S3_ADDRESSING_STYLE="path",
+            **CREDENTIALS,
+        )
+        self.settings_override.enable()
+        # boto3 would otherwise look for real credentials first
+        self.env = mock.patch.dict(os.environ, CREDENTIALS)
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.settings_override.disable()
+        objects = self.s3.list_objects_v2(Bucket=BUCKET).get("Contents", [])
+        for obj in objects:
+            self.s3.delete_object(Bucket=BUCKET, Key=obj["Key"])
+
+
+class S3MediaStorageTests(S3StorageTestCase):
+    """Tests for the S3-compatible storage backend."""
+
+    def test_default_storage_is_s3(self):
+        """Test DEFAULT_FILE_STORAGE selects the bucket backend."""
+        self.assertIsInstance(default_storage, S3MediaStorage)
+
+    def test_save_open_list(self):
+        """Test files round-trip through the bucket."""
+        name = default_storage.save("recipes/originals/a.jpg", ContentFile(b"abc"))
+
+        self.assertTrue(default_storage.exists(name))
+        with default_storage.open(name) as f:
+            self.assertEqual(f.read(), b"abc")
+        self.assertEqual(default_storage.listdir("recipes/originals"), ([], ["a.jpg"]))
+
+    def test_read_head_is_ranged(self):
+        """Test read_head returns only the leading bytes."""
+        default_storage.save("head.bin", ContentFile(b"0123456789"))
+
+        self.assertEqual(default_storage.read_head("head.bin", 4), b"0123")
+
+    def test_content_addressed_files_are_immutable(self):
+        """Test cas/ objects get a long-lived immutable Cache-Control."""
+        path = media.put(b"bytes", "webp")
+        default_storage.save("recipes/originals/b.jpg", ContentFile(b"abc"))
+
+        head = self.s3.head_object(Bucket=BUCKET, Key=path)
+        other = self.s3.head_object(Bucket=BUCKET, Key="recipes/originals/b.jpg")
+        self.assertEqual(head["CacheControl"], IMMUTABLE)
+        self.assertNotIn("CacheControl", other)
+
+    def test_presigned_put(self):
+        """Test a client can PUT to the pre-signed URL without credentials."""
+        url = default_storage.presigned_put("recipes/originals/c.jpg", "image/jpeg", 60)
+
+        res = requests.put(url, data=b"abc", headers={"Content-Type": "image/jpeg"})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(default_storage.size("recipes/originals/c.jpg"), 3)
+
+    def test_gc_scan_walks_prefixes(self):
+        """Test gc_media --scan finds stray files by key prefix."""
+        default_storage.save("cas/aa/bb/stray.webp", ContentFile(b"stray"))
+
+        report = media.collect_garbage(grace=timedelta(0), scan=True)
+
+        self.assertEqual(report["files"], 1)
+        self.assertFalse(default_storage.exists("cas/aa/bb/stray.webp"))
+
+
+class S3DirectUploadTests(S3StorageTestCase):
+    """Tests for the direct upload flow against the bucket."""
+
+    def test_upload_and_claim(self):
+        """Test an image PUT to the bucket is claimed and processed."""
+        client = APIClient()
+        user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        client.force_authenticate(user=user)
+        recipe = Recipe.objects.create(
+            author=user, title="Soup", instructions="Boil", is_published=True
+        )
+
+        ticket = client.post(
+            reverse("recipe:recipe-upload-url", args=[recipe.id]),
+            {"content_type": "image/jpeg"},
+        ).data
+        self.assertTrue(ticket["url"].startswith(f"{self.endpoint}/{BUCKET}/"))
+        res = requests.put(
+            ticket["url"], data=make_upload().read(), headers=ticket["headers"]
+        )
+        self.assertEqual(res.status_code, 200)
+
+        res = client.post(image_upload_url(recipe.id), {"upload": ticket["upload"]})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe.refresh_from_db()
+        card = recipe.image_variants["card"]["webp"]
+        self.assertTrue(card.startswith("cas/"))
+        self.assertEqual(
+            self.s3.head_object(Bucket=BUCKET, Key=card)["CacheControl"], IMMUTABLE
+        )
+        keys = [
+            obj["Key"]
+            for obj in self.s3.list_objects_v2(Bucket=BUCKET).get("Contents", [])
+        ]
+        self.assertFalse([key for key in keys if "/originals/" in key])
@@ -0,0 +1,211 @@
+import shutil
+import struct
+import tempfile
+import zlib
+from io import BytesIO
+from unittest import mock
+
+from core.images import build_variants
+from core.uploads import (
+    ImageUploadField,
+    ImageUploadHandler,
+    InvalidImage,
+    open_image,
+    sniff_format,
+)
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpRequest
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from recipe.models import Recipe
+from rest_framework import status
+from rest_framework.test import APIClient
+
+ME_URL = reverse("auth:me")
+
+LIMITS = {
+    "MAX_BYTES": 1024 * 1024,
+    "MAX_PIXELS": 1_000_000,
+    "MAX_HEADER_BYTES": 256 * 1024,
+    "FORMATS": ["jpeg", "png", "webp"],
+}
+
+
+def image_upload_url(recipe_id):
+    """Return URL for recipe image upload."""
+    return reverse("recipe:recipe-upload-image", args=[recipe_id])
+
+
+def image_bytes(width=100, height=80, format="JPEG", **options):
+    output = BytesIO()
+    Image.new("RGB", (width, height), color="red").save(
+        output, format=format, **options
+    )
+    return output.getvalue()
+
+
+def png_header(width, height):
+    """Return a PNG whose header claims ``width`` x ``height`` pixels."""
+
+    def chunk(kind, data):
+        crc = zlib.crc32(kind + data) & 0xFFFFFFFF
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", ihdr)
+        + chunk(b"IDAT", zlib.compress(b"\x00" * 1024))
+        + chunk(b"IEND", b"")
+    )
+
+
+def upload(data, name="photo.jpg"):
+    return SimpleUploadedFile(name, data, content_type="image/jpeg")
+
+
+class HeaderTests(TestCase):
+    """Tests for checks made from magic bytes and headers."""
+
+    def test_sniff_format(self):
+        """Test formats are recognised from their leading bytes."""
+        self.assertEqual(sniff_format(image_bytes()), "jpeg")
+        self.assertEqual(sniff_format(image_bytes(format="PNG")), "png")
+        self.assertEqual(sniff_format(image_bytes(format="WEBP")), "webp")
+        self.assertEqual(sniff_format(image_bytes(format="GIF")), "gif")
+        self.assertIsNone(sniff_format(b"<svg xmlns="))
+
+    @override_settings(IMAGE_UPLOADS=LIMITS)
+    def test_pixel_limit(self):
+        """Test images over MAX_PIXELS are refused from the header alone."""
+        open_image(BytesIO(png_header(1000, 1000)))
+
+        with self.assertRaisesRegex(InvalidImage, "1001x1000"):
+            open_image(BytesIO(png_header(1001, 1000)))
+
+    def test_decompression_bomb(self):
+        """Test Pillow's own bomb check is reported as a validation error."""
+        with self.assertRaisesRegex(InvalidImage, "too large"):
+            open_image(BytesIO(png_header(50_000, 50_000)))
+
+    @override_settings(IMAGE_UPLOADS=LIMITS)
+    def test_handler_parses_header_across_chunks(self):
+        """Test a header split over many small chunks is still found."""
+        exif = Image.Exif()
+        exif[0x010E] = "x" * 5000
+        data = image_bytes(exif=exif.tobytes())
+        request = HttpRequest()
+        handler = ImageUploadHandler(request)
+        handler.new_file("image", "photo.jpg", "image/jpeg", len(data))
+
+        for start in range(0, len(data), 512):
+            chunk = data[start : start + 512]  # noqa: E203
+            self.assertEqual(handler.receive_data_chunk(chunk, start), chunk)
+        handler.file_complete(len(data))
+
+        self.assertEqual(handler.header, ("jpeg", 100, 80))
+        self.assertEqual(request.image_upload_errors, {})
+
+    def test_processing_reuses_handle(self):
+        """Test variants are built from the handle the field opened."""
+        data = ImageUploadField().to_internal_value(upload(image_bytes(800, 600)))
+
+        with mock.patch("core.images.Image.open") as reopen:
+            variants = build_variants(data, "recipe")
+
+        reopen.assert_not_called()
+        self.assertEqual(variants["full"]["width"], 800)
+        self.assertIsNone(data.image)
+
+    def test_jpeg_decodes_at_reduced_scale(self):
+        """Test large JPEGs are drafted down but not below the largest size."""
+        variants = build_variants(upload(image_bytes(5000, 2500)), "recipe")
+
+        self.assertEqual(
+            (variants["full"]["width"], variants["full"]["height"]), (1200, 600)
+        )
+        self.assertEqual(variants["thumbnail"]["width"], 300)
+
+
+@override_settings(IMAGE_UPLOADS=LIMITS)
+class UploadValidationApiTests(TestCase):
+    """Tests for upload validation on the image endpoints."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = Recipe.objects.create(
+            author=self.user, title="Soup", instructions="Boil", is_published=True
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def post_image(self, data, name="photo.jpg"):
+        return self.client.post(
+            image_upload_url(self.recipe.id),
+            {"image": upload(data, name)},
+            format="multipart",
+        )
+
+    def test_pixel_bomb_rejected(self):
+        """Test a small file with huge dimensions is refused."""
+        res = self.post_image(png_header(4000, 4000), "bomb.png")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("exceed", res.data["image"][0])
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+
+    def test_oversized_upload_rejected_while_streaming(self):
+        """Test the body is dropped once it passes MAX_BYTES."""
+        data = image_bytes() + b"\x00" * (2 * 1024 * 1024)
+        with mock.patch("core.uploads.open_image", wraps=open_image) as opened:
+            res = self.post_image(data)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["image"], ["Image file size must be less than 1MB."])
+        # Header parsed once while streaming; the field never saw the file.
+        self.assertEqual(opened.call_count, 1)
+
+    def test_wrong_magic_bytes_rejected(self):
+        """Test non-image data is refused whatever its name says."""
+        res = self.post_image(b"<html>" + b"x" * 100)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("format must be one of", res.data["image"][0])
+
+    def test_disallowed_format_rejected(self):
+        """Test formats outside FORMATS are refused."""
+        res = self.post_image(image_bytes(format="GIF"), "anim.gif")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("jpeg, png, webp", res.data["image"][0])
+
+    def test_profile_photo_validated(self):
+        """Test profile photos go through the same checks."""
+        res = self.client.patch(
+            ME_URL,
+            {"profile_photo": upload(png_header(4000, 4000), "bomb.png")},
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("profile_photo", res.data)
+
+    def test_valid_upload_accepted(self):
+        """Test a normal image passes."""
+        res = self.post_image(image_bytes(640, 480))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_variants["full"]["width"], 640)
@@ -0,0 +1,202 @@
+"""
+Single-pass image upload validation.
+
+``ImageUploadHandler`` sits in front of Django's upload handlers and looks at
+each file while the multipart body streams in: the magic bytes must name an
+allowed format, the header must parse within ``MAX_HEADER_BYTES``, the pixel
+count must stay under ``MAX_PIXELS`` and the body under ``MAX_BYTES``. A bad
+upload is dropped as soon as the check fails, so a decompression bomb is
+never decoded and an oversized file is never buffered in full.
+
+``ImageUploadField`` reports the handler's verdict as a normal validation
+error and attaches the lazily opened Pillow image to the upload as
+``upload.image``; ``core.images`` decodes that same handle instead of
+re-opening the file. Views opt in with ``ImageUploadMixin``.
+
+Limits live in ``settings.IMAGE_UPLOADS``.
+"""
+
+from io import BytesIO
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from PIL import Image
+from rest_framework import serializers
+
+# Leading bytes -> Pillow format name; WebP is RIFF with "WEBP" at offset 8.
+_MAGIC = [
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+]
+_SNIFF_BYTES = 12
+
+
+class InvalidImage(Exception):
+    """An upload failed validation; ``str(exc)`` is the client message."""
+
+
+class ImageHeader(NamedTuple):
+    format: str
+    width: int
+    height: int
+
+
+def sniff_format(head):
+    """Return the format named by the magic bytes in ``head``, or None."""
+    for magic, fmt in _MAGIC:
+        if head.startswith(magic):
+            return fmt
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def check_format(fmt, conf=None):
+    conf = conf or settings.IMAGE_UPLOADS
+    if fmt not in conf["FORMATS"]:
+        formats = ", ".join(conf["FORMATS"])
+        raise InvalidImage(f"Image format must be one of: {formats}.")
+
+
+def check_size(size, conf=None):
+    conf = conf or settings.IMAGE_UPLOADS
+    if size > conf["MAX_BYTES"]:
+        megabytes = conf["MAX_BYTES"] // (1024 * 1024)
+        raise InvalidImage(f"Image file size must be less than {megabytes}MB.")
+
+
+def check_header(img, conf=None):
+    """Validate an opened, not yet decoded image; return its ``ImageHeader``."""
+    conf = conf or settings.IMAGE_UPLOADS
+    fmt = (img.format or "").lower()
+    check_format(fmt, conf)
+    width, height = img.size
+    if width < 1 or height < 1 or width * height > conf["MAX_PIXELS"]:
+        raise InvalidImage(
+            f"Image dimensions {width}x{height} exceed "
+            f"{conf['MAX_PIXELS']:,} pixels."
+        )
+    return ImageHeader(fmt, width, height)
+
+
+def open_image(fp, conf=None):
+    """
+    Open ``fp`` with Pillow, reading only the header.
+
+    Returns ``(image, header)``. Raises ``InvalidImage`` for unknown data,
+    disallowed formats and pixel counts above the limit, before any pixel
+    data is decoded.
+    """
+    conf = conf or settings.IMAGE_UPLOADS
+    try:
+        img = Image.open(fp)
+    except Image.DecompressionBombError:
+        raise InvalidImage("Image dimensions are too large.")
+    except Exception:
+        raise InvalidImage("Invalid image file.")
+    return img, check_header(img, conf)
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Validate image files chunk by chunk as they are received.
+
+    Passes data through to the next handler, so storage (memory or temp
+    file) is unchanged. On the first failing check the file is skipped and
+    the message recorded in ``request.image_upload_errors[field_name]``.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.conf = settings.IMAGE_UPLOADS
+        request.image_upload_errors = {}
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.head = bytearray()
+        self.received = 0
+        self.header = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        try:
+            check_size(self.received, self.conf)
+            if self.header is None:
+                self.head += raw_data
+                self.header = self._parse_header(final=False)
+        except InvalidImage as exc:
+            self.request.image_upload_errors[self.field_name] = str(exc)
+            raise SkipFile()
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.header is None:
+            try:
+                self.header = self._parse_header(final=True)
+            except InvalidImage as exc:
+                self.request.image_upload_errors[self.field_name] = str(exc)
+        return None
+
+    def _parse_header(self, final):
+        """Return the header once enough bytes arrived, else None."""
+        head = bytes(self.head)
+        if len(head) >= _SNIFF_BYTES or final:
+            check_format(sniff_format(head), self.conf)
+        try:
+            return open_image(BytesIO(head), self.conf)[1]
+        except InvalidImage:
+            if final or len(head) >= self.conf["MAX_HEADER_BYTES"]:
+                raise
+            # Truncated header; wait for the next chunk.
+            return None
+
+
+class ImageUploadMixin:
+    """
+    Install ``ImageUploadHandler`` for a view's requests.
+
+    ``image_upload_actions`` limits it to some viewset actions; ``None``
+    covers every request to the view.
+    """
+
+    image_upload_actions = None
+
+    def initialize_request(self, request, *args, **kwargs):
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        actions = self.image_upload_actions
+        if actions is None or getattr(self, "action", None) in actions:
+            request.upload_handlers.insert(0, ImageUploadHandler(request))
+        return drf_request
+
+
+class ImageUploadField(serializers.ImageField):
+    """
+    ``ImageField`` that validates the header only and keeps the handle.
+
+    Uses the verdict of ``ImageUploadHandler`` when it saw the upload, and
+    reads the header itself otherwise. Unlike DRF's field it never calls
+    ``Image.verify()``, which reads the whole file and leaves it unusable.
+    """
+
+    def validate_empty_values(self, data):
+        error = self._upload_errors().get(self.field_name)
+        if error:
+            raise serializers.ValidationError(error)
+        return super().validate_empty_values(data)
+
+    def to_internal_value(self, data):
+        upload = serializers.FileField.to_internal_value(self, data)
+        try:
+            check_size(upload.size)
+            upload.seek(0)
+            upload.image = open_image(upload)[0]
+        except InvalidImage as exc:
+            raise serializers.ValidationError(str(exc))
+        return upload
+
+    def _upload_errors(self):
+        request = self.context.get("request")
+        return getattr(request, "image_upload_errors", None) or {}
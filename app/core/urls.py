@@ -9,6 +9,11 @@ urlpatterns = [
     path("refresh/", views.CustomTokenRefreshView.as_view(), name="refresh"),
     path("logout/", views.LogoutView.as_view(), name="logout"),
     path("me/", views.MeView.as_view(), name="me"),
+    path(
+        "me/photo-upload-url/",
+        views.MePhotoUploadURLView.as_view(),
+        name="me-photo-upload-url",
+    ),
     path("verify-email/", views.VerifyEmailView.as_view(), name="verify-email"),
     path(
         "resend-verification/",
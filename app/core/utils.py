@@ -2,6 +2,7 @@ import os
 import uuid
 from io import BytesIO
 
+from core.uploads import InvalidImage, check_size, open_image
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from PIL import Image
 
@@ -100,24 +101,16 @@ def create_thumbnail(image_file, size=300):
 def validate_image(image_file):
     """
     Validate image file:
-    - Check file size (max 5MB)
-    - Check format (jpeg, png, webp)
+    - Check file size (settings.IMAGE_UPLOADS["MAX_BYTES"])
+    - Check format and pixel count from the header, without decoding
     Returns (is_valid, error_message)
     """
-    # Check file size (5MB = 5 * 1024 * 1024 bytes)
-    max_size = 5 * 1024 * 1024
-    if image_file.size > max_size:
-        return False, "Image file size must be less than 5MB."
-
-    # Check format
-    allowed_formats = ["jpeg", "jpg", "png", "webp"]
     try:
-        img = Image.open(image_file)
-        if img.format.lower() not in allowed_formats:
-            formats = ", ".join(allowed_formats)
-            return False, f"Image format must be one of: {formats}."
+        check_size(image_file.size)
+        image_file.seek(0)
+        open_image(image_file)
         image_file.seek(0)  # Reset file pointer
-    except Exception:
-        return False, "Invalid image file."
+    except InvalidImage as exc:
+        return False, str(exc)
 
     return True, None
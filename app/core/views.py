@@ -1,7 +1,13 @@
+import tempfile
+
+from core.direct_uploads import UploadURLSerializer, start_upload
 from core.models import EmailVerificationToken, PasswordResetToken
 from core.serializers import UserProfileSerializer, UserRegistrationSerializer
 from core.throttles import AuthRateThrottle
+from core.uploads import ImageUploadMixin
 from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
 from django.core.mail import send_mail
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -31,7 +37,7 @@ class CustomTokenRefreshView(TokenRefreshView):
     throttle_classes = [AuthRateThrottle]
 
 
-class MeView(generics.RetrieveUpdateAPIView):
+class MeView(ImageUploadMixin, generics.RetrieveUpdateAPIView):
     """View for current user profile."""
 
     serializer_class = UserProfileSerializer
@@ -42,6 +48,26 @@ class MeView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
+class MePhotoUploadURLView(APIView):
+    """Issue a direct upload URL for the current user's profile photo."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Return the URL and token for a new profile photo."""
+        serializer = UploadURLSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(
+            start_upload(
+                request,
+                request.user,
+                "profile_photo",
+                serializer.validated_data["content_type"],
+            ),
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class LogoutView(APIView):
     """View to blacklist refresh token on logout."""
 
@@ -91,6 +117,55 @@ class HealthCheckView(APIView):
         )
 
 
+class DirectUploadView(APIView):
+    """
+    Receive a direct upload on the filesystem storage backend.
+
+    Stands in for the bucket's pre-signed PUT: the signed token in the URL
+    is the only authorization, and the body is streamed to storage as is.
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes: list = []
+
+    def put(self, request, token):
+        """Store the request body under the name the token was issued for."""
+        if not hasattr(default_storage, "unsign_put"):
+            # The bucket takes uploads itself on other backends.
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        signed = default_storage.unsign_put(token)
+        if signed is None:
+            return Response(
+                {"detail": "Invalid or expired upload URL."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        name, content_type = signed
+        if request.content_type != content_type:
+            return Response(
+                {"detail": f"Content-Type must be {content_type}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        max_bytes = settings.IMAGE_UPLOADS["MAX_BYTES"]
+        body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        received = 0
+        while chunk := request.read(64 * 1024):
+            received += len(chunk)
+            if received > max_bytes:
+                body.close()
+                return Response(
+                    {"detail": "Upload is too large."},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+            body.write(chunk)
+        body.seek(0)
+        # A repeated PUT replaces the object, as it does on S3.
+        default_storage.delete(name)
+        with body:
+            default_storage.save(name, File(body))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class VerifyEmailView(APIView):
     """View to verify email address."""
 
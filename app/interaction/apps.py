@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class InteractionConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "interaction"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from interaction.models import Block, Follow, Mute
+        from interaction.services.relationships import relationship_changed
+
+        for model in (Follow, Mute, Block):
+            post_save.connect(relationship_changed, sender=model)
+            post_delete.connect(relationship_changed, sender=model)
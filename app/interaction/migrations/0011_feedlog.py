@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 11:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('interaction', '0010_auto_20260113_1238'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.CharField(choices=[('chronological', 'Chronological'), ('algorithmic', 'Algorithmic')], max_length=15)),
+                ('items', models.JSONField(default=list)),
+                ('served', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interaction', '0012_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DigestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('none', 'None'), ('daily', 'Daily'), ('weekly', 'Weekly')], max_length=10)),
+                ('period_end', models.DateTimeField()),
+                ('last_user_id', models.BigIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-period_end'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notificationpreference',
+            index=models.Index(fields=['email_digest', 'user'], name='notificationpref_digest_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='digestrun',
+            unique_together={('frequency', 'period_end')},
+        ),
+    ]
@@ -26,6 +26,11 @@ class Rating(models.Model):
     class Meta:
         unique_together = ["user", "recipe"]
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="rating_user_feed_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email} rated {self.recipe.title}: {self.score}"
@@ -49,6 +54,11 @@ class Favorite(models.Model):
     class Meta:
         unique_together = ["user", "recipe"]
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="favorite_user_feed_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.email} favorited {self.recipe.title}"
@@ -268,10 +278,43 @@ class NotificationPreference(models.Model):
         default="none",
     )
 
+    class Meta:
+        indexes = [
+            # Digest runs read the users of one frequency in id order.
+            models.Index(
+                fields=["email_digest", "user"], name="notificationpref_digest_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Notification preferences for {self.user.email}"
 
 
+class DigestRun(models.Model):
+    """
+    Progress of the email digests for one period, so a stopped run resumes.
+
+    See interaction.services.digest.
+    """
+
+    frequency = models.CharField(
+        max_length=10, choices=NotificationPreference.EMAIL_DIGEST_CHOICES
+    )
+    period_end = models.DateTimeField()
+    # Every user up to this id has been handled
+    last_user_id = models.BigIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ["frequency", "period_end"]
+        ordering = ["-period_end"]
+
+    def __str__(self):
+        return f"{self.frequency} digests to {self.period_end:%Y-%m-%d}"
+
+
 class FeedPreference(models.Model):
     """User feed preferences."""
 
@@ -299,6 +342,33 @@ class FeedPreference(models.Model):
         return f"Feed preferences for {self.user.email}"
 
 
+class FeedLog(models.Model):
+    """
+    A sampled feed response with each candidate's ranking features.
+
+    Replayed offline by ``evaluate_feed_ranking``; see
+    interaction.services.ranking.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="feed_logs",
+    )
+    order = models.CharField(max_length=15, choices=FeedPreference.FEED_ORDER_CHOICES)
+    # [recipe_id, item type, features] per candidate, in served order
+    items = models.JSONField(default=list)
+    # How many of the items the response returned
+    served = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.order} feed for {self.user.email}"
+
+
 class Badge(models.Model):
     """Badge definition."""
 
@@ -1,3 +1,5 @@
+from core.images import ImageVariantsField
+from core.serializers_fast import compile_serializer
 from interaction.models import (
     Block,
     Comment,
@@ -8,6 +10,7 @@ from interaction.models import (
     Notification,
     Rating,
 )
+from interaction.services.bulk import ACTIONS, MAX_OPERATIONS
 from recipe.serializers import RecipeListSerializer
 from rest_framework import serializers
 
@@ -99,6 +102,7 @@ class UserSummarySerializer(serializers.Serializer):
     email = serializers.EmailField(read_only=True)
     name = serializers.CharField(read_only=True)
     profile_photo = serializers.ImageField(read_only=True)
+    profile_photo_srcset = ImageVariantsField(source="profile_photo_variants")
     is_verified = serializers.BooleanField(read_only=True)
 
 
@@ -110,6 +114,7 @@ class UserProfileSerializer(serializers.Serializer):
     name = serializers.CharField(read_only=True)
     bio = serializers.CharField(read_only=True, allow_null=True)
     profile_photo = serializers.ImageField(read_only=True)
+    profile_photo_srcset = ImageVariantsField(source="profile_photo_variants")
     is_verified = serializers.BooleanField(read_only=True)
     is_private = serializers.BooleanField(read_only=True)
     followers_count = serializers.IntegerField(read_only=True)
@@ -130,6 +135,9 @@ class FollowSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "follower", "following", "created_at"]
 
 
+fast_follow = compile_serializer(FollowSerializer)
+
+
 class FollowRequestSerializer(serializers.ModelSerializer):
     """Serializer for follow requests."""
 
@@ -164,6 +172,47 @@ class MuteSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
 
 
+class RelationshipOperationSerializer(serializers.Serializer):
+    """One follow, unfollow, mute, unmute, block or unblock in a batch."""
+
+    action = serializers.ChoiceField(choices=ACTIONS)
+    user = serializers.IntegerField(min_value=1)
+    status = serializers.CharField(read_only=True)
+
+
+class RelationshipBatchSerializer(serializers.Serializer):
+    """Serializer for a batch of relationship operations."""
+
+    operations = RelationshipOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, value):
+        if len(value) > MAX_OPERATIONS:
+            raise serializers.ValidationError(
+                f"At most {MAX_OPERATIONS} operations per batch."
+            )
+        users = [operation["user"] for operation in value]
+        if len(set(users)) != len(users):
+            raise serializers.ValidationError("Each user can appear only once.")
+        return value
+
+
+class FollowRequestBatchSerializer(serializers.Serializer):
+    """Serializer selecting pending follow requests by id, or all of them."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_OPERATIONS,
+    )
+    all = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        if attrs["all"] == ("ids" in attrs):
+            raise serializers.ValidationError('Give either "ids" or "all": true.')
+        return attrs
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     """Serializer for notifications."""
 
@@ -190,6 +239,9 @@ class NotificationSerializer(serializers.ModelSerializer):
         ]
 
 
+fast_notification = compile_serializer(NotificationSerializer)
+
+
 class FeedItemSerializer(serializers.Serializer):
     """Serializer for feed items."""
 
@@ -198,3 +250,6 @@ class FeedItemSerializer(serializers.Serializer):
     recipe = RecipeListSerializer()
     score = serializers.IntegerField(required=False, allow_null=True)
     created_at = serializers.DateTimeField()
+
+
+fast_feed_item = compile_serializer(FeedItemSerializer)
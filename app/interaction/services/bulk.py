@@ -0,0 +1,198 @@
+"""
+Set-based follow, mute and block writes for many users at once.
+
+``apply_operations`` takes a batch of ``(action, user_id)`` pairs, checks
+them against the current relationships in three queries, and applies them
+in one transaction: inserts with ``bulk_create(ignore_conflicts=True)`` and
+one delete per kind of row removed. The outcome of each pair mirrors what
+the single-user endpoint would have done.
+
+``approve_requests`` and ``reject_requests`` answer many pending follow
+requests at once: one ``UPDATE``, plus an ``INSERT ... SELECT`` of the
+resulting follows when approving.
+"""
+
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from interaction.models import Block, Follow, FollowRequest, Mute
+from interaction.services import relationships as rel
+
+ACTIONS = ("follow", "unfollow", "mute", "unmute", "block", "unblock")
+
+_quote = connection.ops.quote_name
+
+# Most operations accepted in one batch
+MAX_OPERATIONS = 100
+
+# action: (relation it sets or clears, status if it did, status if it was so)
+TOGGLES = {
+    "mute": ("muted", "muted", "already_muted"),
+    "unmute": ("muted", "unmuted", "not_muted"),
+    "block": ("blocking", "blocked", "already_blocked"),
+    "unblock": ("blocking", "unblocked", "not_blocked"),
+}
+
+
+def _follow_status(target_id, private, related):
+    if target_id in related["blocked_by"]:
+        return "forbidden"
+    if target_id in related["following"]:
+        return "already_following"
+    return "requested" if private else "followed"
+
+
+def _outcomes(user, operations, targets, related, requested):
+    """Return each operation's status, and the target ids to write per action."""
+    statuses = []
+    writes = defaultdict(set)
+    for action, target_id in operations:
+        if target_id == user.pk:
+            status = "self"
+        elif target_id not in targets:
+            status = "not_found"
+        elif action == "follow":
+            status = _follow_status(target_id, targets[target_id], related)
+            if status == "followed":
+                writes["follow"].add(target_id)
+            elif status == "requested":
+                writes["request"].add(target_id)
+        elif action == "unfollow":
+            had = target_id in related["following"] or target_id in requested
+            status = "unfollowed" if had else "not_following"
+            writes["unfollow"].add(target_id)
+        else:
+            relation, changed, unchanged = TOGGLES[action]
+            present = target_id in related[relation]
+            sets = not action.startswith("un")
+            status = changed if present != sets else unchanged
+            writes[action].add(target_id)
+        statuses.append(status)
+    return statuses, writes
+
+
+def end_follows(user, one_way=(), both_ways=()):
+    """
+    Delete follows and follow requests between ``user`` and other users.
+
+    Those from ``user`` to ``one_way`` go, and those either way between
+    ``user`` and ``both_ways``; one delete for each kind of row.
+    """
+    targets = {*one_way, *both_ways}
+    if not targets:
+        return
+    follows = Q(follower=user, following_id__in=targets)
+    requests = Q(requester=user, target_id__in=targets)
+    if both_ways:
+        follows |= Q(follower_id__in=both_ways, following=user)
+        requests |= Q(requester_id__in=both_ways, target=user)
+    Follow.objects.filter(follows).delete()
+    FollowRequest.objects.filter(requests).delete()
+
+
+def _write(user, writes):
+    """Apply the writes for each action; return the users whose sets changed."""
+    blocks = writes["block"]
+    if writes["follow"]:
+        Follow.objects.bulk_create(
+            [Follow(follower=user, following_id=pk) for pk in writes["follow"]],
+            ignore_conflicts=True,
+        )
+    if writes["request"]:
+        FollowRequest.objects.bulk_create(
+            [FollowRequest(requester=user, target_id=pk) for pk in writes["request"]],
+            ignore_conflicts=True,
+        )
+    if writes["mute"]:
+        Mute.objects.bulk_create(
+            [Mute(user=user, muted_user_id=pk) for pk in writes["mute"]],
+            ignore_conflicts=True,
+        )
+    if blocks:
+        Block.objects.bulk_create(
+            [Block(user=user, blocked_user_id=pk) for pk in blocks],
+            ignore_conflicts=True,
+        )
+
+    # Blocks end follows and requests in both directions.
+    end_follows(user, one_way=writes["unfollow"], both_ways=blocks)
+    if writes["unmute"]:
+        Mute.objects.filter(user=user, muted_user_id__in=writes["unmute"]).delete()
+    if writes["unblock"]:
+        Block.objects.filter(user=user, blocked_user_id__in=writes["unblock"]).delete()
+    return {user.pk, *blocks, *writes["unblock"]}
+
+
+def apply_operations(user, operations):
+    """
+    Apply ``(action, user_id)`` pairs for ``user``; return their statuses.
+
+    Statuses: "followed", "requested" (a private account; a follow request
+    is pending), "already_following", "forbidden" (the target blocked
+    ``user``), "unfollowed", "not_following", the ``TOGGLES`` statuses,
+    "not_found" and "self".
+    """
+    with transaction.atomic():
+        targets = dict(
+            get_user_model()
+            .objects.filter(pk__in={target_id for _, target_id in operations})
+            .values_list("pk", "is_private")
+        )
+        related = {
+            relation: set(ids)
+            for relation, ids in rel.load(user.pk, among=list(targets)).items()
+        }
+        requested = set(
+            FollowRequest.objects.filter(
+                requester=user, target_id__in=targets, status="pending"
+            ).values_list("target_id", flat=True)
+        )
+        statuses, writes = _outcomes(user, operations, targets, related, requested)
+        changed = _write(user, writes)
+    rel.invalidate(*changed)
+    return statuses
+
+
+APPROVE_SQL = f"""
+WITH approved AS (
+    UPDATE {_quote(FollowRequest._meta.db_table)}
+    SET status = 'approved'
+    WHERE target_id = %(user)s AND status = 'pending' {{ids}}
+    RETURNING requester_id
+), followed AS (
+    INSERT INTO {_quote(Follow._meta.db_table)}
+        (follower_id, following_id, created_at)
+    SELECT requester_id, %(user)s, %(now)s FROM approved
+    ON CONFLICT (follower_id, following_id) DO NOTHING
+)
+SELECT requester_id FROM approved
+"""
+
+
+def _pending(user, ids):
+    pending = FollowRequest.objects.filter(target=user, status="pending")
+    return pending if ids is None else pending.filter(pk__in=ids)
+
+
+def approve_requests(user, ids=None):
+    """
+    Approve pending follow requests to ``user``: those in ``ids``, or all.
+
+    One statement marks them approved and inserts the follows. Returns the
+    number approved.
+    """
+    sql = APPROVE_SQL.format(ids="" if ids is None else "AND id = ANY(%(ids)s)")
+    params = {"user": user.pk, "now": timezone.now(), "ids": list(ids or ())}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        requesters = [row[0] for row in cursor.fetchall()]
+    rel.invalidate(*requesters)
+    return len(requesters)
+
+
+def reject_requests(user, ids=None):
+    """Reject pending follow requests to ``user``: those in ``ids``, or all."""
+    return _pending(user, ids).update(status="rejected")
@@ -0,0 +1,202 @@
+"""
+Daily and weekly email digests.
+
+``send_digests(frequency)`` mails each active user whose
+``NotificationPreference.email_digest`` is ``frequency`` a summary of the
+period that last ended: their unread notifications from it, counted by kind,
+and the recipes published in it by the people they follow, less those they
+muted. Users with nothing to report get no email.
+
+Users are read in id order, ``EMAIL_DIGEST["CHUNK_SIZE"]`` at a time. Each
+chunk takes at most four queries however many users it holds: the users,
+their notification counts and their new recipes grouped in SQL, and the
+titles of the recipes listed. Its emails are rendered from
+``interaction/email/digest.txt`` and sent over one mail connection, then the
+period's ``DigestRun`` records the chunk's last user id. Started again, a run
+resumes after that user, so a chunk whose emails went out before the
+checkpoint was saved is sent twice rather than not at all.
+
+A daily period ends at midnight and a weekly one at midnight starting Monday
+(in ``TIME_ZONE``), so a run started at any time covers the last full period.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection
+from django.db.models import Count
+from django.template.loader import get_template
+from django.utils import timezone
+from interaction.models import (
+    DigestRun,
+    Follow,
+    Mute,
+    Notification,
+    NotificationPreference,
+)
+from recipe.models import Recipe
+
+TEMPLATE = "interaction/email/digest.txt"
+
+PERIODS = {"daily": timedelta(days=1), "weekly": timedelta(weeks=1)}
+
+# How each kind of notification is counted in a digest
+NOTIFICATION_LINES = {
+    "followed": "new followers",
+    "follow_request": "follow requests",
+    "rated": "ratings of your recipes",
+    "commented": "comments",
+    "favorited": "favorites of your recipes",
+    "posted_recipe": "recipe notifications",
+    "badge_awarded": "badges awarded",
+}
+
+_quote = connection.ops.quote_name
+
+RECIPES_SQL = f"""
+SELECT f.follower_id, COUNT(*),
+    (ARRAY_AGG(r.id ORDER BY r.created_at DESC, r.id DESC))[1:%(top)s]
+FROM {_quote(Follow._meta.db_table)} AS f
+JOIN {_quote(Recipe._meta.db_table)} AS r ON r.author_id = f.following_id
+WHERE f.follower_id = ANY(%(users)s)
+    AND r.is_published
+    AND r.created_at >= %(start)s AND r.created_at < %(end)s
+    AND NOT EXISTS (
+        SELECT 1 FROM {_quote(Mute._meta.db_table)} AS m
+        WHERE m.user_id = f.follower_id AND m.muted_user_id = f.following_id
+    )
+GROUP BY f.follower_id
+"""
+
+
+def period_end(frequency, now=None):
+    """Return when the last full ``frequency`` period before ``now`` ended."""
+    end = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if frequency == "weekly":
+        end -= timedelta(days=end.weekday())
+    return end
+
+
+def _recipients(frequency, after, limit):
+    """Return up to ``limit`` ``(id, email, name)`` of users after ``after``."""
+    return list(
+        NotificationPreference.objects.filter(
+            email_digest=frequency, user_id__gt=after, user__is_active=True
+        )
+        .order_by("user_id")
+        .values_list("user_id", "user__email", "user__name")[:limit]
+    )
+
+
+def _notification_counts(user_ids, start, end):
+    """Return ``{user_id: {verb: count}}`` of unread notifications."""
+    rows = (
+        Notification.objects.filter(
+            recipient_id__in=user_ids,
+            is_read=False,
+            created_at__gte=start,
+            created_at__lt=end,
+        )
+        .order_by()
+        .values_list("recipient_id", "verb")
+        .annotate(count=Count("id"))
+    )
+    counts = defaultdict(dict)
+    for user_id, verb, count in rows:
+        counts[user_id][verb] = count
+    return counts
+
+
+def _new_recipes(user_ids, start, end):
+    """Return ``{user_id: (count, newest recipe ids)}`` from followed authors."""
+    params = {
+        "users": list(user_ids),
+        "start": start,
+        "end": end,
+        "top": settings.EMAIL_DIGEST["RECIPES"],
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(RECIPES_SQL, params)
+        return {user_id: (count, ids) for user_id, count, ids in cursor.fetchall()}
+
+
+def _messages(users, frequency, start, end):
+    """Render the digests of a chunk of users; skip those with nothing new."""
+    user_ids = [user_id for user_id, _, _ in users]
+    counts = _notification_counts(user_ids, start, end)
+    recipes = _new_recipes(user_ids, start, end)
+    shown = {pk for _, ids in recipes.values() for pk in ids}
+    titles = {
+        pk: (title, author_name or "someone you follow")
+        for pk, title, author_name in Recipe.objects.filter(pk__in=shown).values_list(
+            "pk", "title", "author__name"
+        )
+    }
+
+    frontend_url = getattr(settings, "FRONTEND_URL", "http://localhost:5173")
+    template = get_template(TEMPLATE)
+    messages = []
+    for user_id, email, name in users:
+        verbs = counts.get(user_id, {})
+        count, ids = recipes.get(user_id, (0, []))
+        if not verbs and not count:
+            continue
+        context = {
+            "name": name,
+            "period": "yesterday" if frequency == "daily" else "last week",
+            "notifications": [
+                f"{verbs[verb]} {line}"
+                for verb, line in NOTIFICATION_LINES.items()
+                if verb in verbs
+            ],
+            "recipes": [
+                {
+                    "title": titles[pk][0],
+                    "author": titles[pk][1],
+                    "url": f"{frontend_url}/recipes/{pk}",
+                }
+                for pk in ids
+                if pk in titles
+            ],
+            "more_recipes": count - len(ids),
+            "feed_url": f"{frontend_url}/",
+            "settings_url": f"{frontend_url}/profile",
+        }
+        messages.append(
+            EmailMessage(
+                subject=f"Your {frequency} Recipe App digest",
+                body=template.render(context),
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email],
+            )
+        )
+    return messages
+
+
+def send_digests(frequency, now=None, chunk_size=None):
+    """
+    Send the ``frequency`` digests for the last full period; return its run.
+
+    A run already finished for the period sends nothing.
+    """
+    end = period_end(frequency, now)
+    start = end - PERIODS[frequency]
+    chunk_size = chunk_size or settings.EMAIL_DIGEST["CHUNK_SIZE"]
+    run, _ = DigestRun.objects.get_or_create(frequency=frequency, period_end=end)
+    if run.finished_at:
+        return run
+
+    while users := _recipients(frequency, run.last_user_id, chunk_size):
+        messages = _messages(users, frequency, start, end)
+        if messages:
+            with get_connection() as mail:
+                mail.send_messages(messages)
+        run.last_user_id = users[-1][0]
+        run.sent += len(messages)
+        run.save(update_fields=["last_user_id", "sent"])
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=["finished_at"])
+    return run
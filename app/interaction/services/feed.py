@@ -1,97 +1,217 @@
-from interaction.models import Favorite, FeedPreference, Follow, Mute, Rating
+"""
+Activity feed built on read from the people a user follows.
+
+One query merges the sources: recipes the followed users published, and
+their ratings and favorites. The followed users, less those the viewer has
+muted or that are blocked either way, come from the cached relationship sets
+(see interaction.services.relationships) as one array parameter. Each
+source reads its newest rows per author from a ``(actor, created_at, id)``
+index; the union is ordered by ``(created_at, type, id)``, newest first, and
+limited in SQL. Pages continue
+from the last item's key (``FeedCursor``), not an offset, so a deep page
+costs the same as the first.
+
+The algorithmic order ranks a window of the newest
+``FEED_RANKING["CANDIDATES"]`` items and pages through it by offset; the
+cursor pins the window, and once it is used up the next window starts below
+its oldest item.
+"""
+
+import base64
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils.dateparse import parse_datetime
+from interaction.models import Favorite, FeedPreference, Rating
+from interaction.services import ranking
+from interaction.services.relationships import relationships
 from recipe.models import Recipe
 
+_quote = connection.ops.quote_name
+
+# (table, actor column, score column, extra condition), in key order
+SOURCES = {
+    "recipe": (Recipe._meta.db_table, "author_id", None, "is_published"),
+    "rating": (Rating._meta.db_table, "user_id", "score", None),
+    "favorite": (Favorite._meta.db_table, "user_id", None, None),
+}
+
+
+class FeedCursor(
+    namedtuple("FeedCursor", "created_at type id inclusive offset", defaults=(False, 0))
+):
+    """
+    Where a feed page starts.
+
+    Items are taken from below the key ``(created_at, type, id)``, or from
+    it on if ``inclusive``, skipping ``offset`` of them after ranking.
+    """
+
+    def encode(self):
+        data = [self.created_at.isoformat(), self.type, self.id]
+        data += [int(self.inclusive), self.offset]
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    @classmethod
+    def decode(cls, value):
+        """Return the cursor encoded in ``value``; raise ``ValueError``."""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(value.encode()))
+            created_at, kind, pk, inclusive, offset = data
+            cursor = cls(
+                parse_datetime(created_at), kind, int(pk), bool(inclusive), int(offset)
+            )
+            valid = cursor.created_at and kind in SOURCES and cursor.offset >= 0
+        except (TypeError, ValueError, UnicodeError) as exc:
+            raise ValueError("Invalid feed cursor.") from exc
+        if not valid:
+            raise ValueError("Invalid feed cursor.")
+        return cursor
+
+    @classmethod
+    def after(cls, item, inclusive=False, offset=0):
+        """Return the cursor for the items below (or from) ``item``."""
+        return cls(item["created_at"], item["type"], item["id"], inclusive, offset)
+
+
+def _bound(kind, cursor):
+    """SQL condition keeping source ``kind``'s rows below the cursor's key."""
+    if cursor is None:
+        return ""
+    if kind == cursor.type:
+        op = "<=" if cursor.inclusive else "<"
+        return f"AND (s.created_at, s.id) {op} (%(before)s, %(before_id)s)"
+    # Types sort descending after created_at, so later ones tie below.
+    kinds = list(SOURCES)
+    op = "<=" if kinds.index(kind) > kinds.index(cursor.type) else "<"
+    return f"AND s.created_at {op} %(before)s"
+
+
+def feed_sql(kinds, cursor=None):
+    """Return the merged feed query over the source types ``kinds``."""
+    branches = []
+    for kind in kinds:
+        table, actor, score, condition = SOURCES[kind]
+        recipe = "s.id" if kind == "recipe" else "s.recipe_id"
+        branches.append(f"""(
+    SELECT '{kind}' AS type, s.id, s.created_at, s.{actor} AS actor_id,
+        {recipe} AS recipe_id, {f"s.{score}" if score else "NULL::integer"} AS score
+    FROM {_quote(table)} AS s
+    JOIN authors AS a ON a.id = s.{actor}
+    WHERE {f"s.{condition}" if condition else "TRUE"} {_bound(kind, cursor)}
+    ORDER BY s.created_at DESC, s.id DESC
+    LIMIT %(limit)s
+)""")
+    return f"""
+WITH authors AS (SELECT unnest(%(authors)s) AS id)
+SELECT type, id, created_at, actor_id, recipe_id, score
+FROM ({" UNION ALL ".join(branches)}) AS feed
+ORDER BY created_at DESC, type DESC, id DESC
+LIMIT %(limit)s
+"""
+
+
+def _items(rows):
+    """Turn feed rows into items with their actor and recipe loaded."""
+    actors = get_user_model().objects.in_bulk({row[3] for row in rows})
+    recipes = Recipe.objects.select_related("author").in_bulk({row[4] for row in rows})
+    items = []
+    for kind, pk, created_at, actor_id, recipe_id, score in rows:
+        item = {
+            "type": kind,
+            "id": pk,
+            "actor": actors[actor_id],
+            "recipe": recipes[recipe_id],
+            "created_at": created_at,
+        }
+        if kind == "rating":
+            item["score"] = score
+        items.append(item)
+    return items
+
 
 class FeedService:
     """Service for generating activity feeds."""
 
     @classmethod
-    def get_feed(cls, user, order="chronological", limit=50):
-        """Get activity feed for a user."""
-        # Get users this user follows
-        following_ids = Follow.objects.filter(follower=user).values_list(
-            "following_id", flat=True
-        )
-
-        # Exclude muted users
-        muted_ids = Mute.objects.filter(user=user).values_list(
-            "muted_user_id", flat=True
-        )
+    def fetch(cls, user, kinds, limit, cursor=None):
+        """Return up to ``limit`` items of ``kinds`` below ``cursor``, newest first."""
+        authors = sorted(relationships(user.pk).feed_authors)
+        if not kinds or not authors or limit <= 0:
+            return []
+        params = {"authors": authors, "limit": limit}
+        if cursor is not None:
+            params.update(before=cursor.created_at, before_id=cursor.id)
+        with connection.cursor() as db:
+            db.execute(feed_sql(kinds, cursor), params)
+            rows = db.fetchall()
+        return _items(rows)
 
-        active_following_ids = [uid for uid in following_ids if uid not in muted_ids]
+    @classmethod
+    def get_page(cls, user, order=None, limit=50, cursor=None):
+        """
+        Return ``(items, next_cursor)`` for one page of a user's feed.
 
-        # Get user preferences
+        ``order`` defaults to the user's ``FeedPreference.feed_order``.
+        "algorithmic" ranks the newest ``FEED_RANKING["CANDIDATES"]`` items;
+        see interaction.services.ranking. ``next_cursor`` is ``None`` on the
+        last page.
+        """
         try:
             prefs = user.feed_preferences
         except FeedPreference.DoesNotExist:
             prefs = None
 
-        feed_items = []
+        if order is None:
+            order = prefs.feed_order if prefs else "chronological"
+        if order != "algorithmic":
+            order = "chronological"
 
-        # Get recipes
+        kinds = []
         if prefs is None or prefs.show_recipes:
-            recipes = (
-                Recipe.objects.filter(
-                    author_id__in=active_following_ids,
-                    is_published=True,
-                )
-                .select_related("author")
-                .order_by("-created_at")[:limit]
-            )
-
-            for recipe in recipes:
-                feed_items.append(
-                    {
-                        "type": "recipe",
-                        "actor": recipe.author,
-                        "recipe": recipe,
-                        "created_at": recipe.created_at,
-                    }
-                )
-
-        # Get ratings
+            kinds.append("recipe")
         if prefs is None or prefs.show_ratings:
-            ratings = (
-                Rating.objects.filter(
-                    user_id__in=active_following_ids,
-                )
-                .select_related("user", "recipe")
-                .order_by("-created_at")[:limit]
-            )
-
-            for rating in ratings:
-                feed_items.append(
-                    {
-                        "type": "rating",
-                        "actor": rating.user,
-                        "recipe": rating.recipe,
-                        "score": rating.score,
-                        "created_at": rating.created_at,
-                    }
-                )
-
-        # Get favorites
+            kinds.append("rating")
         if prefs and prefs.show_favorites:
-            favorites = (
-                Favorite.objects.filter(
-                    user_id__in=active_following_ids,
-                )
-                .select_related("user", "recipe")
-                .order_by("-created_at")[:limit]
-            )
+            kinds.append("favorite")
 
-            for favorite in favorites:
-                feed_items.append(
-                    {
-                        "type": "favorite",
-                        "actor": favorite.user,
-                        "recipe": favorite.recipe,
-                        "created_at": favorite.created_at,
-                    }
-                )
-
-        # Sort by date
         if order == "chronological":
-            feed_items.sort(key=lambda x: x["created_at"], reverse=True)
+            items = cls.fetch(user, kinds, limit + 1, cursor)
+            next_cursor = None
+            if len(items) > limit:
+                items = items[:limit]
+                next_cursor = FeedCursor.after(items[-1])
+            if cursor is None and ranking.sampled():
+                vectors = ranking.featurize(user, items)
+                ranking.log_feed(user, order, items, vectors, served=limit)
+            return items, next_cursor
 
-        return feed_items[:limit]
+        candidates = settings.FEED_RANKING["CANDIDATES"]
+        offset = cursor.offset if cursor else 0
+        window = cls.fetch(user, kinds, candidates, cursor)
+        next_cursor = None
+        if offset + limit < len(window):
+            # The same window again, from its newest item on
+            next_cursor = FeedCursor.after(
+                window[0], inclusive=True, offset=offset + limit
+            )
+        elif len(window) == candidates:
+            next_cursor = FeedCursor.after(window[-1])
+
+        vectors = ranking.featurize(user, window)
+        window, vectors = ranking.rank(window, vectors)
+        # Only first pages are logged; the offline evaluation replays what a
+        # feed opened with.
+        if cursor is None and ranking.sampled():
+            ranking.log_feed(user, order, window, vectors, served=limit)
+        end = offset + limit
+        return window[offset:end], next_cursor
+
+    @classmethod
+    def get_feed(cls, user, order=None, limit=50):
+        """Get the first ``limit`` items of a user's activity feed."""
+        items, _ = cls.get_page(user, order=order, limit=limit)
+        return items
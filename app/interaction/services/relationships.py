@@ -0,0 +1,105 @@
+"""
+Per-user follow, mute and block sets, cached.
+
+``relationships(user_id)`` returns the ids the user follows, has muted, has
+blocked and is blocked by. They are loaded in one query and cached as
+sorted ``array("q")`` values, 8 bytes per id, and turned into frozensets
+when read, so every membership check is a hash lookup.
+
+Each ``Follow``, ``Mute`` and ``Block`` save or delete drops the cached sets
+it changes: the follower's or muter's, or both users' for a block. They are
+dropped right away, so the rest of the request sees the write, and again
+once the transaction commits, in case another request cached the old sets in
+between. Writes that skip signals (``bulk_create``,
+queryset ``update``) call ``invalidate`` themselves.
+"""
+
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from interaction.models import Block, Follow, Mute
+
+CACHE_KEY = "relationships:{}"
+
+RELATIONS = ("following", "muted", "blocking", "blocked_by")
+
+
+class Relationships:
+    """A user's relationship id sets."""
+
+    __slots__ = RELATIONS
+
+    def __init__(self, following=(), muted=(), blocking=(), blocked_by=()):
+        self.following = frozenset(following)
+        self.muted = frozenset(muted)
+        self.blocking = frozenset(blocking)
+        self.blocked_by = frozenset(blocked_by)
+
+    @property
+    def blocked(self):
+        """Ids blocked either way."""
+        return self.blocking | self.blocked_by
+
+    def is_blocked(self, user_id):
+        """Return whether either user has blocked the other."""
+        return user_id in self.blocking or user_id in self.blocked_by
+
+    @property
+    def feed_authors(self):
+        """Followed ids the user has not muted and that are not blocked."""
+        return self.following - self.muted - self.blocking - self.blocked_by
+
+
+def load(user_id, among=None):
+    """
+    Return ``{relation: sorted array of ids}`` for a user in one query.
+
+    ``among`` limits the ids to those in it.
+    """
+
+    def ids(queryset, column, relation):
+        if among is not None:
+            queryset = queryset.filter(**{f"{column}__in": among})
+        kind = models.Value(RELATIONS.index(relation), models.IntegerField())
+        return queryset.order_by().annotate(kind=kind).values_list("kind", column)
+
+    rows = ids(Follow.objects.filter(follower_id=user_id), "following_id", "following")
+    rows = rows.union(
+        ids(Mute.objects.filter(user_id=user_id), "muted_user_id", "muted"),
+        ids(Block.objects.filter(user_id=user_id), "blocked_user_id", "blocking"),
+        ids(Block.objects.filter(blocked_user_id=user_id), "user_id", "blocked_by"),
+        all=True,
+    )
+    found = {relation: [] for relation in RELATIONS}
+    for kind, pk in rows:
+        found[RELATIONS[kind]].append(pk)
+    return {relation: array("q", sorted(pks)) for relation, pks in found.items()}
+
+
+def relationships(user_id):
+    """Return the ``Relationships`` of a user through the cache."""
+    key = CACHE_KEY.format(user_id)
+    data = cache.get(key)
+    if data is None:
+        data = load(user_id)
+        cache.set(key, data, settings.RELATIONSHIP_CACHE_TIMEOUT)
+    return Relationships(**data)
+
+
+def invalidate(*user_ids):
+    """Drop the cached sets of ``user_ids``, now and after commit."""
+    keys = [CACHE_KEY.format(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def relationship_changed(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for follows, mutes and blocks."""
+    if sender is Follow:
+        invalidate(instance.follower_id)
+    elif sender is Mute:
+        invalidate(instance.user_id)
+    else:
+        invalidate(instance.user_id, instance.blocked_user_id)
@@ -11,6 +11,7 @@ from interaction.models import (
     Notification,
     Rating,
 )
+from interaction.services.relationships import relationships
 from recipe.models import Recipe
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -384,6 +385,81 @@ class FollowRequestAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
 
+    def _requests_from(self, count):
+        requesters = [
+            get_user_model().objects.create_user(
+                email=f"requester{i}@example.com", password="testpass123"
+            )
+            for i in range(count)
+        ]
+        return [
+            FollowRequest.objects.create(requester=requester, target=self.user)
+            for requester in requesters
+        ]
+
+    def test_accept_follow_requests_by_id(self):
+        """Test accepting several follow requests in one call."""
+        first, second, third = self._requests_from(3)
+        relationships(first.requester_id)  # cached before the follow
+        self.client.force_authenticate(user=self.user)
+        url = reverse("interaction:user-accept-requests")
+        with self.assertNumQueries(1):
+            res = self.client.post(url, {"ids": [first.id, second.id]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"count": 2})
+        followers = Follow.objects.filter(following=self.user)
+        self.assertEqual(
+            set(followers.values_list("follower_id", flat=True)),
+            {first.requester_id, second.requester_id},
+        )
+        self.assertIn(self.user.pk, relationships(first.requester_id).following)
+        third.refresh_from_db()
+        self.assertEqual(third.status, "pending")
+
+    def test_accept_all_follow_requests(self):
+        """Test accepting all pending follow requests, and only those."""
+        pending = self._requests_from(2)
+        FollowRequest.objects.filter(pk=pending[1].pk).update(status="rejected")
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123", is_private=True
+        )
+        FollowRequest.objects.create(requester=self.requester, target=other)
+        self.client.force_authenticate(user=self.user)
+        url = reverse("interaction:user-accept-requests")
+        res = self.client.post(url, {"all": True}, format="json")
+
+        self.assertEqual(res.data, {"count": 1})
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            FollowRequest.objects.filter(status="pending").get().target, other
+        )
+
+        res = self.client.post(url, {"all": True}, format="json")
+        self.assertEqual(res.data, {"count": 0})
+
+    def test_reject_follow_requests(self):
+        """Test rejecting follow requests by id and all at once."""
+        first, second, third = self._requests_from(3)
+        self.client.force_authenticate(user=self.user)
+        url = reverse("interaction:user-reject-requests")
+
+        res = self.client.post(url, {"ids": [first.id]}, format="json")
+        self.assertEqual(res.data, {"count": 1})
+        res = self.client.post(url, {"all": True}, format="json")
+        self.assertEqual(res.data, {"count": 2})
+
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(FollowRequest.objects.filter(status="rejected").count(), 3)
+
+    def test_answer_follow_requests_invalid(self):
+        """Test the selection must be either ids or all."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("interaction:user-accept-requests")
+        for payload in ({}, {"ids": []}, {"ids": [1], "all": True}, {"all": False}):
+            res = self.client.post(url, payload, format="json")
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, payload)
+
 
 class BlockMuteAPITests(TestCase):
     """Tests for block and mute endpoints."""
@@ -492,6 +568,138 @@ class BlockMuteAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
 
+class BatchRelationshipAPITests(TestCase):
+    """Tests for the batch relationship endpoint."""
+
+    url = reverse("interaction:user-relationships")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user, *self.others = [
+            get_user_model().objects.create_user(
+                email=f"user{n}@example.com", password="testpass123"
+            )
+            for n in range(6)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def post(self, *operations):
+        data = {
+            "operations": [
+                {"action": action, "user": user_id} for action, user_id in operations
+            ]
+        }
+        return self.client.post(self.url, data, format="json")
+
+    def statuses(self, res):
+        return [result["status"] for result in res.data["results"]]
+
+    def test_mixed_batch(self):
+        """Test each operation reports what it did, in order."""
+        public, private, blocker, blocked, muted = self.others
+        private.is_private = True
+        private.save()
+        Block.objects.create(user=blocker, blocked_user=self.user)
+        Follow.objects.create(follower=blocked, following=self.user)
+        Follow.objects.create(follower=self.user, following=blocked)
+
+        res = self.post(
+            ("follow", public.pk),
+            ("follow", private.pk),
+            ("follow", blocker.pk),
+            ("block", blocked.pk),
+            ("mute", muted.pk),
+            ("follow", self.user.pk),
+            ("follow", 999999),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.statuses(res),
+            [
+                "followed",
+                "requested",
+                "forbidden",
+                "blocked",
+                "muted",
+                "self",
+                "not_found",
+            ],
+        )
+        self.assertEqual(
+            set(Follow.objects.values_list("follower_id", "following_id")),
+            {(self.user.pk, public.pk)},
+        )
+        self.assertTrue(
+            FollowRequest.objects.filter(
+                requester=self.user, target=private, status="pending"
+            ).exists()
+        )
+        self.assertTrue(
+            Block.objects.filter(user=self.user, blocked_user=blocked).exists()
+        )
+        self.assertTrue(Mute.objects.filter(user=self.user, muted_user=muted).exists())
+
+    def test_repeat_and_undo(self):
+        """Test repeated operations are no-ops and the undo actions report."""
+        public, _, _, blocked, muted = self.others
+        operations = [
+            ("follow", public.pk),
+            ("block", blocked.pk),
+            ("mute", muted.pk),
+        ]
+        self.post(*operations)
+
+        repeated = self.post(*operations)
+        undone = self.post(
+            ("unfollow", public.pk),
+            ("unblock", blocked.pk),
+            ("unmute", muted.pk),
+        )
+        again = self.post(
+            ("unfollow", public.pk),
+            ("unblock", blocked.pk),
+            ("unmute", muted.pk),
+        )
+
+        self.assertEqual(
+            self.statuses(repeated),
+            ["already_following", "already_blocked", "already_muted"],
+        )
+        self.assertEqual(self.statuses(undone), ["unfollowed", "unblocked", "unmuted"])
+        self.assertEqual(
+            self.statuses(again), ["not_following", "not_blocked", "not_muted"]
+        )
+        self.assertFalse(Follow.objects.exists())
+
+    def test_query_count_is_flat(self):
+        """Test a batch costs the same number of queries whatever its size."""
+        targets = [
+            get_user_model().objects.create_user(
+                email=f"target{n}@example.com", password="testpass123"
+            )
+            for n in range(30)
+        ]
+        # Savepoint, three checks, one insert and the release
+        with self.assertNumQueries(6):
+            res = self.post(*[("follow", target.pk) for target in targets])
+
+        self.assertEqual(set(self.statuses(res)), {"followed"})
+        self.assertEqual(Follow.objects.filter(follower=self.user).count(), 30)
+
+    def test_invalid_batches(self):
+        """Test duplicate users, unknown actions and oversized batches fail."""
+        target = self.others[0].pk
+        for operations in (
+            [("follow", target), ("mute", target)],
+            [("poke", target)],
+            [("follow", n) for n in range(1, 102)],
+            [],
+        ):
+            res = self.post(*operations)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class NotificationAPITests(TestCase):
     """Tests for notification endpoints."""
 
@@ -656,6 +864,34 @@ class FeedAPITests(TestCase):
         self.assertEqual(res.data["results"][0]["recipe"]["title"], "Second Recipe")
         self.assertEqual(res.data["results"][1]["recipe"]["title"], "First Recipe")
 
+    def test_feed_cursor_pages(self):
+        """Test the feed pages by following next links."""
+        for n in range(3):
+            Recipe.objects.create(
+                author=self.followed_user,
+                title=f"Recipe {n}",
+                instructions="Test",
+                is_published=True,
+            )
+        self.client.force_authenticate(user=self.user)
+        url = reverse("interaction:feed-list") + "?page_size=2"
+        titles = []
+
+        while url:
+            res = self.client.get(url)
+            self.assertNotIn("count", res.data)
+            titles += [item["recipe"]["title"] for item in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(titles, ["Recipe 2", "Recipe 1", "Recipe 0"])
+
+    def test_feed_invalid_cursor(self):
+        """Test a malformed cursor returns 404."""
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(reverse("interaction:feed-list") + "?cursor=nope")
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class DiscoveryAPITests(TestCase):
     """Tests for user discovery endpoints."""
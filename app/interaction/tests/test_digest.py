@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from interaction.models import (
+    DigestRun,
+    Follow,
+    Mute,
+    Notification,
+    NotificationPreference,
+)
+from interaction.services import digest
+from recipe.models import Recipe
+
+# A Wednesday; the daily period is Tuesday, the weekly one the week before
+NOW = datetime(2026, 3, 11, 7, 30, tzinfo=timezone.utc)
+TUESDAY = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+
+
+def create_user(n, digest_frequency="daily", **kwargs):
+    user = get_user_model().objects.create_user(
+        email=f"user{n}@example.com", password="testpass123", **kwargs
+    )
+    NotificationPreference.objects.create(user=user, email_digest=digest_frequency)
+    return user
+
+
+def create_recipe(author, title, created_at=TUESDAY, is_published=True):
+    recipe = Recipe.objects.create(
+        author=author, title=title, instructions="Test", is_published=is_published
+    )
+    Recipe.objects.filter(pk=recipe.pk).update(created_at=created_at)
+    return recipe
+
+
+def notify(recipient, verb, created_at=TUESDAY, is_read=False):
+    notification = Notification.objects.create(
+        recipient=recipient, verb=verb, is_read=is_read
+    )
+    Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+
+
+@override_settings(EMAIL_DIGEST={"CHUNK_SIZE": 2, "RECIPES": 2})
+class DigestTests(TestCase):
+    """Tests for the email digests."""
+
+    def setUp(self):
+        self.user = create_user(0, name="Ada")
+        self.chef = create_user(1, "none", name="Chef")
+        self.muted = create_user(2, "none")
+        Follow.objects.create(follower=self.user, following=self.chef)
+        Follow.objects.create(follower=self.user, following=self.muted)
+        Mute.objects.create(user=self.user, muted_user=self.muted)
+
+    def test_period_end(self):
+        """Test periods end at midnight, and on Mondays for weekly ones."""
+        self.assertEqual(
+            digest.period_end("daily", NOW),
+            datetime(2026, 3, 11, tzinfo=timezone.utc),
+        )
+        self.assertEqual(
+            digest.period_end("weekly", NOW),
+            datetime(2026, 3, 9, tzinfo=timezone.utc),
+        )
+
+    def test_digest_content(self):
+        """Test a digest counts unread notifications and lists new recipes."""
+        for title in ("Soup", "Stew", "Bread & Butter"):
+            create_recipe(self.chef, title)
+        create_recipe(self.chef, "Draft", is_published=False)
+        create_recipe(self.chef, "Old", created_at=TUESDAY - timedelta(days=1))
+        create_recipe(self.muted, "Muted")
+        notify(self.user, "followed")
+        notify(self.user, "followed")
+        notify(self.user, "rated")
+        notify(self.user, "commented", is_read=True)
+        notify(self.user, "commented", created_at=NOW)
+
+        run = digest.send_digests("daily", now=NOW)
+
+        self.assertEqual(run.sent, 1)
+        self.assertIsNotNone(run.finished_at)
+        [message] = mail.outbox
+        self.assertEqual(message.to, [self.user.email])
+        self.assertEqual(message.subject, "Your daily Recipe App digest")
+        self.assertIn("Hi Ada,", message.body)
+        self.assertIn("2 new followers", message.body)
+        self.assertIn("1 ratings of your recipes", message.body)
+        self.assertNotIn("comments", message.body)
+        self.assertIn("Bread & Butter by Chef", message.body)
+        self.assertIn("Stew by Chef", message.body)
+        self.assertIn("...and 1 more", message.body)
+        for title in ("Soup", "Draft", "Old", "Muted"):
+            self.assertNotIn(title, message.body)
+
+    def test_only_users_with_news(self):
+        """Test only active users of the frequency with news get a digest."""
+        weekly = create_user(3, "weekly")
+        inactive = create_user(4, is_active=False)
+        quiet = create_user(5)
+        for user in (weekly, inactive):
+            notify(user, "followed")
+        notify(self.user, "followed")
+
+        digest.send_digests("daily", now=NOW)
+
+        self.assertEqual([m.to for m in mail.outbox], [[self.user.email]])
+        self.assertNotIn(quiet.email, [m.to[0] for m in mail.outbox])
+
+    def test_chunks_and_checkpoint(self):
+        """Test users are mailed in chunks of fixed queries, with checkpoints."""
+        users = [self.user] + [create_user(n) for n in range(3, 7)]
+        for user in users:
+            notify(user, "followed")
+
+        # Three chunks of three queries and a checkpoint each (no recipe
+        # titles to load), one more to find no users left, the run's
+        # get_or_create in a savepoint, and its finish
+        with self.assertNumQueries(3 * 4 + 1 + 4 + 1):
+            run = digest.send_digests("daily", now=NOW)
+
+        self.assertEqual(run.sent, 5)
+        self.assertEqual(run.last_user_id, users[-1].pk)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_resume(self):
+        """Test a stopped run resumes after its checkpoint and runs once."""
+        later = create_user(3)
+        for user in (self.user, later):
+            notify(user, "followed")
+        DigestRun.objects.create(
+            frequency="daily",
+            period_end=digest.period_end("daily", NOW),
+            last_user_id=self.user.pk,
+            sent=1,
+        )
+
+        run = digest.send_digests("daily", now=NOW)
+        self.assertEqual(run.sent, 2)
+        self.assertEqual([m.to for m in mail.outbox], [[later.email]])
+
+        digest.send_digests("daily", now=NOW)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_weekly(self):
+        """Test a weekly digest covers the last full week."""
+        NotificationPreference.objects.filter(user=self.user).update(
+            email_digest="weekly"
+        )
+        notify(self.user, "rated", created_at=TUESDAY - timedelta(days=7))
+        notify(self.user, "followed")
+
+        digest.send_digests("weekly", now=NOW)
+
+        [message] = mail.outbox
+        self.assertIn("1 ratings of your recipes", message.body)
+        self.assertNotIn("followers", message.body)
+
+    def test_command(self):
+        """Test the send_digests command."""
+        yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+        notify(self.user, "followed", created_at=yesterday)
+        out = StringIO()
+
+        call_command("send_digests", "daily", stdout=out)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Sent 1 daily digest(s)", out.getvalue())
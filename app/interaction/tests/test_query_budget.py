@@ -0,0 +1,73 @@
+from core.profiling import QueryBudgetMixin
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from interaction.models import Follow, Notification, Rating
+from recipe.models import Recipe
+from rest_framework import status
+from rest_framework.test import APIClient
+
+FEED_URL = reverse("interaction:feed-list")
+NOTIFICATIONS_URL = reverse("interaction:notification-list")
+
+
+class SocialQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets for social endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com",
+            password="testpass123",
+        )
+        self.others = [
+            get_user_model().objects.create_user(
+                email=f"other{i}@example.com",
+                password="testpass123",
+            )
+            for i in range(3)
+        ]
+        for other in self.others:
+            Follow.objects.create(follower=self.user, following=other)
+            Notification.objects.create(
+                recipient=self.user, actor=other, verb="followed"
+            )
+            recipe = Recipe.objects.create(
+                author=other,
+                title="Test Recipe",
+                instructions="Test",
+                is_published=True,
+            )
+            Rating.objects.create(user=other, recipe=recipe, score=5)
+        self.client.force_authenticate(user=self.user)
+
+    def test_feed_budget(self):
+        """Test feed query budget."""
+        # Feed items render RecipeListSerializer's per-row rating properties.
+        with self.assertQueryBudget(30, allow_n_plus_one=True):
+            res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_notifications_budget(self):
+        """Test notification list query budget."""
+        with self.assertQueryBudget(2):
+            res = self.client.get(NOTIFICATIONS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_profile_budget(self):
+        """Test user profile query budget."""
+        url = reverse("interaction:user-detail", args=[self.others[0].id])
+        with self.assertQueryBudget(5):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_following_budget(self):
+        """Test following list query budget."""
+        url = reverse("interaction:user-following", args=[self.user.id])
+        with self.assertQueryBudget(3):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from interaction.models import Favorite, FeedLog, FeedPreference, Follow, Rating
+from interaction.services import ranking
+from interaction.services.feed import FeedService
+from interaction.services.relationships import relationships
+from recipe.models import Recipe, RecipeScore
+from taxonomy.models import Tag
+
+
+def create_user(email):
+    return get_user_model().objects.create_user(email=email, password="testpass123")
+
+
+class FeedRankingTests(TestCase):
+    """Tests for the algorithmic feed ranking."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("user@example.com")
+        self.liked = create_user("liked@example.com")
+        self.other = create_user("other@example.com")
+        for followed in (self.liked, self.other):
+            Follow.objects.create(follower=self.user, following=followed)
+        self.vegan = Tag.objects.create(name="Vegan", slug="vegan")
+
+    def recipe(self, author, title, hours_ago=0):
+        recipe = Recipe.objects.create(
+            author=author, title=title, instructions="Cook", is_published=True
+        )
+        created = timezone.now() - timedelta(hours=hours_ago)
+        Recipe.objects.filter(pk=recipe.pk).update(created_at=created)
+        recipe.refresh_from_db()
+        return recipe
+
+    def test_profile(self):
+        """Test affinities come from ratings and favorites, normalized."""
+        liked = self.recipe(self.liked, "Liked")
+        liked.tags.add(self.vegan)
+        disliked = self.recipe(self.other, "Disliked")
+        Favorite.objects.create(user=self.user, recipe=liked)
+        Rating.objects.create(user=self.user, recipe=liked, score=5)
+        Rating.objects.create(user=self.user, recipe=disliked, score=1)
+
+        profile = ranking.build_profile(self.user.pk)
+
+        self.assertEqual(profile["authors"], {self.liked.pk: 1.0})
+        self.assertEqual(profile["tags"], {self.vegan.pk: 1.0})
+
+    def test_algorithmic_order(self):
+        """Test affinity and velocity can outrank a newer recipe."""
+        older = self.recipe(self.liked, "Older", hours_ago=6)
+        self.recipe(self.other, "Newer")
+        past = self.recipe(self.liked, "Past", hours_ago=200)
+        Favorite.objects.create(user=self.user, recipe=past)
+        RecipeScore.objects.filter(pk=older.pk).update(trending=20)
+
+        chronological = FeedService.get_feed(self.user)
+        algorithmic = FeedService.get_feed(self.user, order="algorithmic")
+
+        self.assertEqual(
+            [item["recipe"].title for item in chronological],
+            ["Newer", "Older", "Past"],
+        )
+        self.assertEqual(
+            [item["recipe"].title for item in algorithmic],
+            ["Older", "Newer", "Past"],
+        )
+
+    def test_preference_sets_default_order(self):
+        """Test the feed uses FeedPreference.feed_order unless overridden."""
+        older = self.recipe(self.liked, "Older", hours_ago=6)
+        self.recipe(self.other, "Newer")
+        Favorite.objects.create(user=self.user, recipe=older)
+        FeedPreference.objects.create(user=self.user, feed_order="algorithmic")
+
+        default = FeedService.get_feed(self.user)
+        overridden = FeedService.get_feed(self.user, order="chronological")
+
+        self.assertEqual(default[0]["recipe"].title, "Older")
+        self.assertEqual(overridden[0]["recipe"].title, "Newer")
+
+    def test_feed_is_logged_with_features(self):
+        """Test sampled feeds are stored with each candidate's features."""
+        recipe = self.recipe(self.liked, "Soup")
+        conf = {**settings.FEED_RANKING, "LOG_RATE": 1}
+
+        with override_settings(FEED_RANKING=conf):
+            FeedService.get_feed(self.user, order="algorithmic", limit=10)
+
+        log = FeedLog.objects.get()
+        self.assertEqual((log.order, log.served), ("algorithmic", 10))
+        [[recipe_id, kind, features]] = log.items
+        self.assertEqual((recipe_id, kind), (recipe.pk, "recipe"))
+        self.assertEqual(len(features), len(ranking.FEATURES))
+        self.assertAlmostEqual(features[0], 1.0, places=2)
+
+    def test_scoring_query_count(self):
+        """Test ranking costs a fixed number of queries, whatever the size."""
+        for n in range(20):
+            self.recipe(self.liked if n % 2 else self.other, f"Recipe {n}", n)
+        ranking.user_profile(self.user.pk)
+        relationships(self.user.pk)
+
+        # Preferences, the merged feed, actors and recipes, then one each for
+        # scores and tags
+        with self.assertNumQueries(6):
+            FeedService.get_feed(self.user, order="algorithmic")
+
+    @override_settings(FEED_RANKING={**settings.FEED_RANKING, "CANDIDATES": 4})
+    def test_algorithmic_pages(self):
+        """Test pages go through each ranked window, then the next window."""
+        recipes = [self.recipe(self.liked, f"Recipe {n}", n) for n in range(6)]
+
+        items, cursor = FeedService.get_page(self.user, order="algorithmic", limit=3)
+        seen = [item["recipe"].pk for item in items]
+        # Newer than the first window, so not in any later page
+        self.recipe(self.other, "Later")
+        while cursor is not None:
+            items, cursor = FeedService.get_page(
+                self.user, order="algorithmic", limit=3, cursor=cursor
+            )
+            seen += [item["recipe"].pk for item in items]
+
+        self.assertEqual(sorted(seen), [recipe.pk for recipe in recipes])
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from interaction.models import Block, Follow, Mute
+from interaction.services import relationships as rel
+
+
+def create_user(n):
+    return get_user_model().objects.create_user(
+        email=f"user{n}@example.com", password="testpass123"
+    )
+
+
+class RelationshipCacheTests(TestCase):
+    """Tests for the cached follow, mute and block sets."""
+
+    def setUp(self):
+        cache.clear()
+        self.user, *self.others = [create_user(n) for n in range(5)]
+
+    def test_sets(self):
+        """Test each relation is loaded in one query and cached."""
+        a, b, c, d = self.others
+        Follow.objects.create(follower=self.user, following=a)
+        Follow.objects.create(follower=self.user, following=b)
+        Follow.objects.create(follower=c, following=self.user)
+        Mute.objects.create(user=self.user, muted_user=b)
+        Block.objects.create(user=self.user, blocked_user=c)
+        Block.objects.create(user=d, blocked_user=self.user)
+
+        with self.assertNumQueries(1):
+            related = rel.relationships(self.user.pk)
+        with self.assertNumQueries(0):
+            rel.relationships(self.user.pk)
+
+        self.assertEqual(related.following, {a.pk, b.pk})
+        self.assertEqual(related.muted, {b.pk})
+        self.assertEqual(related.blocked, {c.pk, d.pk})
+        self.assertTrue(related.is_blocked(d.pk))
+        self.assertEqual(related.feed_authors, {a.pk})
+
+    def test_writes_invalidate(self):
+        """Test saves and deletes drop the changed users' cached sets."""
+        a, b, *_ = self.others
+        rel.relationships(self.user.pk)
+        follow = Follow.objects.create(follower=self.user, following=a)
+        self.assertEqual(rel.relationships(self.user.pk).following, {a.pk})
+
+        follow.delete()
+        Mute.objects.create(user=self.user, muted_user=b)
+        related = rel.relationships(self.user.pk)
+        self.assertEqual((related.following, related.muted), (set(), {b.pk}))
+
+        rel.relationships(a.pk)
+        Block.objects.create(user=self.user, blocked_user=a)
+        self.assertEqual(rel.relationships(a.pk).blocked_by, {self.user.pk})
+        self.assertEqual(rel.relationships(self.user.pk).blocking, {a.pk})
+
+    def test_invalidated_again_on_commit(self):
+        """Test sets cached before the write commits are dropped after it."""
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.create(follower=self.user, following=self.others[0])
+            # Another request reads the committed, older state meanwhile
+            cache.set(rel.CACHE_KEY.format(self.user.pk), rel.load(0))
+
+        self.assertEqual(rel.relationships(self.user.pk).following, {self.others[0].pk})
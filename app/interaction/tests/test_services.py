@@ -1,7 +1,18 @@
+import base64
+import json
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
-from interaction.models import Favorite, FeedPreference, Follow, Mute, Rating
-from interaction.services.feed import FeedService
+from django.utils import timezone
+from interaction.models import (
+    Block,
+    Favorite,
+    FeedPreference,
+    Follow,
+    Mute,
+    Rating,
+)
+from interaction.services.feed import FeedCursor, FeedService
 from recipe.models import Recipe
 
 
@@ -106,3 +117,75 @@ class FeedServiceTests(TestCase):
         feed = FeedService.get_feed(self.user)
         types = [item["type"] for item in feed]
         self.assertIn("favorite", types)
+
+    def test_feed_excludes_blocks_either_way(self):
+        """Test feed excludes users the viewer blocked or is blocked by."""
+        blocker = get_user_model().objects.create_user(
+            email="blocker@example.com",
+            password="testpass123",
+        )
+        Follow.objects.create(follower=self.user, following=blocker)
+        for author in (self.followed_user, blocker):
+            Recipe.objects.create(
+                author=author, title="Recipe", instructions="Test", is_published=True
+            )
+        Block.objects.create(user=self.user, blocked_user=self.followed_user)
+        Block.objects.create(user=blocker, blocked_user=self.user)
+
+        self.assertEqual(FeedService.get_feed(self.user), [])
+
+    def test_feed_pages_by_cursor(self):
+        """Test pages continue below the last item, ties broken by type and id."""
+        FeedPreference.objects.create(user=self.user, show_favorites=True)
+        recipes = [
+            Recipe.objects.create(
+                author=self.followed_user,
+                title=f"Recipe {n}",
+                instructions="Test",
+                is_published=True,
+            )
+            for n in range(3)
+        ]
+        for recipe in recipes:
+            Rating.objects.create(user=self.followed_user, recipe=recipe, score=4)
+            Favorite.objects.create(user=self.followed_user, recipe=recipe)
+        # Every item at the same instant, so only type and id order them
+        now = timezone.now()
+        for model in (Recipe, Rating, Favorite):
+            model.objects.update(created_at=now)
+        expected = [
+            (kind, pk)
+            for kind, model in (
+                ("recipe", Recipe),
+                ("rating", Rating),
+                ("favorite", Favorite),
+            )
+            for pk in model.objects.order_by("-pk").values_list("pk", flat=True)
+        ]
+
+        seen, cursor = [], None
+        while True:
+            items, cursor = FeedService.get_page(self.user, limit=2, cursor=cursor)
+            seen += [(item["type"], item["id"]) for item in items]
+            if cursor is None:
+                break
+            cursor = FeedCursor.decode(cursor.encode())
+
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        """Test malformed cursors are rejected."""
+        now = timezone.now().isoformat()
+        encoded = [
+            base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+            for data in (
+                [1, 2, 3],
+                ["yesterday", "recipe", 1, 0, 0],
+                [now, "comment", 1, 0, 0],
+                [now, ["recipe"], 1, 0, 0],
+                [now, "recipe", 1, 0, -20],
+            )
+        ]
+        for value in ["", "not a cursor", *encoded]:
+            with self.assertRaises(ValueError):
+                FeedCursor.decode(value)
@@ -1,3 +1,4 @@
+from core.renderers import StreamingJSONMixin
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.db.models import Count, Q
@@ -5,20 +6,28 @@ from django.shortcuts import get_object_or_404
 from interaction.models import Block, Follow, FollowRequest, Mute, Notification
 from interaction.serializers import (
     BlockSerializer,
-    FeedItemSerializer,
+    FollowRequestBatchSerializer,
     FollowRequestSerializer,
     FollowSerializer,
     MuteSerializer,
     NotificationSerializer,
+    RelationshipBatchSerializer,
     UserProfileSerializer,
     UserSummarySerializer,
+    fast_feed_item,
+    fast_follow,
+    fast_notification,
 )
-from interaction.services.feed import FeedService
+from interaction.services import bulk
+from interaction.services.feed import FeedCursor, FeedService
+from interaction.services.relationships import relationships
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardPagination(PageNumberPagination):
@@ -27,7 +36,37 @@ class StandardPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class UserViewSet(viewsets.GenericViewSet):
+class FeedPagination(StandardPagination):
+    """Keyset pages of the feed: ``next`` and ``results``, no count."""
+
+    cursor_query_param = "cursor"
+
+    def get_cursor(self, request):
+        value = request.query_params.get(self.cursor_query_param)
+        if not value:
+            return None
+        try:
+            return FeedCursor.decode(value)
+        except ValueError:
+            raise NotFound("Invalid cursor")
+
+    def cursor_link(self, request, cursor):
+        if cursor is None:
+            return None
+        url = request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor.encode())
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class UserViewSet(StreamingJSONMixin, viewsets.GenericViewSet):
     """ViewSet for user social actions."""
 
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -42,18 +81,17 @@ class UserViewSet(viewsets.GenericViewSet):
 
         # Calculate follower/following counts
         followers_count = Follow.objects.filter(following=user).count()
-        following_count = Follow.objects.filter(follower=user).count()
+        following_count = len(relationships(user.pk).following)
 
         # Check relationship with current user
         is_following = False
         has_pending_request = False
         if request.user.is_authenticated and request.user != user:
-            is_following = Follow.objects.filter(
-                follower=request.user, following=user
-            ).exists()
-            has_pending_request = FollowRequest.objects.filter(
-                requester=request.user, target=user, status="pending"
-            ).exists()
+            is_following = user.pk in relationships(request.user.pk).following
+            if not is_following:
+                has_pending_request = FollowRequest.objects.filter(
+                    requester=request.user, target=user, status="pending"
+                ).exists()
 
         # Build profile data
         profile_data = {
@@ -62,6 +100,7 @@ class UserViewSet(viewsets.GenericViewSet):
             "name": user.name,
             "bio": getattr(user, "bio", None),
             "profile_photo": user.profile_photo if user.profile_photo else None,
+            "profile_photo_variants": user.profile_photo_variants,
             "is_verified": getattr(user, "is_verified", False),
             "is_private": getattr(user, "is_private", False),
             "followers_count": followers_count,
@@ -89,10 +128,8 @@ class UserViewSet(viewsets.GenericViewSet):
             )
 
         # Check if blocked
-        blocked = Block.objects.filter(
-            user=target_user, blocked_user=request.user
-        ).exists()
-        if blocked:
+        related = relationships(request.user.pk)
+        if target_user.pk in related.blocked_by:
             return Response(
                 {"error": "Unable to follow this user."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -106,10 +143,7 @@ class UserViewSet(viewsets.GenericViewSet):
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         # POST - follow
-        already_following = Follow.objects.filter(
-            follower=request.user, following=target_user
-        ).exists()
-        if already_following:
+        if target_user.pk in related.following:
             return Response(
                 {"error": "Already following this user."},
                 status=status.HTTP_400_BAD_REQUEST,
@@ -124,27 +158,59 @@ class UserViewSet(viewsets.GenericViewSet):
             serializer = FollowRequestSerializer(follow_request)
             return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
-        follow = Follow.objects.create(follower=request.user, following=target_user)
+        # The cached sets may lag a follow made through another process.
+        follow, created = Follow.objects.get_or_create(
+            follower=request.user, following=target_user
+        )
+        if not created:
+            return Response(
+                {"error": "Already following this user."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         serializer = FollowSerializer(follow)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAuthenticated],
+        url_path="me/relationships",
+        url_name="relationships",
+    )
+    def batch_relationships(self, request):
+        """Follow, unfollow, mute, unmute, block or unblock many users at once."""
+        serializer = RelationshipBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        operations = serializer.validated_data["operations"]
+        statuses = bulk.apply_operations(
+            request.user,
+            [(operation["action"], operation["user"]) for operation in operations],
+        )
+        results = [
+            {**operation, "status": outcome}
+            for operation, outcome in zip(operations, statuses)
+        ]
+        return Response({"results": results})
+
     @action(detail=True, methods=["get"])
     def followers(self, request, pk=None):
         """List user's followers."""
         user = get_object_or_404(get_user_model(), pk=pk)
-        follows = Follow.objects.filter(following=user).select_related("follower")
+        follows = Follow.objects.filter(following=user).select_related(
+            "follower", "following"
+        )
         page = self.paginate_queryset(follows)
-        serializer = FollowSerializer(page, many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_response(fast_follow.many(page))
 
     @action(detail=True, methods=["get"])
     def following(self, request, pk=None):
         """List who user follows."""
         user = get_object_or_404(get_user_model(), pk=pk)
-        follows = Follow.objects.filter(follower=user).select_related("following")
+        follows = Follow.objects.filter(follower=user).select_related(
+            "follower", "following"
+        )
         page = self.paginate_queryset(follows)
-        serializer = FollowSerializer(page, many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_response(fast_follow.many(page))
 
     @action(
         detail=False,
@@ -203,6 +269,34 @@ class UserViewSet(viewsets.GenericViewSet):
         serializer = FollowRequestSerializer(follow_request)
         return Response(serializer.data)
 
+    def _answer_requests(self, request, answer):
+        serializer = FollowRequestBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data.get("ids")
+        return Response({"count": answer(request.user, ids)})
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAuthenticated],
+        url_path="me/follow-requests/accept",
+        url_name="accept-requests",
+    )
+    def accept_requests(self, request):
+        """Accept the given or all pending follow requests."""
+        return self._answer_requests(request, bulk.approve_requests)
+
+    @action(
+        detail=False,
+        methods=["post"],
+        permission_classes=[IsAuthenticated],
+        url_path="me/follow-requests/reject",
+        url_name="reject-requests",
+    )
+    def reject_requests(self, request):
+        """Reject the given or all pending follow requests."""
+        return self._answer_requests(request, bulk.reject_requests)
+
     @action(
         detail=True,
         methods=["post", "delete"],
@@ -227,15 +321,8 @@ class UserViewSet(viewsets.GenericViewSet):
             block, created = Block.objects.get_or_create(
                 user=request.user, blocked_user=target_user
             )
-            # Remove follows in both directions
-            Follow.objects.filter(follower=request.user, following=target_user).delete()
-            Follow.objects.filter(follower=target_user, following=request.user).delete()
-            FollowRequest.objects.filter(
-                requester=request.user, target=target_user
-            ).delete()
-            FollowRequest.objects.filter(
-                requester=target_user, target=request.user
-            ).delete()
+            # Remove follows and follow requests in both directions
+            bulk.end_follows(request.user, both_ways=[target_user.pk])
 
         serializer = BlockSerializer(block)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -301,18 +388,8 @@ class UserViewSet(viewsets.GenericViewSet):
         if len(query) < 2:
             return Response({"results": []})
 
-        # Get users who blocked the requesting user or were blocked by them
-        blocked_user_ids = Block.objects.filter(
-            Q(user=request.user) | Q(blocked_user=request.user)
-        ).values_list("user_id", "blocked_user_id")
-        excluded_ids = set()
-        for blocker_id, blocked_id in blocked_user_ids:
-            excluded_ids.add(blocker_id)
-            excluded_ids.add(blocked_id)
-        # Don't exclude self from excluded set
-        excluded_ids.discard(request.user.pk)
-        # But do exclude self from results
-        excluded_ids.add(request.user.pk)
+        # Exclude users blocked either way, and self
+        excluded_ids = relationships(request.user.pk).blocked | {request.user.pk}
 
         users = (
             get_user_model()
@@ -330,15 +407,9 @@ class UserViewSet(viewsets.GenericViewSet):
 
         # If authenticated, exclude blocked users (both directions)
         if request.user.is_authenticated:
-            blocked_user_ids = Block.objects.filter(
-                Q(user=request.user) | Q(blocked_user=request.user)
-            ).values_list("user_id", "blocked_user_id")
-            excluded_ids = set()
-            for blocker_id, blocked_id in blocked_user_ids:
-                excluded_ids.add(blocker_id)
-                excluded_ids.add(blocked_id)
-            excluded_ids.discard(request.user.pk)
-            queryset = queryset.exclude(pk__in=excluded_ids)
+            excluded_ids = relationships(request.user.pk).blocked
+            if excluded_ids:
+                queryset = queryset.exclude(pk__in=excluded_ids)
 
         users = queryset.annotate(follower_count=Count("followers_set")).order_by(
             "-follower_count"
@@ -352,24 +423,12 @@ class UserViewSet(viewsets.GenericViewSet):
     def suggested(self, request):
         """Get suggested users based on who you follow."""
         # Get users followed by people you follow
-        following_ids = Follow.objects.filter(follower=request.user).values_list(
-            "following_id", flat=True
-        )
-
-        # Get blocked user IDs (both directions)
-        blocked_user_ids = Block.objects.filter(
-            Q(user=request.user) | Q(blocked_user=request.user)
-        ).values_list("user_id", "blocked_user_id")
-        excluded_ids = set()
-        for blocker_id, blocked_id in blocked_user_ids:
-            excluded_ids.add(blocker_id)
-            excluded_ids.add(blocked_id)
-        excluded_ids.discard(request.user.pk)
+        related = relationships(request.user.pk)
+        following_ids = related.following
+        excluded_ids = following_ids | related.blocked | {request.user.pk}
 
         suggested_ids = (
             Follow.objects.filter(follower_id__in=following_ids)
-            .exclude(following=request.user)
-            .exclude(following_id__in=following_ids)
             .exclude(following_id__in=excluded_ids)
             .values_list("following_id", flat=True)
             .distinct()[:20]
@@ -380,7 +439,7 @@ class UserViewSet(viewsets.GenericViewSet):
         return Response({"results": serializer.data})
 
 
-class NotificationViewSet(viewsets.GenericViewSet):
+class NotificationViewSet(StreamingJSONMixin, viewsets.GenericViewSet):
     """ViewSet for notifications."""
 
     permission_classes = [IsAuthenticated]
@@ -393,8 +452,7 @@ class NotificationViewSet(viewsets.GenericViewSet):
         """List notifications."""
         queryset = self.get_queryset().select_related("actor")
         page = self.paginate_queryset(queryset)
-        serializer = NotificationSerializer(page, many=True)
-        return self.get_paginated_response(serializer.data)
+        return self.get_paginated_response(fast_notification.many(page))
 
     @action(detail=True, methods=["post"], url_path="read", url_name="mark-read")
     def mark_read(self, request, pk=None):
@@ -428,18 +486,23 @@ class NotificationViewSet(viewsets.GenericViewSet):
         return Response({"count": count})
 
 
-class FeedViewSet(viewsets.GenericViewSet):
+class FeedViewSet(StreamingJSONMixin, viewsets.GenericViewSet):
     """ViewSet for activity feed."""
 
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardPagination
+    pagination_class = FeedPagination
 
     def list(self, request):
         """Get activity feed."""
-        order = request.query_params.get("order", "chronological")
-        feed_items = FeedService.get_feed(request.user, order=order)
-
-        # Manual pagination
-        page = self.paginate_queryset(feed_items)
-        serializer = FeedItemSerializer(page, many=True)
-        return self.get_paginated_response(serializer.data)
+        items, next_cursor = FeedService.get_page(
+            request.user,
+            order=request.query_params.get("order"),
+            limit=self.paginator.get_page_size(request),
+            cursor=self.paginator.get_cursor(request),
+        )
+        return Response(
+            {
+                "next": self.paginator.cursor_link(request, next_cursor),
+                "results": fast_feed_item.many(items),
+            }
+        )
@@ -4,3 +4,18 @@ from django.apps import AppConfig
 class RecipeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "recipe"
+
+    def ready(self):
+        from core.media import track_media
+        from core.models import User
+        from django.db.models.signals import post_delete, post_init, post_save
+        from recipe.caching import author_renamed, remember_author_name
+        from recipe.models import Recipe
+        from recipe.rankings import ENGAGEMENTS, engagement_deleted, engagement_saved
+
+        track_media(Recipe, "image")
+        post_init.connect(remember_author_name, sender=User)
+        post_save.connect(author_renamed, sender=User)
+        for model in ENGAGEMENTS:
+            post_save.connect(engagement_saved, sender=model)
+            post_delete.connect(engagement_deleted, sender=model)
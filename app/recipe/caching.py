@@ -0,0 +1,205 @@
+"""
+HTTP validators and payload caching for recipe reads.
+
+Recipe responses carry a weak ETag and Last-Modified derived from
+``Recipe.updated_at`` and ``Recipe.version`` (both bumped by
+``Recipe.touch``) and the rating aggregate, so conditional GETs from clients
+and nginx are answered with 304 before any serialization happens.
+
+Full detail renders are cached per recipe version; see ``cached_detail``.
+Renaming a user bumps their recipes' ``updated_at`` and ``version`` too,
+since responses show the author's name; see ``author_renamed``.
+"""
+
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from recipe.models import Recipe
+
+
+def _etag(*parts):
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    )
+    return f'W/"{digest.hexdigest()}"'
+
+
+def _variant(request):
+    """Responses differ by viewer (drafts) and negotiated media type."""
+    user_id = request.user.pk if request.user.is_authenticated else "anon"
+    return user_id, getattr(request, "accepted_media_type", "")
+
+
+def recipe_validators(request, recipe):
+    """Return ``(etag, last_modified)`` for a recipe detail response."""
+    etag = _etag(
+        recipe.pk,
+        recipe.version,
+        recipe.updated_at.isoformat(),
+        getattr(recipe, "avg_rating", None),
+        *_variant(request),
+    )
+    return etag, recipe.updated_at
+
+
+def list_validators(request, queryset):
+    """
+    Return ``(etag, last_modified)`` for a filtered recipe list.
+
+    One aggregate query over the filtered queryset: any create, update,
+    rating (via ``touch``), unpublish or delete changes the newest
+    ``updated_at`` or the row count. Pass the queryset without the page's
+    rating annotation, or the aggregate runs over a grouped join of every
+    rating.
+    """
+    stats = queryset.order_by().aggregate(latest=Max("updated_at"), total=Count("pk"))
+    latest = stats["latest"]
+    etag = _etag(
+        request.get_full_path(),
+        latest.isoformat() if latest else "",
+        stats["total"],
+        *_variant(request),
+    )
+    return etag, latest
+
+
+def remember_author_name(sender, instance, **kwargs):
+    """``post_init`` receiver noting a user's name as loaded."""
+    # Read from __dict__ so a deferred name does not cost a query.
+    instance._loaded_name = instance.__dict__.get("name")
+
+
+def author_renamed(sender, instance, created, **kwargs):
+    """
+    ``post_save`` receiver touching a renamed user's recipes.
+
+    Recipe payloads show ``author_name``, so a rename must change their
+    validators like any other edit.
+    """
+    name = instance.__dict__.get("name")
+    previous = getattr(instance, "_loaded_name", None)
+    instance._loaded_name = name
+    if created or previous is None or name == previous:
+        return
+    Recipe.objects.filter(author=instance).update(
+        updated_at=timezone.now(), version=F("version") + 1
+    )
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for an in-process view of a cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        """Return hits, misses and the hit rate (None before any lookup)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+detail_cache_stats = CacheStats()
+
+
+def detail_cache_key(request, recipe):
+    """
+    Return the cache key for a recipe's rendered detail payload.
+
+    ``version`` covers writes through the API; ``updated_at`` also covers
+    plain ``save()`` calls (shell, data fixes). The scheme and host are
+    included because image URLs are absolute.
+    """
+    return (
+        f"recipe:detail:{recipe.pk}:v{recipe.version}:"
+        f"{recipe.updated_at.timestamp()}:{request.scheme}://{request.get_host()}"
+    )
+
+
+def cached_detail(request, recipe, serialize):
+    """
+    Return the detail payload for ``recipe``, rendering it on a miss.
+
+    Callers must check visibility before calling; the cached blob is shared
+    by every viewer. Any recipe write and any author rename saved through the
+    model (``author_renamed``) changes the key, so stale entries are never
+    read. The author's name is still overlaid after the lookup, for renames
+    made with a queryset ``update()``, which sends no signal.
+    """
+    key = detail_cache_key(request, recipe)
+    data = cache.get(key)
+    detail_cache_stats.record(hit=data is not None)
+    if data is None:
+        data = dict(serialize(recipe))
+        cache.set(key, data, settings.RECIPE_DETAIL_CACHE_TIMEOUT)
+    data["author_name"] = recipe.author.name
+    return data
+
+
+def _cache_headers(request, etag, last_modified):
+    response = HttpResponse()
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    if request.user.is_authenticated:
+        response["Cache-Control"] = "private, no-cache"
+    else:
+        max_age = settings.RECIPE_CACHE_MAX_AGE
+        response["Cache-Control"] = f"public, max-age={max_age}"
+    patch_vary_headers(response, ["Accept", "Authorization"])
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer conditional GETs on recipe reads without serializing.
+
+    Anonymous responses are ``public`` for ``RECIPE_CACHE_MAX_AGE`` seconds
+    so nginx can cache them; authenticated ones must always revalidate.
+    """
+
+    def conditional_response(self, request, etag, last_modified):
+        """Return a 304/412 response, or None to continue rendering."""
+        self._cache_headers = _cache_headers(request, etag, last_modified)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=(int(last_modified.timestamp()) if last_modified else None),
+            response=self._cache_headers,
+        )
+        # Django hands back the passed-in response when no precondition hit.
+        return None if response is self._cache_headers else response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        headers = getattr(self, "_cache_headers", None)
+        if headers is not None and response.status_code == 200:
+            for header in ("ETag", "Last-Modified", "Cache-Control", "Vary"):
+                if header in headers:
+                    response[header] = headers[header]
+        return response
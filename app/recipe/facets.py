@@ -0,0 +1,199 @@
+"""
+Facet counts for the recipe list.
+
+``GET /api/recipes/?facets=true`` adds, for the current filters and search,
+how many recipes fall under each category, tag, difficulty and time bucket.
+All counts come from one statement: the filtered recipes are a CTE, the
+per-recipe facets are ``GROUPING SETS`` over a single pass of it, and tags
+are one join against the tag table.
+
+Counting scans every matching recipe, which takes seconds for the broadest
+filter sets on a million recipes, so results are cached per filter set for
+``RECIPE_FACETS_CACHE_TIMEOUT`` seconds and ``warm_facets`` refreshes the
+common ones from cron. Counts may therefore lag writes by that long.
+
+Time buckets are cumulative, so each count is what ``?max_time=<value>``
+would return with the other filters unchanged.
+"""
+
+import hashlib
+from collections import defaultdict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+from recipe.filters import RecipeFilter
+from recipe.models import Recipe
+from taxonomy.models import Category, Tag
+
+# Upper bounds, in minutes, of the max_time buckets
+TIME_BUCKETS = [15, 30, 60, 120]
+
+# Most frequent values returned per category/tag facet
+FACET_LIMIT = 20
+
+# Query parameters that change the counts
+FACET_PARAMS = set(RecipeFilter.base_filters) | {"search"}
+
+# GROUPING() bits are (category_id, difficulty, time_bucket); 0 = grouped by
+_BY_CATEGORY, _BY_DIFFICULTY, _BY_TIME = 0b011, 0b101, 0b110
+
+FACETS_SQL = f"""
+WITH r (id, category_id, difficulty, time_bucket) AS ({{recipes}}),
+g AS (
+    SELECT GROUPING(category_id, difficulty, time_bucket) AS grouping_set,
+           category_id, difficulty, time_bucket, COUNT(*) AS n
+    FROM r
+    GROUP BY GROUPING SETS ((category_id), (difficulty), (time_bucket))
+),
+tg AS (
+    SELECT rt.tag_id, COUNT(*) AS n
+    FROM r JOIN {{recipe_tags}} rt ON rt.recipe_id = r.id
+    GROUP BY rt.tag_id
+)
+SELECT 'categories', c.id, c.slug, c.name, g.n
+FROM g JOIN {{category}} c ON c.id = g.category_id
+WHERE g.grouping_set = {_BY_CATEGORY}
+UNION ALL
+SELECT 'difficulty', NULL, g.difficulty, NULL, g.n
+FROM g WHERE g.grouping_set = {_BY_DIFFICULTY}
+UNION ALL
+SELECT 'max_time', g.time_bucket, NULL, NULL, g.n
+FROM g WHERE g.grouping_set = {_BY_TIME} AND g.time_bucket IS NOT NULL
+UNION ALL
+SELECT 'tags', t.id, t.slug, t.name, tg.n
+FROM tg JOIN {{tag}} t ON t.id = tg.tag_id
+"""
+
+
+def _sql(queryset):
+    recipes = (
+        queryset.order_by()
+        .annotate(
+            _time_bucket=Case(
+                *[
+                    When(total_time__lte=bound, then=Value(bound))
+                    for bound in TIME_BUCKETS
+                ],
+                default=None,
+                output_field=IntegerField(),
+            )
+        )
+        .values_list("id", "category_id", "difficulty", "_time_bucket")
+    )
+    sql, params = recipes.query.sql_with_params()
+    quote = connection.ops.quote_name
+    return (
+        FACETS_SQL.format(
+            recipes=sql,
+            category=quote(Category._meta.db_table),
+            recipe_tags=quote(Recipe.tags.through._meta.db_table),
+            tag=quote(Tag._meta.db_table),
+        ),
+        params,
+    )
+
+
+def facet_counts(queryset):
+    """
+    Return facet counts for the recipes in ``queryset``.
+
+    ``queryset`` should be the filtered list without annotations or
+    ordering that the counts do not need.
+    """
+    try:
+        sql, params = _sql(queryset)
+    except EmptyResultSet:
+        # A filter that matches nothing, such as an unknown tag slug
+        rows = []
+    else:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+    grouped = defaultdict(list)
+    for facet, pk, value, name, count in rows:
+        grouped[facet].append((pk, value, name, count))
+
+    facets = {}
+    for facet in ("categories", "tags"):
+        top = sorted(grouped[facet], key=lambda row: (-row[3], row[2]))
+        facets[facet] = [
+            {"id": pk, "slug": slug, "name": name, "count": count}
+            for pk, slug, name, count in top[:FACET_LIMIT]
+        ]
+    facets["difficulty"] = [
+        {"value": value, "count": count}
+        for _, value, _, count in sorted(grouped["difficulty"], key=_difficulty_order)
+    ]
+    per_bucket = {pk: count for pk, _, _, count in grouped["max_time"]}
+    running = 0
+    facets["max_time"] = []
+    for bound in TIME_BUCKETS:
+        running += per_bucket.get(bound, 0)
+        facets["max_time"].append({"value": bound, "count": running})
+    return facets
+
+
+def _difficulty_order(row):
+    levels = [level for level, _ in Recipe.DIFFICULTY_CHOICES]
+    return levels.index(row[1]) if row[1] in levels else len(levels)
+
+
+def facet_cache_key(params, owner_id=None):
+    """
+    Return the cache key for the facet counts of a filter set.
+
+    ``owner_id`` is set for users with drafts, whose counts include them;
+    everyone else shares the published-only entry.
+    """
+    relevant = sorted(
+        (key, value) for key, value in params.items() if key in FACET_PARAMS and value
+    )
+    digest = hashlib.md5(urlencode(relevant).encode(), usedforsecurity=False)
+    return f"recipe:facets:{digest.hexdigest()}:{owner_id or 'public'}"
+
+
+def cached_facet_counts(key, queryset):
+    """Return ``facet_counts(queryset)`` through the cache entry ``key``."""
+    facets = cache.get(key)
+    if facets is None:
+        facets = facet_counts(queryset)
+        cache.set(key, facets, settings.RECIPE_FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def warm_facets():
+    """
+    Refresh the cached counts that anonymous and draft-less users share.
+
+    Covers the unfiltered list and each category, category subtree and
+    difficulty on its own. Returns the number of filter sets computed.
+    """
+    filter_sets = [{}]
+    for pk in Category.objects.values_list("pk", flat=True):
+        filter_sets += [{"category": str(pk)}, {"category_tree": str(pk)}]
+    filter_sets += [{"difficulty": level} for level, _ in Recipe.DIFFICULTY_CHOICES]
+
+    published = Recipe.objects.filter(is_published=True)
+    for params in filter_sets:
+        queryset = RecipeFilter(params, queryset=published).qs
+        cache.set(
+            facet_cache_key(params),
+            facet_counts(queryset),
+            settings.RECIPE_FACETS_CACHE_TIMEOUT,
+        )
+    return len(filter_sets)
+
+
+def with_facets(data, facets):
+    """Add ``facets`` to a list response body, keeping ``results`` last."""
+    if not isinstance(data, dict):
+        return {"facets": facets, "results": data}
+    body = {key: value for key, value in data.items() if key != "results"}
+    body["facets"] = facets
+    body["results"] = data["results"]
+    return body
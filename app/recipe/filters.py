@@ -1,40 +1,95 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
 from recipe.models import Recipe
+from taxonomy.models import Tag
+
+RecipeTag = Recipe.tags.through
+
+TAG_MODES = [("any", "Any"), ("all", "All")]
+
+
+def parse_tags(value):
+    """
+    Resolve comma-separated tag IDs and/or slugs to a set of tag IDs.
+
+    Slugs are looked up in one query; unknown slugs are dropped. Returns
+    ``(ids, unknown)`` where ``unknown`` counts tokens matching no tag.
+    """
+    tokens = {token.strip() for token in value.split(",") if token.strip()}
+    ids = {int(token) for token in tokens if token.isdigit()}
+    slugs = tokens - {str(pk) for pk in ids}
+    if slugs:
+        found = dict(
+            Tag.objects.filter(slug__in=slugs).order_by().values_list("slug", "pk")
+        )
+        ids.update(found.values())
+        return ids, len(slugs) - len(found)
+    return ids, 0
+
+
+def has_tag(tag_ids):
+    """``EXISTS`` a link from the outer recipe to any of ``tag_ids``."""
+    return Exists(
+        RecipeTag.objects.filter(recipe_id=OuterRef("pk"), tag_id__in=tag_ids)
+    )
 
 
 class RecipeFilter(filters.FilterSet):
     """FilterSet for Recipe model."""
 
     category = filters.NumberFilter(field_name="category__id")
+    # The category and everything below it, via taxonomy.CategoryClosure
+    category_tree = filters.NumberFilter(
+        field_name="category__ancestor_links__ancestor"
+    )
+    # Comma-separated tag IDs or slugs; see filter_tags
     tags = filters.CharFilter(method="filter_tags")
+    tags_mode = filters.ChoiceFilter(choices=TAG_MODES, method="filter_tags_mode")
+    exclude_tags = filters.CharFilter(method="filter_exclude_tags")
     difficulty = filters.CharFilter(field_name="difficulty")
-    max_time = filters.NumberFilter(method="filter_max_time")
+    # Total minutes (prep + cook), on the indexed Recipe.total_time column
+    min_time = filters.NumberFilter(field_name="total_time", lookup_expr="gte")
+    max_time = filters.NumberFilter(field_name="total_time", lookup_expr="lte")
     author = filters.NumberFilter(field_name="author__id")
 
     class Meta:
         model = Recipe
-        fields = ["category", "tags", "difficulty", "author"]
+        fields = [
+            "category",
+            "category_tree",
+            "tags",
+            "tags_mode",
+            "exclude_tags",
+            "difficulty",
+            "author",
+        ]
 
     def filter_tags(self, queryset, name, value):
-        """Filter by tags (comma-separated IDs)."""
-        if value:
-            tag_ids = [int(id.strip()) for id in value.split(",") if id.strip()]
-            if tag_ids:
-                return queryset.filter(tags__id__in=tag_ids).distinct()
+        """
+        Filter by tags: any of them, or all with ``tags_mode=all``.
+
+        Each condition is a semi-join on the recipe/tag link table, so a
+        recipe matches once however many of its tags match, and no
+        ``DISTINCT`` is needed.
+        """
+        tag_ids, unknown = parse_tags(value)
+        if self.form.cleaned_data.get("tags_mode") == "all":
+            if unknown:
+                return queryset.none()
+            for tag_id in tag_ids:
+                queryset = queryset.filter(has_tag([tag_id]))
+            return queryset
+        if tag_ids:
+            return queryset.filter(has_tag(tag_ids))
+        return queryset.none() if unknown else queryset
+
+    def filter_tags_mode(self, queryset, name, value):
+        """Read by filter_tags."""
         return queryset
 
-    def filter_max_time(self, queryset, name, value):
-        """Filter by maximum total time (prep_time + cook_time)."""
-        if value:
-            # Filter recipes where total time is less than or equal to max_time
-            # Handle null values by treating them as 0
-            from django.db.models import F, Value
-            from django.db.models.functions import Coalesce
-
-            return queryset.annotate(
-                _total_time_calc=(
-                    Coalesce(F("prep_time"), Value(0))
-                    + Coalesce(F("cook_time"), Value(0))
-                )
-            ).filter(_total_time_calc__lte=value)
+    def filter_exclude_tags(self, queryset, name, value):
+        """Drop recipes with any of these tags (IDs or slugs)."""
+        tag_ids, _ = parse_tags(value)
+        if tag_ids:
+            return queryset.filter(~has_tag(tag_ids))
         return queryset
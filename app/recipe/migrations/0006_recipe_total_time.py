@@ -0,0 +1,44 @@
+# Generated by Django 3.2.25 on 2026-10-19 11:19
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 10000
+
+
+def backfill_total_time(apps, schema_editor):
+    # Non-atomic migration: each batch commits on its own, so no long lock
+    # is held on the recipe table.
+    Recipe = apps.get_model('recipe', 'Recipe')
+    last = Recipe.objects.order_by('-pk').values_list('pk', flat=True).first()
+    start = 0
+    while last is not None and start <= last:
+        Recipe.objects.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).update(
+            total_time=Coalesce(F('prep_time'), Value(0)) + Coalesce(F('cook_time'), Value(0))
+        )
+        start += BATCH_SIZE
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('recipe', '0005_recipe_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='total_time',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_total_time, migrations.RunPython.noop),
+        # Indexed once filled, rather than updating the index row by row.
+        migrations.AlterField(
+            model_name='recipe',
+            name='total_time',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
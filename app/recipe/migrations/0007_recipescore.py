@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-19 11:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0006_recipe_total_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeScore',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='recipe.recipe')),
+                ('trending', models.FloatField(default=0)),
+                ('decayed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('top_rated', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='recipescore',
+            index=models.Index(fields=['-trending', '-recipe'], name='recipescore_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipescore',
+            index=models.Index(fields=['-top_rated', '-recipe'], name='recipescore_top_rated_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe', '0007_recipescore'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['author', '-created_at', '-id'], name='recipe_author_feed_idx'),
+        ),
+    ]
@@ -1,6 +1,8 @@
+from core.image_jobs import STATUS_CHOICES as IMAGE_STATUS_CHOICES
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 
 class Recipe(models.Model):
@@ -30,6 +32,8 @@ class Recipe(models.Model):
         blank=True,
         validators=[MaxValueValidator(1440)],
     )
+    # prep_time + cook_time, missing times counting as 0; set by save()
+    total_time = models.PositiveIntegerField(default=0, editable=False, db_index=True)
     servings = models.PositiveIntegerField(
         default=1,
         validators=[MinValueValidator(1), MaxValueValidator(100)],
@@ -40,6 +44,13 @@ class Recipe(models.Model):
         default="medium",
     )
     image = models.ImageField(upload_to="recipes/", null=True, blank=True)
+    # Resized WebP/JPEG copies of image, see core.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Background processing state of image, see core.image_jobs
+    image_status = models.CharField(
+        max_length=10, choices=IMAGE_STATUS_CHOICES, blank=True, editable=False
+    )
+    image_source = models.CharField(max_length=255, blank=True, editable=False)
     source_url = models.URLField(max_length=500, blank=True)
     is_published = models.BooleanField(default=False)
     category = models.ForeignKey(
@@ -56,18 +67,38 @@ class Recipe(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped on every write that changes the detail payload; keys caches.
+    version = models.PositiveIntegerField(default=1, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # A followed author's newest published recipes, for the feed
+            models.Index(
+                fields=["author", "-created_at", "-id"],
+                name="recipe_author_feed_idx",
+                condition=models.Q(is_published=True),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
-    @property
-    def total_time(self):
-        prep = self.prep_time or 0
-        cook = self.cook_time or 0
-        return prep + cook
+    def save(self, *args, **kwargs):
+        """Keep total_time in step with prep_time and cook_time."""
+        self.total_time = (self.prep_time or 0) + (self.cook_time or 0)
+        fields = kwargs.get("update_fields")
+        if fields is not None and not {"prep_time", "cook_time"}.isdisjoint(fields):
+            kwargs["update_fields"] = {*fields, "total_time"}
+        super().save(*args, **kwargs)
+
+    def touch(self):
+        """Bump updated_at and version after a change to the recipe or its rows."""
+        self.updated_at = timezone.now()
+        Recipe.objects.filter(pk=self.pk).update(
+            updated_at=self.updated_at, version=models.F("version") + 1
+        )
+        self.version += 1
 
     @property
     def average_rating(self):
@@ -119,3 +150,39 @@ class Ingredient(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class RecipeScore(models.Model):
+    """
+    Discovery scores for a recipe with any engagement.
+
+    See recipe.rankings; kept up to date from rating, favorite and comment
+    writes and by ``refresh_rankings``.
+    """
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="score",
+    )
+    # Time-decayed engagement, as of decayed_at
+    trending = models.FloatField(default=0)
+    decayed_at = models.DateTimeField(default=timezone.now)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    # Bayesian average rating; 0 without ratings
+    top_rated = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-trending", "-recipe"], name="recipescore_trending_idx"
+            ),
+            models.Index(
+                fields=["-top_rated", "-recipe"], name="recipescore_top_rated_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Scores for recipe {self.recipe_id}"
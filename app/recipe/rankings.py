@@ -0,0 +1,236 @@
+"""
+Trending and top-rated recipe rankings.
+
+``RecipeScore`` has one row per recipe with ratings, favorites or comments,
+indexed by both scores, so ``/recipes/trending/`` and ``/recipes/top-rated/``
+read one page of it.
+
+Trending is the sum of engagement weights (``RECIPE_RANKINGS["WEIGHTS"]``),
+each halved every ``HALF_LIFE_HOURS`` since it happened. Exponential decay
+does not depend on when the decay is applied, so the score is kept in place:
+each write decays the stored value from ``decayed_at`` to now and adds its
+weight, and removing an engagement subtracts its weight decayed since it was
+created. ``refresh_scores`` decays every row to the same instant from cron,
+so rows written at different times compare fairly.
+
+Top-rated is a Bayesian average: the recipe's ratings plus
+``PRIOR_RATINGS`` ratings at the site-wide mean, so a single 5-star rating
+does not outrank hundreds of 4.8s.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from interaction.models import Comment, Favorite, Rating
+from recipe.models import Recipe, RecipeScore
+
+MEAN_CACHE_KEY = "recipe:rankings:mean"
+
+# Seconds the site-wide mean rating is cached between refresh_scores runs
+MEAN_CACHE_TIMEOUT = 3600
+
+# Trending below this counts as no recent engagement
+MIN_TRENDING = 1e-3
+
+# Cap on decay exponents; Postgres raises on float underflow
+MAX_HALVINGS = 1000
+
+ENGAGEMENTS = {Rating: "rating", Favorite: "favorite", Comment: "comment"}
+
+_quote = connection.ops.quote_name
+_TABLE = _quote(RecipeScore._meta.db_table)
+
+
+def _half_life():
+    """Return the trending half-life in seconds."""
+    return settings.RECIPE_RANKINGS["HALF_LIFE_HOURS"] * 3600
+
+
+def _decay(column, since):
+    """SQL for ``column`` decayed from ``since`` to the ``%(now)s`` parameter."""
+    return (
+        f"{column} * POWER(0.5, LEAST(GREATEST(EXTRACT(EPOCH FROM %(now)s - "
+        f"{since})::float8, 0) / %(half_life)s, {MAX_HALVINGS}))"
+    )
+
+
+def _top_rated(count, total):
+    """SQL for the Bayesian average of ``count`` ratings summing to ``total``."""
+    return (
+        f"CASE WHEN {count} = 0 THEN 0 ELSE (%(prior)s * %(mean)s + {total})"
+        f"::float8 / (%(prior)s + {count}) END"
+    )
+
+
+ADD_SQL = f"""
+INSERT INTO {_TABLE} AS s
+    (recipe_id, trending, decayed_at, rating_count, rating_sum, top_rated)
+VALUES (%(recipe_id)s, %(weight)s, %(now)s, 0, 0, 0)
+ON CONFLICT (recipe_id) DO UPDATE SET
+    trending = {_decay("s.trending", "s.decayed_at")} + %(weight)s,
+    decayed_at = %(now)s
+"""
+
+REMOVE_SQL = f"""
+UPDATE {_TABLE} AS s SET
+    trending = GREATEST({_decay("s.trending", "s.decayed_at")} - %(weight)s, 0),
+    decayed_at = %(now)s
+WHERE recipe_id = %(recipe_id)s
+"""
+
+REFRESH_SQL = f"""
+UPDATE {_TABLE} AS s SET
+    trending = CASE WHEN {_decay("s.trending", "s.decayed_at")} < {MIN_TRENDING}
+        THEN 0 ELSE {_decay("s.trending", "s.decayed_at")} END,
+    decayed_at = %(now)s,
+    top_rated = {_top_rated("s.rating_count", "s.rating_sum")}
+WHERE recipe_id >= %(start)s AND recipe_id < %(stop)s
+"""
+
+REBUILD_SQL = f"""
+INSERT INTO {_TABLE}
+    (recipe_id, trending, decayed_at, rating_count, rating_sum, top_rated)
+SELECT recipe_id, SUM(trending), %(now)s, SUM(ratings), SUM(score), 0
+FROM (
+    SELECT recipe_id, {_decay("%(rating)s", "created_at")} AS trending,
+           1 AS ratings, score
+    FROM {_quote(Rating._meta.db_table)}
+    WHERE recipe_id >= %(start)s AND recipe_id < %(stop)s
+    UNION ALL
+    SELECT recipe_id, {_decay("%(favorite)s", "created_at")}, 0, 0
+    FROM {_quote(Favorite._meta.db_table)}
+    WHERE recipe_id >= %(start)s AND recipe_id < %(stop)s
+    UNION ALL
+    SELECT recipe_id, {_decay("%(comment)s", "created_at")}, 0, 0
+    FROM {_quote(Comment._meta.db_table)}
+    WHERE recipe_id >= %(start)s AND recipe_id < %(stop)s
+) AS engagement
+GROUP BY recipe_id
+"""
+
+
+def prior_mean():
+    """Return the site-wide mean rating the top-rated prior is made of."""
+    mean = cache.get(MEAN_CACHE_KEY)
+    if mean is None:
+        mean = _refresh_mean()
+    return mean
+
+
+def _refresh_mean():
+    mean = Rating.objects.aggregate(mean=Avg("score"))["mean"] or 0
+    cache.set(MEAN_CACHE_KEY, mean, MEAN_CACHE_TIMEOUT)
+    return mean
+
+
+def _params(**params):
+    return {
+        "now": timezone.now(),
+        "half_life": _half_life(),
+        "prior": settings.RECIPE_RANKINGS["PRIOR_RATINGS"],
+        **params,
+    }
+
+
+def add_engagement(recipe_id, weight):
+    """Add an engagement of ``weight`` happening now to the recipe's trending."""
+    with connection.cursor() as cursor:
+        cursor.execute(ADD_SQL, _params(recipe_id=recipe_id, weight=weight))
+
+
+def remove_engagement(recipe_id, weight, created_at):
+    """Take back an engagement of ``weight`` made at ``created_at``."""
+    decayed = weight * 0.5 ** min(
+        max((timezone.now() - created_at).total_seconds(), 0) / _half_life(),
+        MAX_HALVINGS,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(REMOVE_SQL, _params(recipe_id=recipe_id, weight=decayed))
+
+
+def update_rating_stats(recipe_id):
+    """Recount the recipe's ratings and its top-rated score."""
+    stats = Rating.objects.filter(recipe_id=recipe_id).aggregate(
+        count=Count("pk"), total=Coalesce(Sum("score"), 0)
+    )
+    prior = settings.RECIPE_RANKINGS["PRIOR_RATINGS"]
+    top_rated = 0
+    if stats["count"]:
+        top_rated = (prior * prior_mean() + stats["total"]) / (prior + stats["count"])
+    RecipeScore.objects.filter(pk=recipe_id).update(
+        rating_count=stats["count"], rating_sum=stats["total"], top_rated=top_rated
+    )
+
+
+def engagement_saved(sender, instance, created, **kwargs):
+    """``post_save`` receiver for ratings, favorites and comments."""
+    if created:
+        weight = settings.RECIPE_RANKINGS["WEIGHTS"][ENGAGEMENTS[sender]]
+        add_engagement(instance.recipe_id, weight)
+    # A changed score re-averages; edited comments change nothing.
+    if sender is Rating:
+        update_rating_stats(instance.recipe_id)
+
+
+def engagement_deleted(sender, instance, **kwargs):
+    """``post_delete`` receiver for ratings, favorites and comments."""
+    weight = settings.RECIPE_RANKINGS["WEIGHTS"][ENGAGEMENTS[sender]]
+    remove_engagement(instance.recipe_id, weight, instance.created_at)
+    if sender is Rating:
+        update_rating_stats(instance.recipe_id)
+
+
+def _ranges(queryset, batch_size):
+    """Yield ``(start, stop)`` primary key ranges covering ``queryset``."""
+    last = queryset.order_by("-pk").values_list("pk", flat=True).first()
+    start = 0
+    while last is not None and start <= last:
+        yield start, start + batch_size
+        start += batch_size
+
+
+def refresh_scores(batch_size=10000):
+    """
+    Decay every row to now and recompute top-rated with a fresh mean.
+
+    Runs from cron through ``refresh_rankings``, one short transaction per
+    ``batch_size`` recipe ids, and drops rows left with no engagement.
+    Returns ``{"rows", "removed", "mean"}``.
+    """
+    mean = _refresh_mean()
+    now = timezone.now()
+    rows = 0
+    for start, stop in _ranges(RecipeScore.objects.all(), batch_size):
+        params = _params(now=now, start=start, stop=stop, mean=mean)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(REFRESH_SQL, params)
+            rows += cursor.rowcount
+    removed, _ = RecipeScore.objects.filter(trending=0, rating_count=0).delete()
+    return {"rows": rows, "removed": removed, "mean": mean}
+
+
+def rebuild_scores(batch_size=10000):
+    """
+    Recompute every row from the ratings, favorites and comments.
+
+    For the first deploy and after engagement rows were written without
+    signals (``bulk_create``, raw SQL). Works through ``batch_size`` recipe
+    ids per transaction, then runs ``refresh_scores``. Returns the number of
+    rows written.
+    """
+    weights = settings.RECIPE_RANKINGS["WEIGHTS"]
+    now = timezone.now()
+    written = 0
+    for start, stop in _ranges(Recipe.objects.all(), batch_size):
+        with transaction.atomic():
+            RecipeScore.objects.filter(pk__gte=start, pk__lt=stop).delete()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    REBUILD_SQL, _params(now=now, start=start, stop=stop, **weights)
+                )
+                written += cursor.rowcount
+    refresh_scores(batch_size)
+    return written
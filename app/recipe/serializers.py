@@ -1,3 +1,5 @@
+from core.images import ImageVariantsField
+from core.serializers_fast import compile_serializer
 from recipe.models import Ingredient, Recipe
 from rest_framework import serializers
 
@@ -16,6 +18,7 @@ class RecipeListSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source="author.name", read_only=True)
     average_rating = serializers.FloatField(read_only=True)
     rating_count = serializers.IntegerField(read_only=True)
+    image_srcset = ImageVariantsField(source="image_variants")
 
     class Meta:
         model = Recipe
@@ -31,6 +34,7 @@ class RecipeListSerializer(serializers.ModelSerializer):
             "servings",
             "difficulty",
             "image",
+            "image_srcset",
             "created_at",
             "average_rating",
             "rating_count",
@@ -38,6 +42,9 @@ class RecipeListSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "author", "created_at"]
 
 
+fast_recipe_list = compile_serializer(RecipeListSerializer)
+
+
 class RecipeDetailSerializer(serializers.ModelSerializer):
     """Serializer for recipe detail view."""
 
@@ -45,6 +52,7 @@ class RecipeDetailSerializer(serializers.ModelSerializer):
     author_name = serializers.CharField(source="author.name", read_only=True)
     average_rating = serializers.FloatField(read_only=True)
     rating_count = serializers.IntegerField(read_only=True)
+    image_srcset = ImageVariantsField(source="image_variants")
 
     class Meta:
         model = Recipe
@@ -61,6 +69,8 @@ class RecipeDetailSerializer(serializers.ModelSerializer):
             "servings",
             "difficulty",
             "image",
+            "image_srcset",
+            "image_status",
             "source_url",
             "is_published",
             "category",
@@ -126,4 +136,5 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
                 ingredient_data["order"] = idx
                 Ingredient.objects.create(recipe=instance, **ingredient_data)
 
+        instance.touch()
         return instance
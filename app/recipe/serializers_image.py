@@ -1,3 +1,6 @@
+from core.direct_uploads import DirectUploadField
+from core.images import ImageVariantsField
+from core.uploads import ImageUploadField
 from recipe.models import Recipe
 from rest_framework import serializers
 
@@ -5,10 +8,19 @@ from rest_framework import serializers
 class RecipeImageSerializer(serializers.ModelSerializer):
     """Serializer for uploading images to recipes."""
 
+    image = ImageUploadField(required=False)
+    # Token from the upload-url action, instead of the file itself
+    upload = DirectUploadField("image", required=False)
+    image_srcset = ImageVariantsField(source="image_variants")
+
     class Meta:
         model = Recipe
-        fields = ["id", "image"]
+        fields = ["id", "image", "upload", "image_srcset", "image_status"]
         read_only_fields = ["id"]
-        extra_kwargs = {
-            "image": {"required": True},
-        }
+
+    def validate(self, attrs):
+        if ("image" in attrs) == ("upload" in attrs):
+            raise serializers.ValidationError(
+                "Provide either an image file or an upload token."
+            )
+        return attrs
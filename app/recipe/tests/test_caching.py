@@ -0,0 +1,272 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipe.caching import detail_cache_stats
+from recipe.models import Recipe
+from recipe.serializers import RecipeDetailSerializer
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+def detail_url(recipe_id):
+    """Return recipe detail URL."""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def rate_url(recipe_id):
+    """Return recipe rate URL."""
+    return reverse("recipe:recipe-rate", args=[recipe_id])
+
+
+class ConditionalGetTests(TestCase):
+    """Tests for ETag / Last-Modified handling on recipe reads."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title="Test Recipe",
+            instructions="Test",
+            is_published=True,
+        )
+
+    def test_detail_has_validators(self):
+        """Test detail responses carry ETag and Last-Modified."""
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", res)
+
+    def test_detail_not_modified_skips_serialization(self):
+        """Test a matching If-None-Match returns 304 without serializing."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+
+        with patch.object(RecipeDetailSerializer, "to_representation") as rep:
+            res = self.client.get(detail_url(self.recipe.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        rep.assert_not_called()
+
+    def test_rating_invalidates_detail(self):
+        """Test rating a recipe changes its ETag."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+        rater = get_user_model().objects.create_user(
+            email="rater@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=rater)
+        self.client.post(rate_url(self.recipe.id), {"score": 5})
+        self.client.force_authenticate(user=None)
+
+        res = self.client.get(detail_url(self.recipe.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_ingredient_change_invalidates_detail(self):
+        """Test updating ingredients changes the ETag."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+        self.client.force_authenticate(user=self.user)
+        self.client.patch(
+            detail_url(self.recipe.id),
+            {"ingredients": [{"name": "Salt", "quantity": "1", "unit": "tsp"}]},
+            format="json",
+        )
+        self.client.force_authenticate(user=None)
+
+        res = self.client.get(detail_url(self.recipe.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_anonymous_list_is_publicly_cacheable(self):
+        """Test anonymous list pages carry public Cache-Control."""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("public", res["Cache-Control"])
+        self.assertIn("max-age=", res["Cache-Control"])
+        self.assertIn("Authorization", res["Vary"])
+
+    def test_authenticated_list_is_private(self):
+        """Test authenticated list pages must revalidate."""
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res["Cache-Control"], "private, no-cache")
+
+    def test_list_not_modified_until_new_recipe(self):
+        """Test list 304s until the filtered set changes."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Recipe.objects.create(
+            author=self.user,
+            title="Another Recipe",
+            instructions="Test",
+            is_published=True,
+        )
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_author_rename_invalidates_validators(self):
+        """Test renaming the author changes detail and list validators."""
+        detail_etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+        list_etag = self.client.get(RECIPES_URL)["ETag"]
+        author = get_user_model().objects.get(pk=self.user.pk)
+
+        author.bio = "Unrelated edit"
+        author.save()
+        res = self.client.get(
+            detail_url(self.recipe.id), HTTP_IF_NONE_MATCH=detail_etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        author.name = "Renamed"
+        author.save()
+        res = self.client.get(
+            detail_url(self.recipe.id), HTTP_IF_NONE_MATCH=detail_etag
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["author_name"], "Renamed")
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_validators_skip_ratings(self):
+        """Test a list 304 costs one query that does not read ratings."""
+        etag = self.client.get(RECIPES_URL)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        [query] = queries.captured_queries
+        self.assertNotIn("rating", query["sql"])
+
+    def test_list_etag_varies_by_query(self):
+        """Test different filters or pages get different ETags."""
+        first = self.client.get(RECIPES_URL)["ETag"]
+        filtered = self.client.get(RECIPES_URL, {"difficulty": "easy"})["ETag"]
+
+        self.assertNotEqual(first, filtered)
+
+
+class DetailPayloadCacheTests(TestCase):
+    """Tests for the versioned recipe detail payload cache."""
+
+    def setUp(self):
+        cache.clear()
+        detail_cache_stats.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+            name="Original Name",
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user,
+            title="Test Recipe",
+            instructions="Test",
+            is_published=True,
+        )
+
+    def test_repeat_read_is_served_from_cache(self):
+        """Test the second read skips serialization and counts a hit."""
+        first = self.client.get(detail_url(self.recipe.id))
+
+        with patch.object(RecipeDetailSerializer, "to_representation") as rep:
+            second = self.client.get(detail_url(self.recipe.id))
+
+        rep.assert_not_called()
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(
+            detail_cache_stats.snapshot(),
+            {"hits": 1, "misses": 1, "hit_rate": 0.5},
+        )
+
+    def test_writes_bump_version(self):
+        """Test update and rate bump the recipe version."""
+        self.client.force_authenticate(user=self.user)
+        self.client.patch(detail_url(self.recipe.id), {"title": "New"})
+        self.client.post(rate_url(self.recipe.id), {"score": 4})
+
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.version, 3)
+
+    def test_ingredient_change_refreshes_payload(self):
+        """Test ingredient edits are visible on the next read."""
+        self.client.get(detail_url(self.recipe.id))
+        self.client.force_authenticate(user=self.user)
+        self.client.patch(
+            detail_url(self.recipe.id),
+            {"ingredients": [{"name": "Salt", "quantity": "1", "unit": "tsp"}]},
+            format="json",
+        )
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res.data["ingredients"][0]["name"], "Salt")
+
+    def test_rating_refreshes_payload(self):
+        """Test a new rating is reflected in the cached payload."""
+        self.client.get(detail_url(self.recipe.id))
+        self.client.force_authenticate(user=self.user)
+        self.client.post(rate_url(self.recipe.id), {"score": 4})
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res.data["average_rating"], 4.0)
+        self.assertEqual(res.data["rating_count"], 1)
+
+    def test_author_rename_is_not_cached(self):
+        """Test author fields are read fresh on cache hits."""
+        self.client.get(detail_url(self.recipe.id))
+        # Skips the signal that touches the author's recipes
+        get_user_model().objects.filter(pk=self.user.pk).update(name="Renamed")
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res.data["author_name"], "Renamed")
+        self.assertEqual(detail_cache_stats.snapshot()["hits"], 1)
+
+    def test_cache_is_per_scheme(self):
+        """Test http and https reads don't share payloads with absolute URLs."""
+        self.client.get(detail_url(self.recipe.id))
+        self.client.get(detail_url(self.recipe.id), secure=True)
+        self.client.get(detail_url(self.recipe.id), secure=True)
+
+        self.assertEqual(detail_cache_stats.snapshot()["misses"], 2)
+        self.assertEqual(detail_cache_stats.snapshot()["hits"], 1)
+
+    def test_cached_draft_not_visible_to_others(self):
+        """Test a draft cached for its author still 404s for others."""
+        self.recipe.is_published = False
+        self.recipe.save()
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(
+            self.client.get(detail_url(self.recipe.id)).status_code,
+            status.HTTP_200_OK,
+        )
+
+        other = get_user_model().objects.create_user(
+            email="other@example.com",
+            password="testpass123",
+        )
+        self.client.force_authenticate(user=other)
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
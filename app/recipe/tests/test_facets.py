@@ -0,0 +1,170 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipe.facets import TIME_BUCKETS
+from recipe.models import Recipe
+from rest_framework import status
+from rest_framework.test import APIClient
+from taxonomy.models import Category, Tag
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+def by_slug(entries):
+    return {entry["slug"]: entry["count"] for entry in entries}
+
+
+class RecipeFacetTests(TestCase):
+    """Tests for facet counts on the recipe list."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.breakfast = Category.objects.create(name="Breakfast", slug="breakfast")
+        self.dinner = Category.objects.create(name="Dinner", slug="dinner")
+        self.vegan = Tag.objects.create(name="Vegan", slug="vegan")
+        self.quick = Tag.objects.create(name="Quick", slug="quick")
+
+        def recipe(title, category, difficulty, prep, cook, tags=(), **kwargs):
+            obj = Recipe.objects.create(
+                author=self.user,
+                title=title,
+                instructions="Cook",
+                category=category,
+                difficulty=difficulty,
+                prep_time=prep,
+                cook_time=cook,
+                is_published=kwargs.get("is_published", True),
+            )
+            obj.tags.add(*tags)
+            return obj
+
+        recipe("Pancakes", self.breakfast, "easy", 5, 10, [self.quick])
+        recipe("Porridge", self.breakfast, "easy", None, 10, [self.quick, self.vegan])
+        recipe("Stir Fry", self.dinner, "medium", 20, 25, [self.vegan])
+        recipe("Wellington", self.dinner, "hard", 60, 120)
+        recipe(
+            "Draft Stew", self.dinner, "easy", 10, 10, [self.quick], is_published=False
+        )
+
+    def test_facets_off_by_default(self):
+        """Test plain list responses carry no facets."""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertNotIn("facets", res.data)
+
+    def test_facet_counts(self):
+        """Test counts per category, tag, difficulty and time bucket."""
+        res = self.client.get(RECIPES_URL, {"facets": "true"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        facets = res.data["facets"]
+        self.assertEqual(by_slug(facets["categories"]), {"breakfast": 2, "dinner": 2})
+        self.assertEqual(by_slug(facets["tags"]), {"quick": 2, "vegan": 2})
+        self.assertEqual(
+            facets["difficulty"],
+            [
+                {"value": "easy", "count": 2},
+                {"value": "medium", "count": 1},
+                {"value": "hard", "count": 1},
+            ],
+        )
+        self.assertEqual(
+            facets["max_time"],
+            [
+                {"value": 15, "count": 2},
+                {"value": 30, "count": 2},
+                {"value": 60, "count": 3},
+                {"value": 120, "count": 3},
+            ],
+        )
+        self.assertEqual([b["value"] for b in facets["max_time"]], TIME_BUCKETS)
+        self.assertEqual(list(res.data)[-1], "results")
+
+    def test_facets_follow_filters(self):
+        """Test counts reflect the current filters and search."""
+        res = self.client.get(
+            RECIPES_URL, {"facets": "1", "category": self.breakfast.id}
+        )
+        searched = self.client.get(RECIPES_URL, {"facets": "1", "search": "fry"})
+
+        self.assertEqual(by_slug(res.data["facets"]["categories"]), {"breakfast": 2})
+        self.assertEqual(by_slug(res.data["facets"]["tags"]), {"quick": 2, "vegan": 1})
+        self.assertEqual(by_slug(searched.data["facets"]["tags"]), {"vegan": 1})
+
+    def test_facets_unknown_tags(self):
+        """Test filters matching nothing give zeroed facets, not an error."""
+        for params in (
+            {"tags": "nope"},
+            {"tags_mode": "all", "tags": "vegan,nope"},
+        ):
+            res = self.client.get(RECIPES_URL, {"facets": "1", **params})
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK, params)
+            self.assertEqual(res.data["count"], 0)
+            facets = res.data["facets"]
+            self.assertEqual(facets["categories"], [])
+            self.assertEqual(facets["tags"], [])
+            self.assertEqual(facets["difficulty"], [])
+            self.assertEqual(
+                facets["max_time"],
+                [{"value": bound, "count": 0} for bound in TIME_BUCKETS],
+            )
+
+    def test_time_bucket_matches_max_time_filter(self):
+        """Test each bucket count equals the max_time filter's result count."""
+        facets = self.client.get(RECIPES_URL, {"facets": "1"}).data["facets"]
+
+        for bucket in facets["max_time"]:
+            res = self.client.get(RECIPES_URL, {"max_time": bucket["value"]})
+            self.assertEqual(res.data["count"], bucket["count"])
+
+    def test_facets_include_own_drafts(self):
+        """Test an author's counts include their unpublished recipes."""
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(RECIPES_URL, {"facets": "1"})
+
+        self.assertEqual(by_slug(res.data["facets"]["categories"])["dinner"], 3)
+
+    def test_facets_single_query(self):
+        """Test all facet counts come from one extra query, then the cache."""
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get(RECIPES_URL)
+        with CaptureQueriesContext(connection) as faceted:
+            self.client.get(RECIPES_URL, {"facets": "1"})
+        with CaptureQueriesContext(connection) as cached:
+            self.client.get(RECIPES_URL, {"facets": "1", "page": "1"})
+
+        self.assertEqual(len(faceted), len(plain) + 1)
+        self.assertEqual(len(cached), len(plain))
+
+    def test_drafts_are_not_shared(self):
+        """Test an author's draft counts do not leak into shared entries."""
+        self.client.force_authenticate(user=self.user)
+        self.client.get(RECIPES_URL, {"facets": "1"})
+        self.client.force_authenticate(user=None)
+
+        res = self.client.get(RECIPES_URL, {"facets": "1"})
+
+        self.assertEqual(by_slug(res.data["facets"]["categories"])["dinner"], 2)
+
+    def test_warm_facets(self):
+        """Test warm_facets fills the shared entries list requests read."""
+        call_command("warm_facets", stdout=StringIO())
+        Recipe.objects.filter(title="Pancakes").update(is_published=False)
+
+        res = self.client.get(RECIPES_URL, {"facets": "1"})
+        fresh = self.client.get(RECIPES_URL, {"facets": "1", "tags": self.quick.id})
+
+        self.assertEqual(by_slug(res.data["facets"]["categories"])["breakfast"], 2)
+        self.assertEqual(by_slug(fresh.data["facets"]["categories"])["breakfast"], 1)
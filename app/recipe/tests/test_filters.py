@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from interaction.models import Rating
 from recipe.models import Recipe
@@ -74,6 +76,28 @@ class RecipeFilterTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.data["results"]), 2)
 
+    def test_filter_by_category_tree(self):
+        """Test category_tree matches the category and its descendants."""
+        roasts = Category.objects.create(
+            name="Roasts", slug="roasts", parent=self.dinner
+        )
+        sunday = Category.objects.create(name="Sunday", slug="sunday", parent=roasts)
+        self.recipe3.category = sunday
+        self.recipe3.save()
+
+        dinner = self.client.get(RECIPES_URL, {"category_tree": self.dinner.id})
+        only_roasts = self.client.get(RECIPES_URL, {"category_tree": roasts.id})
+        exact = self.client.get(RECIPES_URL, {"category": self.dinner.id})
+
+        self.assertEqual(
+            {r["title"] for r in dinner.data["results"]},
+            {"Vegan Stir Fry", "Beef Wellington"},
+        )
+        self.assertEqual(
+            [r["title"] for r in only_roasts.data["results"]], ["Beef Wellington"]
+        )
+        self.assertEqual(len(exact.data["results"]), 1)
+
     def test_filter_by_tags(self):
         """Test filtering recipes by tags."""
         res = self.client.get(RECIPES_URL, {"tags": self.vegan.id})
@@ -91,6 +115,69 @@ class RecipeFilterTests(TestCase):
         # Should return recipes that have ANY of the tags
         self.assertEqual(len(res.data["results"]), 2)
 
+    def test_filter_by_all_tags(self):
+        """Test tags_mode=all returns recipes having every tag."""
+        res = self.client.get(
+            RECIPES_URL,
+            {"tags": f"{self.vegan.id},{self.quick.id}", "tags_mode": "all"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["title"] for r in res.data["results"]], ["Vegan Stir Fry"])
+
+    def test_filter_by_tag_slugs(self):
+        """Test tags can be given as slugs, mixed with IDs."""
+        by_slug = self.client.get(RECIPES_URL, {"tags": "vegan,quick"})
+        mixed = self.client.get(
+            RECIPES_URL, {"tags": f"vegan,{self.quick.id}", "tags_mode": "all"}
+        )
+
+        self.assertEqual(len(by_slug.data["results"]), 2)
+        self.assertEqual(len(mixed.data["results"]), 1)
+
+    def test_filter_by_unknown_tag_slug(self):
+        """Test an unknown slug matches nothing on its own or in all mode."""
+        alone = self.client.get(RECIPES_URL, {"tags": "missing"})
+        any_mode = self.client.get(RECIPES_URL, {"tags": "missing,vegan"})
+        all_mode = self.client.get(
+            RECIPES_URL, {"tags": "missing,vegan", "tags_mode": "all"}
+        )
+
+        self.assertEqual(len(alone.data["results"]), 0)
+        self.assertEqual(len(any_mode.data["results"]), 1)
+        self.assertEqual(len(all_mode.data["results"]), 0)
+
+    def test_exclude_tags(self):
+        """Test exclude_tags drops recipes having any of the tags."""
+        res = self.client.get(RECIPES_URL, {"exclude_tags": "vegan"})
+        both = self.client.get(
+            RECIPES_URL, {"tags": str(self.quick.id), "exclude_tags": "vegan"}
+        )
+
+        titles = {r["title"] for r in res.data["results"]}
+        self.assertEqual(titles, {"Pancakes", "Beef Wellington"})
+        self.assertEqual([r["title"] for r in both.data["results"]], ["Pancakes"])
+
+    def test_tag_filters_do_not_use_distinct(self):
+        """Test tag filters are EXISTS semi-joins, so no DISTINCT is needed."""
+        params = {
+            "tags": f"{self.vegan.id},{self.quick.id}",
+            "exclude_tags": "missing,vegan",
+        }
+        for user in (None, self.user):
+            self.client.force_authenticate(user=user)
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(RECIPES_URL, params)
+            listing = [
+                q["sql"]
+                for q in queries.captured_queries
+                if 'FROM "recipe_recipe"' in q["sql"]
+            ]
+            self.assertTrue(listing)
+            for sql in listing:
+                self.assertIn("EXISTS", sql)
+                self.assertNotIn("DISTINCT", sql)
+
     def test_filter_by_difficulty(self):
         """Test filtering recipes by difficulty."""
         res = self.client.get(RECIPES_URL, {"difficulty": "easy"})
@@ -109,6 +196,23 @@ class RecipeFilterTests(TestCase):
         self.assertIn("Pancakes", titles)
         self.assertIn("Vegan Stir Fry", titles)
 
+    def test_filter_by_min_time(self):
+        """Test min_time and max_time bound total time from both sides."""
+        res = self.client.get(RECIPES_URL, {"min_time": 30})
+        ranged = self.client.get(RECIPES_URL, {"min_time": 30, "max_time": 60})
+
+        titles = {r["title"] for r in res.data["results"]}
+        self.assertEqual(titles, {"Vegan Stir Fry", "Beef Wellington"})
+        self.assertEqual(
+            [r["title"] for r in ranged.data["results"]], ["Vegan Stir Fry"]
+        )
+
+    def test_order_by_total_time(self):
+        """Test recipes can be ordered by total time."""
+        res = self.client.get(RECIPES_URL, {"ordering": "-total_time"})
+
+        self.assertEqual([r["total_time"] for r in res.data["results"]], [180, 50, 25])
+
 
 class RecipeSearchTests(TestCase):
     """Tests for recipe search."""
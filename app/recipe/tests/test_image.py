@@ -1,6 +1,8 @@
 import os
 import tempfile
+from datetime import timedelta
 
+from core import media
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
@@ -43,8 +45,9 @@ class RecipeImageUploadTests(TestCase):
 
     def tearDown(self):
         """Clean up test images."""
-        if self.recipe.image:
-            self.recipe.image.delete()
+        self.recipe.refresh_from_db()
+        media.release(media.field_paths(self.recipe, "image"))
+        media.collect_garbage(grace=timedelta(0))
 
     def test_upload_image(self):
         """Test uploading an image to a recipe."""
@@ -54,6 +54,19 @@ class RecipeModelTests(TestCase):
 
         self.assertEqual(recipe.tags.count(), 2)
 
+    def test_total_time_is_stored(self):
+        """Test total_time is saved as prep + cook, missing times as 0."""
+        recipe = Recipe.objects.create(
+            author=self.user, title="Toast", instructions="Toast", prep_time=5
+        )
+        self.assertEqual(recipe.total_time, 5)
+
+        recipe.cook_time = 20
+        recipe.save(update_fields=["cook_time"])
+
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.total_time, 25)
+
 
 class IngredientModelTests(TestCase):
     """Tests for Ingredient model."""
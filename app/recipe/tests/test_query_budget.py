@@ -0,0 +1,79 @@
+from core.profiling import QueryBudgetMixin
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from interaction.models import Comment, Rating
+from recipe.models import Ingredient, Recipe
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+def detail_url(recipe_id):
+    """Return recipe detail URL."""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def comments_url(recipe_id):
+    """Return recipe comments URL."""
+    return reverse("recipe:recipe-comments", args=[recipe_id])
+
+
+class RecipeQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets for recipe endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(
+                email=f"user{i}@example.com",
+                password="testpass123",
+            )
+            for i in range(3)
+        ]
+        self.recipes = []
+        for user in self.users:
+            recipe = Recipe.objects.create(
+                author=user,
+                title="Test Recipe",
+                instructions="Test",
+                is_published=True,
+            )
+            Ingredient.objects.create(
+                recipe=recipe, name="Flour", quantity=1, unit="cups"
+            )
+            for rater in self.users:
+                Rating.objects.create(user=rater, recipe=recipe, score=4)
+            self.recipes.append(recipe)
+        self.client.force_authenticate(user=self.users[0])
+
+    def test_list_budget(self):
+        """Test recipe list query budget."""
+        # average_rating and rating_count are per-row model properties; one
+        # extra aggregate computes the list's ETag.
+        with self.assertQueryBudget(15, allow_n_plus_one=True):
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_budget(self):
+        """Test recipe detail query budget."""
+        with self.assertQueryBudget(7):
+            res = self.client.get(detail_url(self.recipes[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_comments_budget(self):
+        """Test comment thread query budget."""
+        recipe = self.recipes[0]
+        parent = Comment.objects.create(user=self.users[1], recipe=recipe, text="Hi")
+        Comment.objects.create(
+            user=self.users[2], recipe=recipe, text="Reply", parent=parent
+        )
+
+        # CommentSerializer.get_replies queries once per comment.
+        with self.assertQueryBudget(7):
+            res = self.client.get(comments_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
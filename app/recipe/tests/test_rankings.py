@@ -0,0 +1,233 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from interaction.models import Comment, Favorite, Rating
+from recipe import rankings
+from recipe.models import Recipe, RecipeScore
+from rest_framework import status
+from rest_framework.test import APIClient
+
+TRENDING_URL = reverse("recipe:recipe-trending")
+TOP_RATED_URL = reverse("recipe:recipe-top-rated")
+
+RANKINGS = {
+    "HALF_LIFE_HOURS": 48,
+    "WEIGHTS": {"rating": 1.0, "favorite": 2.0, "comment": 0.5},
+    "PRIOR_RATINGS": 2,
+}
+
+
+def create_user(n):
+    return get_user_model().objects.create_user(
+        email=f"user{n}@example.com", password="testpass123"
+    )
+
+
+@override_settings(RECIPE_RANKINGS=RANKINGS)
+class RankingTests(TestCase):
+    """Tests for trending and top-rated recipe scores."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = create_user(0)
+        self.soup = Recipe.objects.create(
+            author=self.author, title="Soup", instructions="Boil", is_published=True
+        )
+        self.stew = Recipe.objects.create(
+            author=self.author, title="Stew", instructions="Simmer", is_published=True
+        )
+
+    def score(self, recipe):
+        return RecipeScore.objects.get(recipe=recipe)
+
+    def test_engagement_adds_weight(self):
+        """Test favorites, ratings and comments add their weights."""
+        user = create_user(1)
+        Favorite.objects.create(user=user, recipe=self.soup)
+        Rating.objects.create(user=user, recipe=self.soup, score=4)
+        Comment.objects.create(user=user, recipe=self.soup, text="Nice")
+
+        score = self.score(self.soup)
+        self.assertAlmostEqual(score.trending, 3.5, places=3)
+        self.assertEqual((score.rating_count, score.rating_sum), (1, 4))
+
+    def test_removed_engagement_is_taken_back(self):
+        """Test unfavoriting removes the favorite's weight."""
+        self.client.force_authenticate(user=create_user(1))
+        url = reverse("recipe:recipe-favorite", args=[self.soup.id])
+
+        self.client.post(url)
+        self.client.post(url)
+
+        self.assertAlmostEqual(self.score(self.soup).trending, 0, places=3)
+
+    def test_refresh_decays_by_half_life(self):
+        """Test refresh_scores halves trending once per half-life."""
+        Favorite.objects.create(user=create_user(1), recipe=self.soup)
+        RecipeScore.objects.filter(recipe=self.soup).update(
+            decayed_at=timezone.now() - timedelta(hours=48)
+        )
+
+        rankings.refresh_scores()
+
+        self.assertAlmostEqual(self.score(self.soup).trending, 1.0, places=3)
+
+    def test_refresh_removes_rows_without_engagement(self):
+        """Test rows left with no trending and no ratings are deleted."""
+        favorite = Favorite.objects.create(user=create_user(1), recipe=self.soup)
+        Rating.objects.create(user=create_user(2), recipe=self.stew, score=5)
+        favorite.delete()
+        RecipeScore.objects.filter(recipe=self.stew).update(
+            decayed_at=timezone.now() - timedelta(days=365)
+        )
+
+        report = rankings.refresh_scores()
+
+        self.assertEqual(report["removed"], 1)
+        self.assertFalse(RecipeScore.objects.filter(recipe=self.soup).exists())
+        stew = self.score(self.stew)
+        self.assertEqual(stew.trending, 0)
+        self.assertEqual(stew.rating_count, 1)
+
+    def test_bayesian_average(self):
+        """Test one 5-star rating ranks below many slightly lower ones."""
+        salad = Recipe.objects.create(
+            author=self.author, title="Salad", instructions="Toss", is_published=True
+        )
+        Rating.objects.create(user=create_user(1), recipe=self.soup, score=5)
+        for n in range(2, 12):
+            score = 4 if n == 2 else 5
+            Rating.objects.create(user=create_user(n), recipe=self.stew, score=score)
+            Rating.objects.create(user=create_user(n + 10), recipe=salad, score=2)
+
+        rankings.refresh_scores()
+
+        mean = (5 + 49 + 20) / 21
+        soup, stew = self.score(self.soup), self.score(self.stew)
+        self.assertAlmostEqual(soup.top_rated, (2 * mean + 5) / 3)
+        self.assertAlmostEqual(stew.top_rated, (2 * mean + 49) / 12)
+        self.assertGreater(stew.top_rated, soup.top_rated)
+
+    def test_changed_rating_updates_average(self):
+        """Test re-rating a recipe updates its stats without new trending."""
+        self.client.force_authenticate(user=create_user(1))
+        url = reverse("recipe:recipe-rate", args=[self.soup.id])
+
+        self.client.post(url, {"score": 2})
+        self.client.post(url, {"score": 5})
+
+        score = self.score(self.soup)
+        self.assertEqual((score.rating_count, score.rating_sum), (1, 5))
+        self.assertAlmostEqual(score.trending, 1.0, places=3)
+
+    def test_rebuild_matches_incremental(self):
+        """Test rebuild_scores recomputes what the signals maintained."""
+        users = [create_user(n) for n in range(1, 4)]
+        for user in users:
+            Rating.objects.create(user=user, recipe=self.soup, score=4)
+        Favorite.objects.create(user=users[0], recipe=self.stew)
+        Comment.objects.create(user=users[1], recipe=self.stew, text="Good")
+        rankings.refresh_scores()
+        before = {
+            s.pk: (s.trending, s.rating_count, s.rating_sum, s.top_rated)
+            for s in RecipeScore.objects.all()
+        }
+        RecipeScore.objects.all().delete()
+
+        written = rankings.rebuild_scores(batch_size=1)
+
+        self.assertEqual(written, 2)
+        for score in RecipeScore.objects.all():
+            expected = before[score.pk]
+            self.assertAlmostEqual(score.trending, expected[0], places=3)
+            self.assertEqual((score.rating_count, score.rating_sum), expected[1:3])
+            self.assertAlmostEqual(score.top_rated, expected[3])
+
+    def test_deleting_recipe_deletes_scores(self):
+        """Test deleting a recipe with engagement removes its score row."""
+        Rating.objects.create(user=create_user(1), recipe=self.soup, score=4)
+        Favorite.objects.create(user=create_user(2), recipe=self.soup)
+
+        self.soup.delete()
+
+        self.assertFalse(RecipeScore.objects.exists())
+
+    def test_command(self):
+        """Test refresh_rankings reports what it refreshed."""
+        Favorite.objects.create(user=create_user(1), recipe=self.soup)
+        out = StringIO()
+
+        call_command("refresh_rankings", stdout=out)
+        call_command("refresh_rankings", "--rebuild", stdout=out)
+
+        self.assertIn("Refreshed 1 score(s)", out.getvalue())
+        self.assertIn("Rebuilt scores for 1 recipe(s)", out.getvalue())
+
+
+@override_settings(RECIPE_RANKINGS=RANKINGS)
+class RankingEndpointTests(TestCase):
+    """Tests for the trending and top-rated endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        author = create_user(0)
+        self.recipes = [
+            Recipe.objects.create(
+                author=author, title=title, instructions="Cook", is_published=True
+            )
+            for title in ("Soup", "Stew", "Salad")
+        ]
+        self.draft = Recipe.objects.create(
+            author=author, title="Draft", instructions="Cook"
+        )
+
+    def test_trending_order(self):
+        """Test trending lists engaged, published recipes by score."""
+        soup, stew, _ = self.recipes
+        Favorite.objects.create(user=create_user(1), recipe=stew)
+        Comment.objects.create(user=create_user(2), recipe=soup, text="Hi")
+        Favorite.objects.create(user=create_user(3), recipe=self.draft)
+
+        res = self.client.get(TRENDING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertEqual([r["title"] for r in res.data["results"]], ["Stew", "Soup"])
+
+    @override_settings(REST_FRAMEWORK={"PAGE_SIZE": 1})
+    def test_cursor_pages(self):
+        """Test the rankings page with cursors instead of page numbers."""
+        for n, recipe in enumerate(self.recipes):
+            for m in range(n + 1):
+                Comment.objects.create(
+                    user=create_user(10 * n + m + 1), recipe=recipe, text="Hi"
+                )
+        titles = []
+        url = TRENDING_URL
+
+        while url:
+            res = self.client.get(url)
+            titles += [r["title"] for r in res.data["results"]]
+            url = res.data["next"]
+
+        self.assertEqual(titles, ["Salad", "Stew", "Soup"])
+
+    def test_top_rated_order(self):
+        """Test top-rated skips unrated recipes and orders by average."""
+        soup, stew, _ = self.recipes
+        Rating.objects.create(user=create_user(1), recipe=soup, score=3)
+        Rating.objects.create(user=create_user(2), recipe=stew, score=5)
+        Favorite.objects.create(user=create_user(3), recipe=self.recipes[2])
+
+        res = self.client.get(TOP_RATED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["title"] for r in res.data["results"]], ["Stew", "Soup"])
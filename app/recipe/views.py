@@ -1,6 +1,10 @@
 import re
 
+from core.direct_uploads import UploadURLSerializer, start_upload
+from core.image_jobs import PENDING, image_processor
+from core.renderers import StreamingJSONMixin
 from core.throttling import RecipeCreateThrottle
+from core.uploads import ImageUploadMixin
 from django.db import models
 from django.db.models import Avg
 from django_filters.rest_framework import DjangoFilterBackend
@@ -12,46 +16,95 @@ from interaction.serializers import (
     RatingCreateSerializer,
     RatingSerializer,
 )
+from recipe.caching import (
+    ConditionalGetMixin,
+    cached_detail,
+    list_validators,
+    recipe_validators,
+)
+from recipe.facets import cached_facet_counts, facet_cache_key, with_facets
 from recipe.filters import RecipeFilter
-from recipe.models import Recipe
+from recipe.models import Recipe, RecipeScore
 from recipe.permissions import IsOwnerOrReadOnly
 from recipe.serializers import (
     RecipeCreateSerializer,
     RecipeDetailSerializer,
     RecipeListSerializer,
+    fast_recipe_list,
 )
 from recipe_scrapers import scrape_me
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipePagination(PageNumberPagination):
+    """Numbered list pages; ``page_size`` up to 100 streams the page."""
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class RankingPagination(CursorPagination):
+    """Cursor pages over a ``RecipeScore`` index, best first."""
+
+    def __init__(self, score):
+        self.ordering = (f"-{score}", "-recipe_id")
+
+    def get_ordering(self, request, queryset, view):
+        # Not the list's OrderingFilter fields
+        return self.ordering
+
+
+class RecipeViewSet(
+    ImageUploadMixin, StreamingJSONMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """ViewSet for recipes."""
 
+    image_upload_actions = ("upload_image",)
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     throttle_classes = [RecipeCreateThrottle]
+    pagination_class = RecipePagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_class = RecipeFilter
     search_fields = ["title", "description"]
-    ordering_fields = ["created_at", "prep_time", "cook_time", "avg_rating"]
+    ordering_fields = [
+        "created_at",
+        "prep_time",
+        "cook_time",
+        "total_time",
+        "avg_rating",
+    ]
     ordering = ["-created_at"]
 
-    def get_queryset(self):
-        """Return recipes based on user authentication."""
-        queryset = Recipe.objects.annotate(avg_rating=Avg("ratings__score"))
-
+    def visible_recipes(self):
+        """Return published recipes plus the requester's own drafts."""
         if self.request.user.is_authenticated:
-            return queryset.filter(
+            return Recipe.objects.filter(
                 models.Q(author=self.request.user) | models.Q(is_published=True)
-            ).distinct()
-        return queryset.filter(is_published=True)
+            )
+        return Recipe.objects.filter(is_published=True)
+
+    def get_queryset(self):
+        """
+        Return recipes based on user authentication.
+
+        Filters never join to-many relations into the row set (tags use
+        ``EXISTS``), so rows are unique without ``DISTINCT``.
+        """
+        return (
+            self.visible_recipes()
+            .select_related("author")
+            .annotate(avg_rating=Avg("ratings__score"))
+        )
 
     def get_serializer_class(self):
         """Return appropriate serializer class."""
-        if self.action == "list":
+        if self.action in ("list", "trending", "top_rated"):
             return RecipeListSerializer
         if self.action in ["create", "update", "partial_update"]:
             return RecipeCreateSerializer
@@ -65,8 +118,101 @@ class RecipeViewSet(viewsets.ModelViewSet):
             from recipe.serializers_image import RecipeImageSerializer
 
             return RecipeImageSerializer
+        if self.action == "upload_url":
+            return UploadURLSerializer
         return RecipeDetailSerializer
 
+    def list(self, request, *args, **kwargs):
+        """
+        List recipes, answering conditional GETs with 304.
+
+        ``?facets=true`` adds counts per facet value; see ``recipe.facets``.
+        """
+        etag, last_modified = list_validators(request, self.facet_queryset())
+        not_modified = self.conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(fast_recipe_list.many(page, request))
+        else:
+            response = Response(fast_recipe_list.many(queryset, request))
+        if request.query_params.get("facets") in ("1", "true"):
+            response.data = with_facets(response.data, self.get_facets())
+        return response
+
+    def get_facets(self):
+        """Return the facet counts for this request's filters, via the cache."""
+        user = self.request.user
+        owner_id = None
+        if (
+            user.is_authenticated
+            and Recipe.objects.filter(author=user, is_published=False).exists()
+        ):
+            # Their counts include their drafts; don't share them.
+            owner_id = user.pk
+        key = facet_cache_key(self.request.query_params, owner_id)
+        return cached_facet_counts(key, self.facet_queryset())
+
+    def facet_queryset(self):
+        """
+        Return the filtered and searched recipes for ``facet_counts``.
+
+        Skips the rating annotation and ordering the page needs, so the list
+        validators aggregate over it too.
+        """
+        queryset = self.visible_recipes()
+        for backend in (DjangoFilterBackend, SearchFilter):
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    @action(detail=False, methods=["get"])
+    def trending(self, request):
+        """List recipes by recent, time-decayed engagement."""
+        return self.ranked("trending")
+
+    @action(detail=False, methods=["get"], url_path="top-rated")
+    def top_rated(self, request):
+        """List recipes by Bayesian average rating."""
+        return self.ranked("top_rated")
+
+    def ranked(self, score):
+        """
+        Return a page of published recipes ordered by a ``RecipeScore`` field.
+
+        Reads one page of the score index, with cursor pagination so no
+        request counts the whole table; see ``recipe.rankings``.
+        """
+        scores = (
+            RecipeScore.objects.filter(**{f"{score}__gt": 0}, recipe__is_published=True)
+            .select_related("recipe__author")
+            .order_by(f"-{score}", "-recipe_id")
+        )
+        paginator = RankingPagination(score)
+        page = paginator.paginate_queryset(scores, self.request, view=self)
+        recipes = [row.recipe for row in page]
+        return paginator.get_paginated_response(
+            fast_recipe_list.many(recipes, self.request)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve a recipe from the versioned payload cache.
+
+        Visibility is enforced by ``get_object`` before the cache is read.
+        """
+        instance = self.get_object()
+        etag, last_modified = recipe_validators(request, instance)
+        not_modified = self.conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        data = cached_detail(
+            request, instance, lambda recipe: self.get_serializer(recipe).data
+        )
+        return Response(data)
+
     def perform_create(self, serializer):
         """Create a new recipe."""
         serializer.save(author=self.request.user)
@@ -83,6 +229,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
             recipe=recipe,
             defaults=serializer.validated_data,
         )
+        recipe.touch()
 
         output_serializer = RatingSerializer(rating)
         if created:
@@ -151,27 +298,41 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(recipe, data=request.data)
 
         if serializer.is_valid():
-            # Process the image before saving
-            image = request.FILES.get("image")
+            # Header already checked by ImageUploadField; variants are
+            # built off-request from the same handle
+            image = serializer.validated_data.get("image")
+            upload = serializer.validated_data.get("upload")
             if image:
-                from core.utils import process_image, validate_image
-
-                is_valid, error = validate_image(image)
-                if not is_valid:
-                    return Response(
-                        {"image": [error]},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                processed_image = process_image(image)
-                serializer.save(image=processed_image)
+                image_processor.submit(recipe, "image", image, "recipe")
+            elif upload:
+                # Uploaded straight to storage; only the token came through
+                image_processor.submit_stored(recipe, "image", upload, "recipe")
             else:
                 serializer.save()
+            recipe.touch()
 
+            if recipe.image_status == PENDING:
+                return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(
+        detail=True,
+        methods=["post"],
+        permission_classes=[IsAuthenticated, IsOwnerOrReadOnly],
+        url_path="upload-url",
+    )
+    def upload_url(self, request, pk=None):
+        """Issue a URL to upload a recipe image directly to storage."""
+        recipe = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        body = start_upload(
+            request, recipe, "image", serializer.validated_data["content_type"]
+        )
+        return Response(body, status=status.HTTP_201_CREATED)
+
     @action(
         detail=False,
         methods=["post"],
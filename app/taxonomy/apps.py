@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TaxonomyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "taxonomy"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from taxonomy.models import Category
+        from taxonomy.tree import invalidate_tree
+
+        post_save.connect(invalidate_tree, sender=Category)
+        post_delete.connect(invalidate_tree, sender=Category)
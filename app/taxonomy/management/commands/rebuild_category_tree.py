@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from taxonomy import tree
+
+
+class Command(BaseCommand):
+    """Recompute the category closure table from ``Category.parent``."""
+
+    help = (
+        "Rebuild the category tree index. Needed after categories were "
+        "written without Category.save (bulk_create, queryset update, raw SQL)."
+    )
+
+    def handle(self, *args, **options):
+        rows = tree.rebuild()
+        self.stdout.write(f"Rebuilt category tree; {rows} closure row(s).")
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-19 10:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_closure(apps, schema_editor):
+    Category = apps.get_model('taxonomy', 'Category')
+    CategoryClosure = apps.get_model('taxonomy', 'CategoryClosure')
+    parents = dict(Category.objects.values_list('pk', 'parent_id'))
+    links = []
+    for pk in parents:
+        ancestor_id, depth = pk, 0
+        while ancestor_id is not None:
+            links.append(CategoryClosure(ancestor_id=ancestor_id, descendant_id=pk, depth=depth))
+            ancestor_id, depth = parents[ancestor_id], depth + 1
+    CategoryClosure.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='taxonomy.category')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='taxonomy.category')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='categoryclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='category_closure_unique'),
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,15 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 
 
 class Category(models.Model):
-    """Category for recipes (hierarchical)."""
+    """
+    Category for recipes (hierarchical).
+
+    ``CategoryClosure`` indexes the tree; ``save`` keeps it in step with
+    ``parent``. Writes that bypass ``save`` (``bulk_create``, queryset
+    ``update``) must be followed by ``rebuild_category_tree``.
+    """
 
     name = models.CharField(max_length=100)
     slug = models.SlugField(max_length=100, unique=True)
@@ -21,6 +28,67 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def clean(self):
+        if (
+            self.pk
+            and self.parent_id
+            and (
+                self.parent_id == self.pk
+                or CategoryClosure.objects.filter(
+                    ancestor_id=self.pk, descendant_id=self.parent_id
+                ).exists()
+            )
+        ):
+            raise ValidationError(
+                "A category cannot be moved under itself or its descendants."
+            )
+
+    def save(self, *args, **kwargs):
+        from taxonomy import tree
+
+        with transaction.atomic():
+            if self._state.adding:
+                super().save(*args, **kwargs)
+                tree.add_node(self)
+                return
+            old_parent_id = (
+                Category.objects.filter(pk=self.pk)
+                .values_list("parent_id", flat=True)
+                .first()
+            )
+            if old_parent_id != self.parent_id:
+                self.clean()
+            super().save(*args, **kwargs)
+            if old_parent_id != self.parent_id:
+                tree.move_node(self)
+
+
+class CategoryClosure(models.Model):
+    """
+    One row per (ancestor, descendant) pair in the category tree.
+
+    Every category is its own ancestor at depth 0, so a subtree is
+    ``filter(ancestor=category)`` and recipes in it are one indexed join.
+    """
+
+    ancestor = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="descendant_links"
+    )
+    descendant = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="ancestor_links"
+    )
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["ancestor", "descendant"], name="category_closure_unique"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} > {self.descendant_id} ({self.depth})"
+
 
 class Tag(models.Model):
     """Tag for recipes (flat)."""
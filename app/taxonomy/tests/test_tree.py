@@ -0,0 +1,168 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from taxonomy import tree
+from taxonomy.models import Category, CategoryClosure
+
+TREE_URL = reverse("taxonomy:category-tree")
+
+
+def links():
+    """Return the closure table as ``{(ancestor, descendant): depth}`` by slug."""
+    return {
+        (link.ancestor.slug, link.descendant.slug): link.depth
+        for link in CategoryClosure.objects.select_related("ancestor", "descendant")
+    }
+
+
+class CategoryClosureTests(TestCase):
+    """Tests for keeping the closure table in step with parent."""
+
+    def setUp(self):
+        self.desserts = Category.objects.create(name="Desserts", slug="desserts")
+        self.cakes = Category.objects.create(
+            name="Cakes", slug="cakes", parent=self.desserts
+        )
+        self.cheesecake = Category.objects.create(
+            name="Cheesecake", slug="cheesecake", parent=self.cakes
+        )
+
+    def test_create_links_ancestors(self):
+        """Test a new category is linked to itself and every ancestor."""
+        self.assertEqual(
+            links(),
+            {
+                ("desserts", "desserts"): 0,
+                ("cakes", "cakes"): 0,
+                ("cheesecake", "cheesecake"): 0,
+                ("desserts", "cakes"): 1,
+                ("cakes", "cheesecake"): 1,
+                ("desserts", "cheesecake"): 2,
+            },
+        )
+
+    def test_move_subtree(self):
+        """Test moving a category re-links its whole subtree."""
+        baking = Category.objects.create(name="Baking", slug="baking")
+
+        self.cakes.parent = baking
+        self.cakes.save()
+
+        current = links()
+        self.assertNotIn(("desserts", "cakes"), current)
+        self.assertNotIn(("desserts", "cheesecake"), current)
+        self.assertEqual(current[("baking", "cakes")], 1)
+        self.assertEqual(current[("baking", "cheesecake")], 2)
+        self.assertEqual(current[("cakes", "cheesecake")], 1)
+
+    def test_move_to_root(self):
+        """Test detaching a category leaves only its own subtree links."""
+        self.cakes.parent = None
+        self.cakes.save()
+
+        self.assertEqual(
+            set(CategoryClosure.objects.filter(ancestor=self.desserts)),
+            set(CategoryClosure.objects.filter(descendant=self.desserts)),
+        )
+        self.assertEqual(len(links()), 4)
+
+    def test_move_under_descendant_rejected(self):
+        """Test a category cannot become its own ancestor."""
+        self.desserts.parent = self.cheesecake
+
+        with self.assertRaises(ValidationError):
+            self.desserts.save()
+
+        self.desserts.refresh_from_db()
+        self.assertIsNone(self.desserts.parent)
+
+    def test_delete_cascades(self):
+        """Test deleting a category removes its subtree's links."""
+        self.cakes.delete()
+
+        self.assertEqual(links(), {("desserts", "desserts"): 0})
+
+    def test_rebuild(self):
+        """Test rebuild restores links after writes that bypass save."""
+        expected = links()
+        CategoryClosure.objects.all().delete()
+        out = StringIO()
+
+        call_command("rebuild_category_tree", stdout=out)
+
+        self.assertEqual(links(), expected)
+        self.assertIn("6 closure row(s)", out.getvalue())
+
+
+class CategoryTreeApiTests(TestCase):
+    """Tests for the cached category tree endpoint."""
+
+    def setUp(self):
+        cache.delete(tree.TREE_CACHE_KEY)
+        self.client = APIClient()
+        self.desserts = Category.objects.create(name="Desserts", slug="desserts")
+        self.cakes = Category.objects.create(
+            name="Cakes", slug="cakes", parent=self.desserts
+        )
+        self.breakfast = Category.objects.create(name="Breakfast", slug="breakfast")
+
+    def test_nested_tree(self):
+        """Test the tree nests children under their parents."""
+        res = self.client.get(TREE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json(),
+            [
+                {
+                    "id": self.breakfast.id,
+                    "name": "Breakfast",
+                    "slug": "breakfast",
+                    "children": [],
+                },
+                {
+                    "id": self.desserts.id,
+                    "name": "Desserts",
+                    "slug": "desserts",
+                    "children": [
+                        {
+                            "id": self.cakes.id,
+                            "name": "Cakes",
+                            "slug": "cakes",
+                            "children": [],
+                        }
+                    ],
+                },
+            ],
+        )
+        self.assertIn("public", res["Cache-Control"])
+
+    def test_tree_is_cached(self):
+        """Test repeated reads are served without queries."""
+        self.client.get(TREE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(TREE_URL)
+
+        self.assertEqual(len(res.json()), 2)
+
+    def test_category_write_invalidates(self):
+        """Test a category write shows up in the next read."""
+        self.client.get(TREE_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(
+                name="Cookies", slug="cookies", parent=self.desserts
+            )
+
+        res = self.client.get(TREE_URL)
+        desserts = res.json()[1]
+        self.assertEqual(
+            [child["slug"] for child in desserts["children"]], ["cakes", "cookies"]
+        )
@@ -0,0 +1,114 @@
+"""
+Category tree index and the cached navigation tree.
+
+``CategoryClosure`` holds a row for every (ancestor, descendant) pair,
+including each category with itself at depth 0. ``Category.save`` calls
+``add_node`` and ``move_node``; deletes cascade through the foreign keys.
+Matching a whole subtree is then a single join::
+
+    Recipe.objects.filter(category__ancestor_links__ancestor_id=desserts.pk)
+
+``full_tree`` serves the nested tree for menus from the cache; any category
+write invalidates it once the transaction commits.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from taxonomy.models import Category, CategoryClosure
+
+TREE_CACHE_KEY = "taxonomy:tree"
+
+
+def add_node(category):
+    """Link a new category to itself and to its parent's ancestors."""
+    links = [CategoryClosure(ancestor_id=category.pk, descendant=category, depth=0)]
+    if category.parent_id:
+        above = CategoryClosure.objects.filter(
+            descendant_id=category.parent_id
+        ).values_list("ancestor_id", "depth")
+        links += [
+            CategoryClosure(
+                ancestor_id=ancestor_id, descendant=category, depth=depth + 1
+            )
+            for ancestor_id, depth in above
+        ]
+    CategoryClosure.objects.bulk_create(links)
+
+
+def move_node(category):
+    """Re-link ``category`` and its subtree under its current parent."""
+    subtree = CategoryClosure.objects.filter(ancestor_id=category.pk)
+    # Drop the links from the old ancestors into the subtree...
+    CategoryClosure.objects.filter(
+        descendant_id__in=subtree.values("descendant_id")
+    ).exclude(ancestor_id__in=subtree.values("descendant_id")).delete()
+    if not category.parent_id:
+        return
+    # ...and add one from each new ancestor to each category in it.
+    above = list(
+        CategoryClosure.objects.filter(descendant_id=category.parent_id).values_list(
+            "ancestor_id", "depth"
+        )
+    )
+    below = list(subtree.values_list("descendant_id", "depth"))
+    CategoryClosure.objects.bulk_create(
+        CategoryClosure(
+            ancestor_id=ancestor_id,
+            descendant_id=descendant_id,
+            depth=up + down + 1,
+        )
+        for ancestor_id, up in above
+        for descendant_id, down in below
+    )
+
+
+def rebuild():
+    """
+    Recompute the whole closure table from ``Category.parent``.
+
+    For after writes that bypassed ``Category.save``. Returns the number of
+    rows written.
+    """
+    parents = dict(Category.objects.values_list("pk", "parent_id"))
+    links = []
+    for pk in parents:
+        ancestor_id, depth = pk, 0
+        while ancestor_id is not None:
+            links.append(
+                CategoryClosure(ancestor_id=ancestor_id, descendant_id=pk, depth=depth)
+            )
+            ancestor_id, depth = parents[ancestor_id], depth + 1
+    with transaction.atomic():
+        CategoryClosure.objects.all().delete()
+        CategoryClosure.objects.bulk_create(links, batch_size=1000)
+    invalidate_tree()
+    return len(links)
+
+
+def build_tree():
+    """Return the categories as nested ``{id, name, slug, children}`` dicts."""
+    children = defaultdict(list)
+    for row in Category.objects.values("id", "name", "slug", "parent_id"):
+        node = {"id": row["id"], "name": row["name"], "slug": row["slug"]}
+        children[row["parent_id"]].append(node)
+    for nodes in children.values():
+        for node in nodes:
+            node["children"] = children.get(node["id"], [])
+    return children[None]
+
+
+def full_tree():
+    """Return ``build_tree()``, cached until the next category write."""
+    tree = cache.get(TREE_CACHE_KEY)
+    if tree is None:
+        tree = build_tree()
+        cache.set(TREE_CACHE_KEY, tree, settings.CATEGORY_TREE_CACHE_TIMEOUT)
+    return tree
+
+
+def invalidate_tree(**kwargs):
+    """Drop the cached tree after the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(TREE_CACHE_KEY))
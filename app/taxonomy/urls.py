@@ -0,0 +1,8 @@
+from django.urls import path
+from taxonomy import views
+
+app_name = "taxonomy"
+
+urlpatterns = [
+    path("categories/tree/", views.CategoryTreeView.as_view(), name="category-tree"),
+]
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from taxonomy.tree import full_tree
+
+
+class CategoryTreeView(APIView):
+    """The full category tree, nested, for navigation menus."""
+
+    permission_classes = [AllowAny]
+    authentication_classes: list = []
+
+    def get(self, request):
+        """Return the cached tree of root categories and their children."""
+        response = Response(full_tree())
+        patch_cache_control(
+            response, public=True, max_age=settings.RECIPE_CACHE_MAX_AGE
+        )
+        return response